@@ -0,0 +1,183 @@
+import random
+from array import array
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from engine import PrisonersDilemma, Bot, HistoryView, COOPERATE, DEFECT, PLAYER1_CODES, PLAYER1_NAMES
+
+# Plays thousands of matches at once with NumPy. It only works for strategies that can be written
+# as a lookup table over the last few rounds (Tit for Tat, copykitr, giyushino, ...): every match
+# is then just a state number per player, and a round is a handful of array operations over all
+# matches together instead of one Python call per bot per round.
+#
+# States: each remembered round is a digit from 0 to 4. Digits 0-3 are the outcome code seen from
+# the player's own side (2 * own move + opponent move); 4 means "before the match started", so a
+# table can treat the opening rounds differently. The newest round is the last digit.
+
+EMPTY = 4
+DIGITS = 5
+
+
+def state_count(memory: int) -> int:
+    return DIGITS ** memory
+
+
+def decode_state(state: int, memory: int) -> Optional[List[int]]:
+    # Returns the outcome codes of the rounds a state stands for, oldest first, or None if the state
+    # can't happen (an empty slot after a real round).
+    digits = []
+    for _ in range(memory):
+        state, digit = divmod(state, DIGITS)
+        digits.append(digit)
+    digits.reverse()
+    played = [digit for digit in digits if digit != EMPTY]
+    if digits[:memory - len(played)] != [EMPTY] * (memory - len(played)):
+        return None
+    return played
+
+
+def history_state(history, memory: int) -> int:
+    # The table state for an encoded history of (own, opponent) move codes.
+    state = state_count(memory) - 1
+    for own, opponent in history[max(0, len(history) - memory):]:
+        state = (state * DIGITS + 2 * own + opponent) % state_count(memory)
+    return state
+
+
+class TableStrategy:
+    """A strategy given as the chance of cooperating in each state of the last `memory` rounds."""
+
+    def __init__(self, name: str, memory: int, cooperate, noise: Optional[float] = None):
+        self.name = name
+        self.memory = memory
+        # This strategy's chance of having its move flipped, like Bot.noise. None uses the game's noise.
+        self.noise = noise
+        self.cooperate = np.asarray(cooperate, dtype=np.float64)
+        if self.cooperate.shape != (state_count(memory),):
+            raise ValueError(f"{name}: a memory-{memory} table needs {state_count(memory)} entries, got {self.cooperate.shape}")
+        if ((self.cooperate < 0) | (self.cooperate > 1)).any():
+            raise ValueError(f"{name}: cooperation probabilities must be between 0 and 1")
+
+    @classmethod
+    def from_bot(cls, bot: Bot, memory: Optional[int] = None, samples: int = 10000, seed: int = 0) -> 'TableStrategy':
+        """Builds the table by asking a bot what it does in every state.
+
+        The bot must really only look at the last `memory` rounds (bot.memory by default). Random bots
+        are asked `samples` times per state, so their probabilities are estimates.
+        """
+        memory = bot.memory if memory is None else memory
+        if memory is None:
+            raise ValueError(f"{bot.name}: memory unknown, pass it explicitly")
+        samples = 1 if bot.deterministic else samples
+        entries = PLAYER1_CODES if bot.encoded else PLAYER1_NAMES
+        cooperate = np.ones(state_count(memory))
+        saved_state = random.getstate()
+        random.seed(seed)
+        try:
+            for state in range(state_count(memory)):
+                played = decode_state(state, memory)
+                if played is None:
+                    continue
+                history = HistoryView(array('b', played), entries, 0, len(played))
+                cooperations = sum(bot.make_code(history) == COOPERATE for _ in range(samples))
+                cooperate[state] = cooperations / samples
+        finally:
+            random.setstate(saved_state)
+        return cls(bot.name, memory, cooperate, bot.noise)
+
+    def lifted(self, memory: int) -> np.ndarray:
+        # The same table over a longer memory, where the extra (older) rounds are ignored.
+        states = np.arange(state_count(memory))
+        return self.cooperate[states % state_count(self.memory)]
+
+    def state_of(self, history) -> int:
+        return history_state(history, self.memory)
+
+    def as_bot(self) -> Bot:
+        # Lets a table take part in ordinary tournaments too. The strategy only closes over the table
+        # and the memory, so the match cache can tell two tables' bots apart (see cache.strategy_key).
+        table, memory = self.cooperate, self.memory
+
+        def strategy(history):
+            chance = table[history_state(history, memory)]
+            if chance >= 1:
+                return COOPERATE
+            if chance <= 0:
+                return DEFECT
+            return COOPERATE if random.random() < chance else DEFECT
+
+        deterministic = bool(((table == 0) | (table == 1)).all())
+        return Bot(self.name, strategy, encoded=True, deterministic=deterministic, memory=self.memory,
+                   noise=self.noise)
+
+
+def play_batch(strategies: List[TableStrategy], pairs, rounds: int, game: Optional[PrisonersDilemma] = None,
+               seed: Optional[int] = None, record: bool = False) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """Plays many matches at once.
+
+    pairs is an (M, 2) array of indexes into strategies, one row per match. Returns the (M, 2) scores
+    and, with record=True, the (M, rounds) outcome codes (2 * move1 + move2, like engine.py).
+    Each strategy's noise (or the game's, if it has none) applies to its moves.
+    """
+    game = game or PrisonersDilemma()
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    memory = max((strategy.memory for strategy in strategies), default=0)
+    size = state_count(memory)
+    tables = np.stack([strategy.lifted(memory) for strategy in strategies]) if strategies else np.ones((0, size))
+    random_tables = bool(((tables > 0) & (tables < 1)).any())
+    payoffs = np.array(game.payoffs, dtype=np.float64)
+    rates = np.array([game.noise if strategy.noise is None else strategy.noise for strategy in strategies])
+    rng = np.random.default_rng(seed)
+
+    # Each player's row in the stacked tables, and its current state. Everyone starts with an
+    # empty history, which is the state made of nothing but EMPTY digits.
+    rows1, rows2 = pairs[:, 0], pairs[:, 1]
+    state1 = np.full(len(pairs), size - 1, dtype=np.intp)
+    state2 = state1.copy()
+    scores = np.zeros((len(pairs), 2))
+    noise1, noise2 = rates[rows1], rates[rows2]
+    noisy = bool(rates.any())
+    outcomes = np.zeros((len(pairs), rounds), dtype=np.int8) if record else None
+
+    for r in range(rounds):
+        chance1 = tables[rows1, state1]
+        chance2 = tables[rows2, state2]
+        if random_tables:
+            draws = rng.random((2, len(pairs)))
+            move1 = (draws[0] >= chance1).astype(np.intp)
+            move2 = (draws[1] >= chance2).astype(np.intp)
+        else:
+            move1 = (chance1 < 0.5).astype(np.intp)
+            move2 = (chance2 < 0.5).astype(np.intp)
+        if noisy:
+            move1 ^= (rng.random(len(pairs)) < noise1).astype(np.intp)
+            move2 ^= (rng.random(len(pairs)) < noise2).astype(np.intp)
+        scores += payoffs[move1, move2]
+        if record:
+            outcomes[:, r] = 2 * move1 + move2
+        if memory:
+            state1 = (state1 * DIGITS + 2 * move1 + move2) % size
+            state2 = (state2 * DIGITS + 2 * move2 + move1) % size
+    return scores, outcomes
+
+
+def batch_round_robin(strategies: List[TableStrategy], rounds: int, repetitions: int = 1,
+                      game: Optional[PrisonersDilemma] = None, seed: Optional[int] = None,
+                      chunk_size: int = 200_000) -> np.ndarray:
+    """Plays the round robin `repetitions` times and returns the mean score matrix.
+
+    result[i, j] is the average score of strategy i against strategy j. Matches are played
+    chunk_size at a time to keep memory in check.
+    """
+    count = len(strategies)
+    first, second = np.triu_indices(count, k=1)
+    pairs = np.tile(np.stack([first, second], axis=1), (repetitions, 1))
+    rng = np.random.default_rng(seed)
+    totals = np.zeros((count, count))
+    for start in range(0, len(pairs), chunk_size):
+        chunk = pairs[start:start + chunk_size]
+        scores, _ = play_batch(strategies, chunk, rounds, game, seed=rng.integers(2 ** 32))
+        np.add.at(totals, (chunk[:, 0], chunk[:, 1]), scores[:, 0])
+        np.add.at(totals, (chunk[:, 1], chunk[:, 0]), scores[:, 1])
+    return totals / max(repetitions, 1)
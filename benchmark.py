@@ -0,0 +1,183 @@
+import argparse
+import json
+import os
+import platform
+import random
+import time
+from typing import Dict, List, Optional, Sequence
+
+from engine import PrisonersDilemma, Bot, run_simulation
+from tournament import round_robin
+
+# Measures how fast the simulation is, so a change that slows it down gets noticed.
+#
+#   python benchmark.py            run the benchmarks and compare them with benchmark_baseline.json
+#   python benchmark.py --save     run them and make the results the new baseline
+#   python benchmark.py --profile  play one tournament and show how much time each bot's strategy takes
+#
+# Throughput is in rounds per second, counting every round of a match even when the engine skips
+# ahead through a repeating cycle (see engine.cycle_window), since that's what the person running the
+# tournament gets. That's why long matches between deterministic bots look so fast.
+
+BASELINE_FILE = 'benchmark_baseline.json'
+MATCH_LENGTHS = (100, 1000, 10000, 100000)
+ROSTER_SIZES = (10, 25, 50)
+
+
+def _best_time(function, repeat: int) -> float:
+    # The fastest of a few runs is the least disturbed by whatever else the machine is doing.
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def bench_matches(game: PrisonersDilemma, bots: List[Bot], lengths: Sequence[int] = MATCH_LENGTHS,
+                  pairs: int = 20, repeat: int = 3, seed: int = 0) -> Dict[str, float]:
+    """Rounds per second of run_simulation for a fixed sample of pairings, at each match length."""
+    rng = random.Random(seed)
+    sample = [tuple(rng.sample(range(len(bots)), 2)) for _ in range(pairs)]
+    results = {}
+    for rounds in lengths:
+        # Long matches are slow, so fewer pairings are played the longer the match.
+        chosen = sample[:max(4, pairs * 100 // rounds)]
+
+        def play():
+            for k, (i, j) in enumerate(chosen):
+                random.seed(k)
+                run_simulation(game, bots[i], bots[j], rounds)
+
+        results[f"match/{rounds}"] = len(chosen) * rounds / _best_time(play, repeat)
+    return results
+
+
+def _fresh(bot: Bot) -> Bot:
+    # A new instance of a bot for another seat, made from its plugin entry like registry().make_bot(name).
+    entry = getattr(bot, 'entry', None)
+    return entry.make_bot() if entry is not None else bot.mirror()
+
+
+def bench_rosters(game: PrisonersDilemma, bots: List[Bot], sizes: Sequence[int] = ROSTER_SIZES, rounds: int = 100,
+                  repeat: int = 3, seed: int = 0) -> Dict[str, float]:
+    """Rounds per second of a serial round robin with the first `size` bots (repeated if there aren't enough)."""
+    results = {}
+    for size in sizes:
+        roster = bots[:size] + [_fresh(bots[k % len(bots)]) for k in range(len(bots), size)]
+        matches = size * (size - 1) // 2
+        elapsed = _best_time(lambda: round_robin(game, roster, rounds, seed=seed, workers=1), repeat)
+        results[f"roster/{size}"] = matches * rounds / elapsed
+    return results
+
+
+def run_benchmarks(bots: List[Bot], game: Optional[PrisonersDilemma] = None, repeat: int = 3) -> Dict[str, float]:
+    game = game or PrisonersDilemma()
+    starting_scores = [bot.score for bot in bots]
+    try:
+        results = bench_matches(game, bots, repeat=repeat)
+        results.update(bench_rosters(game, bots, repeat=repeat))
+    finally:
+        for bot, score in zip(bots, starting_scores):
+            bot.score = score
+    return results
+
+
+def save_baseline(results: Dict[str, float], path: str = BASELINE_FILE):
+    with open(path, 'w') as f:
+        json.dump({'python': platform.python_version(), 'machine': platform.machine(), 'results': results}, f,
+                  indent=2, sort_keys=True)
+
+
+def load_baseline(path: str = BASELINE_FILE) -> Optional[Dict[str, float]]:
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)['results']
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], tolerance: float = 0.2) -> List[str]:
+    """Returns the benchmarks that got more than `tolerance` slower than the baseline."""
+    return [name for name, value in results.items()
+            if name in baseline and value < baseline[name] * (1 - tolerance)]
+
+
+class StrategyTimer:
+    """Stands in for a bot's strategy and adds up how long it takes."""
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.calls = 0
+        self.seconds = 0.0
+
+    def __call__(self, history):
+        start = time.perf_counter()
+        try:
+            return self.strategy(history)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.calls += 1
+
+
+def profile_strategies(bots: List[Bot], game: Optional[PrisonersDilemma] = None, rounds: int = 100,
+                       seed: int = 0) -> Dict[str, tuple]:
+    """Plays one serial round robin and returns {bot name: (calls, seconds, share of the tournament)}.
+
+    The strategies' time is subtracted from the total to give the engine's own share, under "(engine)"
+    with the number of moves it asked for (so its time per call is the engine's overhead per move).
+    """
+    game = game or PrisonersDilemma()
+    timers = [StrategyTimer(bot.strategy) for bot in bots]
+    starting_scores = [bot.score for bot in bots]
+    for bot, timer in zip(bots, timers):
+        bot.strategy = timer
+    try:
+        start = time.perf_counter()
+        round_robin(game, bots, rounds, seed=seed, workers=1)
+        total = time.perf_counter() - start
+    finally:
+        for bot, timer, score in zip(bots, timers, starting_scores):
+            bot.strategy = timer.strategy
+            bot.score = score
+    profile = {bot.name: (timer.calls, timer.seconds, timer.seconds / total) for bot, timer in zip(bots, timers)}
+    engine = total - sum(timer.seconds for timer in timers)
+    profile["(engine)"] = (sum(timer.calls for timer in timers), engine, engine / total)
+    return profile
+
+
+def print_profile(profile: Dict[str, tuple], limit: Optional[int] = None):
+    print(f"{'Strategy':<24}{'Calls':>10}{'Total ms':>12}{'us/call':>10}{'Share':>8}")
+    ranked = sorted(profile.items(), key=lambda item: item[1][1], reverse=True)
+    for name, (calls, seconds, share) in ranked[:limit]:
+        per_call = seconds / calls * 1e6 if calls else 0.0
+        print(f"{name[:23]:<24}{calls:>10}{seconds * 1000:>12.2f}{per_call:>10.2f}{share:>8.1%}")
+
+
+if __name__ == "__main__":
+    from version1 import make_bots
+
+    parser = argparse.ArgumentParser(description="Benchmark the Prisoner's Dilemma engine.")
+    parser.add_argument('--save', action='store_true', help="save the results as the new baseline")
+    parser.add_argument('--profile', action='store_true', help="show how much time each strategy takes")
+    parser.add_argument('--baseline', default=BASELINE_FILE, help="baseline file to compare with or save to")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    bots = make_bots()
+    if args.profile:
+        print_profile(profile_strategies(bots))
+        raise SystemExit(0)
+
+    results = run_benchmarks(bots)
+    baseline = load_baseline(args.baseline)
+    for name, value in results.items():
+        change = f"{value / baseline[name] - 1:+.1%}" if baseline and name in baseline else ""
+        print(f"{name:<16}{value:>16,.0f} rounds/s  {change}")
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"Saved as the new baseline in '{args.baseline}'")
+    elif baseline is not None:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"Slower than the baseline: {', '.join(regressions)}")
+            raise SystemExit(1)
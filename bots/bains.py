@@ -0,0 +1,27 @@
+import random
+
+from registry import bot
+
+# Sahib's bots.
+
+@bot("Sahib's", memory=1)
+def Bains(history):
+    chance = random.randint(1,10)
+    if history:
+        if history[-1][1] =='cooperate':
+            return 'cooperate'
+        if chance <= 3:
+            return 'cooperate'
+        else:
+            return 'defect'
+    return 'cooperate'
+
+@bot("Bains2")
+def Bains2(history):
+   if not history:
+       return 'cooperate'
+   else:
+       if len(history) %2== 0 and history [-1][1] == 'cooperate':
+           return 'cooperate'
+       else:
+           return 'defect'
@@ -0,0 +1,23 @@
+import random
+from typing import List, Tuple
+
+from registry import bot
+
+# The classics every tournament starts with.
+
+@bot("Always Defect", deterministic=True, memory=0)
+def always_defect(history: List[Tuple[str, str]]) -> str:
+    return 'defect'
+
+def always_cooperate(history: List[Tuple[str, str]]) -> str:
+    return 'cooperate'
+
+@bot("Tit for Tat", deterministic=True, memory=1)
+def tit_for_tat(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    return history[-1][1]  # Copy opponent's last move
+
+@bot("Random", memory=0)
+def random_choice(history: List[Tuple[str, str]]) -> str:
+    return random.choice(['cooperate', 'defect'])
@@ -0,0 +1,127 @@
+import random
+from typing import List, Tuple
+
+from registry import bot
+
+# Everyone else's bots.
+
+@bot("madness", deterministic=True, memory=1)
+def madness(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'defect'
+    if history[-1][1] == 'defect':
+        return 'cooperate'
+    if history[-1][1] == 'cooperate':
+        return 'defect'
+
+@bot("giyushino", memory=4)
+def giyushino(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    if len(history) > 3:
+        last_4_opponent_moves = [move[1] for move in history[-4:]]
+        if last_4_opponent_moves == ['defect', 'defect', 'defect', 'defect']:
+            return "defect"
+        elif last_4_opponent_moves == ['cooperate', 'cooperate', 'cooperate', 'cooperate']:
+            return "defect"
+        else:
+            if history[-1][1] == "cooperate":
+                return "cooperate"
+            else:
+                x = random.choice(last_4_opponent_moves)
+                return x
+    else:
+        if history[-1][1] == 'cooperate':
+            return "cooperate"
+        else:
+            return "defect"
+
+@bot("Greedy Gary")
+def garymccready(history: List[Tuple[str, str]]) -> str:
+    max = 500 - len(history)
+    garymccreadychance = random.randint(1,max)
+
+    if garymccreadychance > 374: 
+        return 'cooperate'
+    else:
+        return 'defect'
+
+@bot("Gambling", memory=0)
+def gamblingbutbetter(history: List[Tuple[str, str]]) -> str:
+    i = random.randint(0,644)
+    if i == 0:
+        return "cooperate"
+    
+    return "defect"
+
+@bot("glass", memory=0)
+def glass(history: List[Tuple[str, str]]) -> str:
+    glasschance = random.randint(1,4)
+    if glasschance == 1:
+        return 'defect'
+    else:
+        return 'cooperate'
+
+@bot("Last Straw", memory=2)
+def last_straw(history: List[Tuple[str, str]]) -> str:
+    max = 500
+    last_strawchance = random.randint(1,max)
+    if last_strawchance == 1:
+        return 'defect'
+    if len(history)>1:
+        if history[-1][0] == 'defect':
+            return 'defect'
+        else: 
+            return 'cooperate'
+    else:
+        return 'cooperate'
+
+@bot("Dog", deterministic=True, memory=2)
+def doggo(history: List[Tuple[str, str]]) -> str:
+    if len(history)>1:
+        if history [-1][0] == 'defect':
+            return 'defect'
+        else:
+            return 'cooperate'
+    if len(history)>2:
+        if history[-2][1] == 'defect':
+            if history[-1][1] == 'defect':
+                return 'defect'
+            else:
+                return 'cooperate'
+        else:
+            return 'cooperate'
+    else:
+        return 'cooperate'
+
+@bot("Gavin's Simpl", deterministic=True, memory=3)
+def simpl(history: List[Tuple[str, str]]) -> str:
+    if len(history) >= 3:
+        if history[-3][1] == "cooperate" and history[-2][1] == "cooperate" and history[-1][1] == "cooperate":
+            return "cooperate"
+    return "defect"
+
+@bot("Peanut", deterministic=True, memory=1)
+def peanut(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'defect'
+    if history[-1][1] == 'cooperate':
+        return 'defect'
+    if history [-1][1] == 'defect':
+        return 'cooperate'
+
+@bot("Insanity", deterministic=True, memory=2)
+def insanity(history: List[Tuple[str, str]]) -> str:
+    if len(history) == 0:
+        return 'cooperate'
+    if len(history) == 1:
+        return 'defect'
+    else:
+        return history[-2][1]
+
+@bot("Cruelty", deterministic=True, memory=3)
+def cruelty(history: List[Tuple[str, str]]) -> str:
+    if len(history)<3:
+        return 'cooperate'
+    else:
+        return history[-2][1]
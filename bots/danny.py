@@ -0,0 +1,21 @@
+from registry import bot
+
+# Danny's bots.
+
+@bot("Danny's first", deterministic=True, memory=1)
+def danny(history):
+    if not history:
+        return 'cooperate'  
+    if history[-1][1] == 'defect':
+        return 'defect'
+    return 'cooperate'
+
+@bot("Danny's Defect", deterministic=True, memory=0)
+def dannyDefect(history):
+    return 'defect'
+
+@bot("Danny's copy", deterministic=True, memory=1)
+def dannyCopy(history):
+    if not history:
+        return 'cooperate' 
+    return history[-1][1]
@@ -0,0 +1,84 @@
+import random
+
+from registry import bot
+
+# Gustavo's bots.
+
+@bot("Gustavo's First", memory=1)
+def gustavo(history):
+    if not history:
+        return "defect"
+    if history[-1][1] == "defect":
+            return "defect"
+    else:
+        chance = random.randint(0,100)
+        if chance < 95:
+            return 'defect'
+        else:
+            return 'cooperate'
+
+@bot("gustavoSecond", deterministic=True, memory=1)
+def gustavoSecond(history):
+    if not history:
+        return "defect"
+    if history[-1][1] == "defect":
+            return "defect"
+    if history[-1][1] == "cooperate":
+        return "defect"
+    if len(history) >80:
+        return "defect"
+    else:
+        chance = random.randint(0,100)
+        if chance < 95:
+            return 'defect'
+        else:
+            return 'cooperate'
+
+@bot("Gustavo3", memory=1)
+def gustavo_3(history):
+    if not history:
+        return "cooperate"
+    if history[-1][1] == "cooperate":
+        return "cooperate"
+    else:
+        chance = random.randint(0,100)
+        if chance < 95:
+            return 'defect'
+        else:
+            return 'cooperate'
+
+@bot("Gustavo4")
+def gustavo_4(history):
+    chance = random.randint(0,100)
+    if len(history) > 80:
+        return "defect"
+    if chance > 50:
+        return "defect"
+    else:
+        return "cooperate"
+
+@bot("Gustavo5", memory=1)
+def gustavo_5(history):
+    if not history:
+        return "cooperate"
+    if history[-1][1] == "cooperate":
+        chance = random.randint(0,100)
+        if chance < 95:
+            return 'defect'
+        else:
+            return 'cooperate'
+    else:
+        chance = random.randint(0,100)
+        if chance < 85:
+            return 'defect'
+        else:
+            return 'cooperate'
+
+@bot("Gustavo6", deterministic=True, memory=1)
+def gustavo_6(history):
+    if not history:
+        return "defect"
+    if history[-1][1] == "defect":
+        return "defect"
+    else:
+        return "cooperate"
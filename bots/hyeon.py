@@ -0,0 +1,10 @@
+from registry import bot
+
+# Hyeon's bot.
+
+@bot("Hyeon's First", deterministic=True, memory=1)
+def Hyeon(history):
+    if not history:
+        return 'cooperate'
+    else:
+        return 'defect'
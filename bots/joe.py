@@ -0,0 +1,67 @@
+import random
+
+from registry import bot
+
+# Joe's bots.
+
+def joe(history):
+    chance = random.random()
+    if history:
+        if history[-1][1] == 'defect':
+            return 'defect'
+    if chance < 0.5:
+        return 'defect'
+    else:
+        return 'cooperate'
+
+@bot("Checks 3", deterministic=True, memory=3)
+def checkLastThree(history):
+    howMuchDefect = 0
+    if len(history) > 2:
+        scope = history[-2:]
+        for i in scope:
+            if i[1] == 'defect':
+                howMuchDefect += 1
+        if howMuchDefect > 2:
+            return 'defect'
+    return 'cooperate'
+
+@bot("joe", memory=2)
+def joeTry1(history):
+    if not history:
+        return "cooperate"
+    if len(history) > 1:
+        if history[-2][0] == "defect" and history[-1][1] == "cooperate":
+            return "defect"
+    if history[-1][1] == "cooperate":
+        return "cooperate"
+    else:
+        chance = random.random()
+        if chance < 0.97:
+            return 'defect'
+    return "cooperate"
+
+@bot("Joe's Bot", memory=4)
+def joeEvil(history):
+    if not history:
+        return "cooperate"
+    if len(history) == 3:
+        return "defect"
+    if len(history) > 1:
+        if history[-2][0] == "defect" and history[-1][1] == "cooperate":
+            return "defect"
+    if history[-1][1] == "cooperate":
+        return "cooperate"
+    else:
+        chance = random.random()
+        if chance < 0.97:
+            return 'defect'
+    return "cooperate"
+
+@bot("Joe's Try", deterministic=True, memory=2)
+def exploitnoobs(history):
+    if not history:
+        return "cooperate"
+    if len(history) < 2:
+        return "cooperate"
+    return 'defect'
@@ -0,0 +1,69 @@
+import random
+from typing import List, Tuple
+
+from registry import bot
+
+# The copykitr family.
+
+@bot("copykitr", deterministic=True, memory=3)
+def copykitr(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    if history[-1][1] == 'cooperate':
+        return history[-1][1]
+    if history[-1][1] == 'defect':
+        if len(history)>2:
+            if history [-2][1] == 'defect':
+                return 'defect'
+            else:
+                return 'cooperate'
+        else:
+            return 'cooperate'
+
+@bot("copykitr2", memory=3)
+def copykitr2(history: List[Tuple[str, str]]) -> str:
+    copykitr2chance = random.randint(1, 10)
+    if not history:
+        if copykitr2chance == 1:
+            return 'defect'
+        else:
+            return 'cooperate'
+    if history[-1][1] == 'cooperate':
+        if copykitr2chance == 1:
+            return 'defect'
+        else:
+            return 'cooperate'
+    if history[-1][1] == 'defect':
+        if len(history)>2:
+            if history [-2][1] == 'defect':
+                if copykitr2chance == 1:
+                    return 'cooperate'
+                else:
+                    return 'defect'
+            elif copykitr2chance == 1:
+                return 'defect'
+            else:
+                return 'cooperate'
+        elif copykitr2chance == 1:
+            return 'defect'
+        else:
+            return 'cooperate'
+
+@bot("Kitcat", memory=1)
+def kitcat_tm(history: List[Tuple[str, str]]) -> str:
+    kitcat_tmchance = random.randint(1, 10)
+    if not history:
+        if kitcat_tmchance == 1:
+            return 'defect'
+        else:
+            return 'cooperate'
+    if history[-1][1] == 'cooperate':
+        if kitcat_tmchance == 1:
+            return 'defect'
+        else:
+            return 'cooperate'
+    if history[-1][1] == 'defect':
+        if kitcat_tmchance == 1:
+            return 'cooperate'
+        else:
+            return 'defect'
@@ -0,0 +1,78 @@
+import random
+from typing import List, Tuple
+
+from registry import bot
+
+# Rock's bots.
+
+@bot("Rock's First", deterministic=True, memory=1)
+def Rock_1(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    if history[-1][1] == 'cooperate':
+        return 'defect'
+    return 'cooperate'
+
+@bot("Rock 2", deterministic=True, memory=1)
+def Rock_2(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    
+    if history[-1][1] == history[-1][0]:
+        return 'defect'
+    return 'cooperate'  # or 'defect'
+
+@bot("Rock_3", deterministic=True, memory=3)
+def Rock_3(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    if len(history) > 2:
+        if history[-1][0] == history[-1][1] and history[-2][0] == history[-2][1]:
+            return 'cooperate'
+        if history[-1][1] == 'defect':
+            return 'defect'
+    return 'cooperate'  # or 'defect'
+
+@bot("Rocks fat bot", deterministic=True, memory=3)
+def Rock_4(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    if len(history) > 2:
+        if history[-1][0] ==  history[-2][0] == 'cooperate':
+            return 'defect'
+        if history[-1][1] ==  history[-1][-1] == 'cooperate':
+            return 'defect'
+    return 'cooperate'  # or 'defect'
+
+@bot("Rock 5", deterministic=True, memory=3)
+def Rock_5(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'cooperate'
+    if len(history) > 2:
+        if history[-1][0] == 'defect':
+            return 'cooperate'
+        if history[-1][1] == 'cooperate':
+            return 'defect'
+    return 'cooperate'  # or 'defect'
+
+@bot("Rock 6", deterministic=True, memory=3)
+def Rock_6(history: List[Tuple[str, str]]) -> str:
+    if not history:
+        return 'defect'
+    if len(history) > 2:
+        if history[-1][0] == 'defect':
+            return 'cooperate'
+        if history[-1][1] == 'cooperate':
+            return 'defect'
+    return 'defect'
+
+@bot("Chinese", memory=1)
+def Rock_7(history):
+    if not history:
+        return 'cooperate'
+    else:
+        if random.randint(0, 100)<80:
+            return history[-1][1]
+        else:
+            return "defect"
+    return 'cooperate'  # or 'defect'
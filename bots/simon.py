@@ -0,0 +1,23 @@
+import random
+from typing import List, Tuple
+
+from registry import bot
+
+# Simon's bots.
+
+@bot("Simon", memory=3)
+def simon_last_turn_defect(history: List[Tuple[str, str]]) -> str:
+    #Cooperate on the first turn
+    if not history:
+        return 'cooperate'
+    #Defect on the last turn
+    elif len(history) < 3:
+      return random.choice(['cooperate', 'defect'])
+      #Otherwise copy the opponent's last move
+    else:
+      return history[-1][1]
+
+#Second Instance: Always Defect
+@bot("Simon's Defect", deterministic=True, memory=0)
+def simon_1(history: List[Tuple[str, str]]) -> str:
+    return 'defect'
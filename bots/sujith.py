@@ -0,0 +1,40 @@
+import random
+from typing import List, Tuple
+
+from registry import bot
+
+# Sujith's bots.
+
+@bot("Sujith", deterministic=True, memory=2)
+def Sujith(history: List[Tuple[str, str]]) -> str:
+    if len(history) < 2:
+        return 'cooperate'
+    if history[-1][1] == history[-2][1]:
+        return history[-1][1]
+    else:
+        return 'defect'
+
+@bot("Sujith2", deterministic=True, memory=3)
+def Sujith2(history: List[Tuple[str, str]]) -> str:
+    if len(history) >= 3:
+        if history[-1][1] == history[-2][1] == history[-3][1]:
+            if history[-1][1] == 'cooperate':
+                return 'defect'
+            elif history[-1][1] == 'defect':
+                return 'defect'
+            else:
+                return 'cooperate'
+        else:
+            return "defect"
+    return 'cooperate'
+
+@bot("Sujith3", memory=1)
+def Sujith3(history: List[Tuple[str, str]]) -> str:
+    chance = random.randint(1, 100)
+    if not history:
+        return 'cooperate'
+    else:
+        if chance <= 90:
+            return 'defect'
+        else:
+            return 'cooperate'
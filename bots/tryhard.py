@@ -0,0 +1,65 @@
+import random
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+
+from engine import Agent
+from registry import agent
+
+# A Q-learning agent. It needs NumPy, which is only imported once TryHard actually plays.
+
+class NumPyDQNAgent(Agent):
+    def __init__(self, name="No Sweat", state_size=4, action_size=2, lr=0.1, gamma=0.95, epsilon=0.1):
+        self.name = name
+        self.score = 0
+        self.state_size = state_size
+        self.action_size = action_size
+        self.gamma = gamma
+        self.epsilon = epsilon
+        self.lr = lr
+
+        # Initialize Q-table with small random values
+        self.q_table = defaultdict(partial(np.zeros, action_size))
+        self.state = (0, 0)
+
+    def reset(self):
+        """Called before every match. The Q-table is kept, only the current state starts over."""
+        self.state = (0, 0)  # Default state
+
+    def get_state(self, history):
+        """Convert the last two rounds into a simple state representation."""
+        if len(history) < 2:
+            return (0, 0)  # Default state
+        
+        last_moves = history[-2:]  # Take last 2 rounds
+        state = (int(last_moves[0][1] == "cooperate"), int(last_moves[1][1] == "cooperate"))
+        return state
+
+    def make_move(self, history):
+        """Selects an action using an ε-greedy policy."""
+        if random.random() < self.epsilon:  # Exploration
+            return random.choice(["cooperate", "defect"])
+
+        # Exploitation (choose action with highest Q-value)
+        q_values = self.q_table[self.state]
+        action_idx = np.argmax(q_values)
+        return ["cooperate", "defect"][action_idx]  # Map index to action
+
+    def observe(self, reward, history):
+        """Updates Q-values using the Bellman equation, once per round as the engine reports it."""
+        next_state = self.get_state(history)
+        if len(history) >= 2:
+            action = history[-1][0]  # Our last action
+            action_idx = 0 if action == "cooperate" else 1
+
+            # Q-learning update rule
+            best_next_q = np.max(self.q_table[next_state])
+            self.q_table[self.state][action_idx] += self.lr * (reward + self.gamma * best_next_q - self.q_table[self.state][action_idx])
+        self.state = next_state
+
+
+@agent("TryHard")
+def tryHard(name="No Sweat", state_size=4, action_size=2, lr=0.1, gamma=0.95, epsilon=0.1):
+    """An undefeatable DQN agent made with NumPy thus extremely lightweight."""
+    return NumPyDQNAgent(name, state_size, action_size, lr, gamma, epsilon)
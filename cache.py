@@ -0,0 +1,149 @@
+import hashlib
+import random
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+from engine import PrisonersDilemma, Bot, play_match, noise_rates, MOVE_NAMES
+
+# Remembers the result of matches between deterministic bots. Something like Tit for Tat against
+# Always Defect plays out exactly the same way every time, so there is no point replaying it in
+# every tournament or every Monte Carlo repetition. Only pairings where at least one bot uses
+# randomness are ever simulated again.
+
+
+def _value_key(value, depth: int = 0):
+    # Stands for a value a strategy closes over, or is None if it can't be told apart reliably
+    # (anything mutable or unknown: two of them could look the same and still play differently).
+    if value is None or isinstance(value, (bool, int, float, complex, str, bytes)):
+        return repr(value)
+    if isinstance(value, tuple):
+        keys = tuple(_value_key(item, depth) for item in value)
+        return None if None in keys else keys
+    if hasattr(value, 'dtype') and hasattr(value, 'tobytes'):
+        # A NumPy array, like a TableStrategy's table.
+        return ('array', str(value.dtype), value.shape, hashlib.sha1(value.tobytes()).hexdigest())
+    if callable(value) and hasattr(value, '__code__') and depth < 3:
+        return _function_key(value, depth + 1)
+    return None
+
+
+def _function_key(strategy, depth: int = 0) -> Optional[tuple]:
+    if getattr(strategy, '__self__', None) is not None:
+        # A bound method plays however its object says; there's no telling two of them apart.
+        return None
+    code = getattr(strategy, '__code__', None)
+    if code is None:
+        return None
+    fingerprint = hashlib.sha1(code.co_code + repr(code.co_consts).encode()).hexdigest()
+    # Two closures made by the same factory share their code and differ only in what they close over.
+    captured = []
+    for cell in getattr(strategy, '__closure__', None) or ():
+        try:
+            captured.append(_value_key(cell.cell_contents, depth))
+        except ValueError:  # A cell that hasn't been filled in yet.
+            captured.append(None)
+    captured.append(_value_key(getattr(strategy, '__defaults__', None), depth))
+    if None in captured:
+        return None
+    return strategy.__module__, strategy.__qualname__, fingerprint, tuple(captured)
+
+
+def strategy_key(bot: Bot) -> Optional[tuple]:
+    """Identifies what a bot does, not what it's called: the same function under two names shares
+    cache entries, and editing a function's code invalidates them. None if the strategy can't be
+    identified (a bound method, a callable object, or a closure over something mutable), and then it
+    isn't cached."""
+    key = _function_key(bot.strategy)
+    return None if key is None else key + (bot.encoded,)
+
+
+def is_deterministic(bot: Bot, rounds: int = 200, patterns: int = 12, seeds: Tuple[int, ...] = (1, 2, 3)) -> bool:
+    """Guesses whether a bot's moves depend only on the history it is shown.
+
+    The bot plays a set of scripted opponents once per seed. If its moves ever differ between
+    seeds it uses randomness. A bot that raises an error while being probed counts as random,
+    since we can't tell. The random module's state is restored afterwards.
+    """
+    pattern_rng = random.Random(0)
+    scripts = [[0] * rounds, [1] * rounds, [r % 2 for r in range(rounds)]]
+    scripts += [[pattern_rng.randint(0, 1) for _ in range(rounds)] for _ in range(patterns - len(scripts))]
+    game = PrisonersDilemma()
+    saved_state = random.getstate()
+    try:
+        first_run = None
+        for seed in seeds:
+            random.seed(seed)
+            run = []
+            for script in scripts:
+                seen = []
+
+                def scripted(history, script=script, seen=seen):
+                    # The opponent's view of the history ends with the probed bot's last move.
+                    if history:
+                        seen.append(history[-1][1])
+                    return MOVE_NAMES[script[len(history)]]
+
+                play_match(game, bot, Bot("Probe", scripted), rounds)
+                run.append(seen)
+            if first_run is None:
+                first_run = run
+            elif run != first_run:
+                return False
+        return True
+    except Exception:
+        return False
+    finally:
+        random.setstate(saved_state)
+
+
+class MatchCache:
+    """Least-recently-used cache of match scores between deterministic bots.
+
+    Entries are keyed by (strategy, opponent strategy, rounds, payoff matrix). Bots whose
+    `deterministic` flag is None are probed with is_deterministic the first time they are seen.
+    """
+
+    def __init__(self, maxsize: int = 100_000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def cacheable(self, game: PrisonersDilemma, bot1: Bot, bot2: Bot) -> bool:
+        # Noise makes every match different, however predictable the bots are.
+        if any(noise_rates(game, bot1, bot2)):
+            return False
+        if strategy_key(bot1) is None or strategy_key(bot2) is None:
+            return False
+        for bot in (bot1, bot2):
+            if bot.deterministic is None:
+                bot.deterministic = is_deterministic(bot)
+        return bot1.deterministic and bot2.deterministic
+
+    def _key(self, game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int) -> Tuple[tuple, bool]:
+        # Both orders of a pairing share one entry; the flag says whether the scores need swapping.
+        key1, key2 = strategy_key(bot1), strategy_key(bot2)
+        swapped = repr(key2) < repr(key1)
+        if swapped:
+            key1, key2 = key2, key1
+        return (key1, key2, rounds, game.payoffs), swapped
+
+    def get(self, game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int) -> Optional[Tuple[int, int]]:
+        key, swapped = self._key(game, bot1, bot2, rounds)
+        scores = self._entries.get(key)
+        if scores is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return scores[::-1] if swapped else scores
+
+    def put(self, game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int, scores: Tuple[int, int]):
+        key, swapped = self._key(game, bot1, bot2, rounds)
+        self._entries[key] = tuple(scores[::-1]) if swapped else tuple(scores)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
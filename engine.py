@@ -0,0 +1,583 @@
+import copy
+import math
+import pickle
+import random
+import threading
+from array import array
+from typing import Callable, Dict, List, Optional, Tuple
+
+# The core of the simulation. Moves are stored as small integers instead of strings so the
+# per-round path never has to hash strings or build new tuples. Bots written against the
+# original string interface ('cooperate' / 'defect') still work, see Bot.make_code below.
+
+COOPERATE = 0
+DEFECT = 1
+
+MOVE_NAMES = ('cooperate', 'defect')
+MOVE_CODES = {'cooperate': COOPERATE, 'defect': DEFECT}
+
+# Every possible history entry is built once here and shared, so appending a round to a
+# history never allocates a tuple. NAME_PAIRS[a][b] == ('cooperate', 'defect') etc.
+NAME_PAIRS = tuple(tuple((MOVE_NAMES[a], MOVE_NAMES[b]) for b in (COOPERATE, DEFECT)) for a in (COOPERATE, DEFECT))
+CODE_PAIRS = tuple(tuple((a, b) for b in (COOPERATE, DEFECT)) for a in (COOPERATE, DEFECT))
+
+# A round is stored as a single outcome code, 2 * move1 + move2. These tables turn an outcome
+# code straight into the history entry seen by player 1 or by player 2 (whose own move comes first).
+PLAYER1_NAMES = tuple(NAME_PAIRS[code >> 1][code & 1] for code in range(4))
+PLAYER2_NAMES = tuple(NAME_PAIRS[code & 1][code >> 1] for code in range(4))
+PLAYER1_CODES = tuple(CODE_PAIRS[code >> 1][code & 1] for code in range(4))
+PLAYER2_CODES = tuple(CODE_PAIRS[code & 1][code >> 1] for code in range(4))
+
+
+def check_payoff_matrix(payoff_matrix: Dict[Tuple[str, str], Tuple[int, int]]):
+    # A payoff matrix needs a (score1, score2) pair of numbers for all four pairs of moves, and nothing else.
+    pairs = [(a, b) for a in MOVE_NAMES for b in MOVE_NAMES]
+    missing = [pair for pair in pairs if pair not in payoff_matrix]
+    if missing:
+        raise ValueError(f"The payoff matrix has no scores for {missing}")
+    extra = [pair for pair in payoff_matrix if pair not in pairs]
+    if extra:
+        raise ValueError(f"The payoff matrix has scores for unknown moves {extra}")
+    for pair in pairs:
+        scores = payoff_matrix[pair]
+        if not (isinstance(scores, (tuple, list)) and len(scores) == 2
+                and all(isinstance(score, (int, float)) and not isinstance(score, bool) for score in scores)):
+            raise ValueError(f"The payoff for {pair} must be two numbers, not {scores!r}")
+
+
+class PrisonersDilemma:
+    def __init__(self, payoff_matrix: Dict[Tuple[str, str], Tuple[int, int]] = None, noise: float = 0.0):
+        # Below is the matrix of rewards for cooperating and defecting.
+        self.payoff_matrix = payoff_matrix or {
+            ('cooperate', 'cooperate'): (3, 3),
+            ('cooperate', 'defect'): (0, 5),
+            ('defect', 'cooperate'): (5, 0),
+            ('defect', 'defect'): (1, 1)
+        }
+        check_payoff_matrix(self.payoff_matrix)
+        # The same matrix as a 2x2 array indexed by move codes: payoffs[move1][move2] == (score1, score2).
+        self.payoffs = tuple(tuple(tuple(self.payoff_matrix[(a, b)]) for b in MOVE_NAMES) for a in MOVE_NAMES)
+        # Chance that a move comes out as the opposite of what the bot chose (a "trembling hand").
+        # Bots can override it with their own rate.
+        self.noise = noise
+
+    def play_round(self, move1, move2) -> Tuple[int, int]:
+        # The function runs one round between two players, returning the points for the round.
+        return self.payoff_matrix[(move1, move2)]
+
+    def score(self, code1: int, code2: int) -> Tuple[int, int]:
+        # Same as play_round, but for encoded moves.
+        return self.payoffs[code1][code2]
+
+    def total_scores(self, outcome_counts: List[int]) -> Tuple[int, int]:
+        # outcome_counts[2 * move1 + move2] is how many rounds ended with that pair of moves.
+        # Scoring a whole match is then four multiplications instead of one lookup per round.
+        total1 = total2 = 0
+        for code, count in enumerate(outcome_counts):
+            if count:
+                score1, score2 = self.payoffs[code >> 1][code & 1]
+                total1 += score1 * count
+                total2 += score2 * count
+        return total1, total2
+
+
+class HistoryView:
+    """A read-only window onto a match's outcome buffer, seen from one player's side.
+
+    It behaves like the list of (own move, opponent move) tuples bots have always received:
+    history[-1][1], len(history), slicing and iteration all work. Nothing is copied when a
+    round is played, so both players can share one buffer no matter how long the match is.
+    Slices are views too, frozen at the rounds that had been played when they were taken.
+    """
+    __slots__ = ('_outcomes', '_start', '_stop', '_entries')
+
+    def __init__(self, outcomes: array, entries: tuple, start: int = 0, stop: int = 0):
+        self._outcomes = outcomes
+        self._entries = entries
+        self._start = start
+        self._stop = stop
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(self._stop - self._start)
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return HistoryView(self._outcomes, self._entries, self._start + start, self._start + max(start, stop))
+        length = self._stop - self._start
+        if index < 0:
+            index += length
+        if not 0 <= index < length:
+            raise IndexError("history index out of range")
+        return self._entries[self._outcomes[self._start + index]]
+
+    def __iter__(self):
+        entries = self._entries
+        for code in self._outcomes[self._start:self._stop]:
+            yield entries[code]
+
+    def __reversed__(self):
+        entries = self._entries
+        for code in reversed(self._outcomes[self._start:self._stop]):
+            yield entries[code]
+
+    def __eq__(self, other):
+        if isinstance(other, (HistoryView, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(list(self))
+
+
+class Bot:
+    # Learning agents (see AgentBot) are told the result of every round; plain strategies aren't.
+    learns = False
+    # The strategy as a finite-state machine, if it has been compiled to one (see fsm.py). Two compiled
+    # bots play each other by table lookups alone, without calling either strategy.
+    machine = None
+
+    def __init__(self, name: str, strategy: Callable[[List[Tuple[str, str]]], str], encoded: bool = False,
+                 deterministic: Optional[bool] = None, memory: Optional[int] = None, noise: Optional[float] = None):
+        self.name = name
+        self.score = 0
+        self.strategy = strategy
+        # Encoded bots see a history of (own, opponent) integer pairs and return COOPERATE or DEFECT.
+        # Everyone else gets the original string interface.
+        self.encoded = encoded
+        # True if the strategy never uses randomness, so its matches can be cached (see cache.py).
+        # None means nobody has said, and it will be detected when it matters.
+        self.deterministic = deterministic
+        # How many of the most recent rounds the strategy looks at, if it is limited. A strategy with
+        # memory=3 must make the same move (or for random bots, use the same odds) whenever the last
+        # 3 rounds are the same. It may still treat the first rounds specially, since the history is
+        # shorter than 3 there.
+        self.memory = memory
+        # This bot's chance of having its move flipped. None uses the game's noise.
+        self.noise = noise
+
+    def make_move(self, history: List[Tuple[str, str]]) -> str:
+        return self.strategy(history)
+
+    def make_code(self, history) -> int:
+        # Compatibility layer between the integer engine and string based strategies.
+        move = self.strategy(history)
+        if self.encoded:
+            if move == COOPERATE or move == DEFECT:
+                return move
+        elif move in MOVE_CODES:
+            return MOVE_CODES[move]
+        raise ValueError(f"Bot {self.name!r} returned an invalid move: {move!r}")
+
+    def mirror(self) -> 'Bot':
+        # Another instance of the same strategy, for a bot that plays itself or is entered more than
+        # once, so they don't share whatever state a match gives them. It starts with no score of its
+        # own. Copied attribute by attribute, not pickled, so a lazily loaded strategy stays loaded.
+        other = object.__new__(type(self))
+        other.__dict__.update(self.__dict__)
+        other.score = 0
+        return other
+
+    # Called by the engine around every match. Plain strategies have nothing to do here.
+    def start_match(self):
+        pass
+
+    def observe(self, reward: int, history):
+        pass
+
+    def end_match(self):
+        pass
+
+
+class Agent:
+    """Base class for bots that keep state between rounds, like learning agents.
+
+    make_move(history) works like an ordinary strategy. Around it the engine calls:
+    reset() before every match, observe(reward, history) after every round, with the points just
+    scored and the history now including that round (so history[-1] is the round that was just
+    played, no need to look any further back), and finish() once the match is over.
+    """
+    name = "Agent"
+
+    def reset(self):
+        pass
+
+    def make_move(self, history) -> str:
+        raise NotImplementedError
+
+    def observe(self, reward: int, history):
+        pass
+
+    def finish(self):
+        pass
+
+
+class AgentBot(Bot):
+    """A Bot backed by an Agent, built by calling make_agent().
+
+    By default every match gets a brand new agent. With persistent=True the same agent (and whatever
+    it learned) carries on from match to match and tournament to tournament; save() and load() keep it
+    on disk between runs. Worker processes and threads get their own copies, so a persistent agent
+    only keeps learning across matches in a single-process tournament (workers=1).
+    """
+    learns = True
+
+    def __init__(self, name: str, make_agent: Callable[[], Agent], persistent: bool = False, encoded: bool = False,
+                 noise: Optional[float] = None):
+        super().__init__(name, self._agent_move, encoded, deterministic=False, noise=noise)
+        self.make_agent = make_agent
+        self.persistent = persistent
+        self.agent = None
+
+    def _agent_move(self, history):
+        return self.agent.make_move(history)
+
+    def mirror(self) -> 'AgentBot':
+        # The mirror gets an agent of its own. A persistent one starts from a copy of what this one has
+        # learned, and whatever it learns itself is thrown away with it.
+        other = super().mirror()
+        other.strategy = other._agent_move
+        other.agent = copy.deepcopy(self.agent) if self.persistent else None
+        return other
+
+    def start_match(self):
+        if self.agent is None or not self.persistent:
+            self.agent = self.make_agent()
+        self.agent.reset()
+
+    def observe(self, reward: int, history):
+        self.agent.observe(reward, history)
+
+    def end_match(self):
+        self.agent.finish()
+
+    def save(self, path: str):
+        with open(path, 'wb') as f:
+            pickle.dump(self.agent, f)
+
+    def load(self, path: str):
+        with open(path, 'rb') as f:
+            self.agent = pickle.load(f)
+
+
+def noise_rates(game: PrisonersDilemma, bot1: Bot, bot2: Bot) -> Tuple[float, float]:
+    return (game.noise if bot1.noise is None else bot1.noise,
+            game.noise if bot2.noise is None else bot2.noise)
+
+
+def flip_mask(rate: float, rounds: int, rng: random.Random) -> bytearray:
+    # Which rounds get their move flipped, drawn for the whole match up front. Instead of one draw
+    # per round, the gaps between flips are drawn (they follow a geometric distribution), so a match
+    # with 1% noise needs about one draw per hundred rounds.
+    mask = bytearray(rounds)
+    if rate <= 0:
+        return mask
+    if rate >= 1:
+        return bytearray(b'\x01') * rounds
+    log_keep = math.log(1 - rate)
+    r = -1
+    while True:
+        r += 1 + int(math.log(1.0 - rng.random()) / log_keep)
+        if r >= rounds:
+            return mask
+        mask[r] = 1
+
+
+def cycle_window(bot1: Bot, bot2: Bot) -> Optional[int]:
+    # Two deterministic bots that only look at the last few rounds must eventually repeat
+    # themselves. Returns how many rounds make up the match's state, or None if it can't cycle.
+    if bot1.deterministic and bot2.deterministic and bot1.memory is not None and bot2.memory is not None:
+        return max(bot1.memory, bot2.memory)
+    return None
+
+
+def _cycle_counts(outcomes: array, start: int, end: int, rounds: int) -> List[int]:
+    # Rounds start..end-1 repeat forever, so the remaining rounds are whole copies of that cycle plus a
+    # partial one. Returns the outcome counts for the full match without playing it.
+    period = end - start
+    repeats, leftover = divmod(rounds - end, period)
+    played, cycle, tail = outcomes[:end], outcomes[start:end], outcomes[start:start + leftover]
+    return [played.count(code) + repeats * cycle.count(code) + tail.count(code) for code in range(4)]
+
+
+def format_score(value) -> str:
+    # Scores can be fractions (payoffs don't have to be whole numbers), but whole ones are written
+    # without a decimal point, as they always were.
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def match_summary(outcomes: array) -> Tuple[List[int], List[int]]:
+    # A match boiled down to how often each outcome code happened and how often each code followed
+    # each other one: transitions[4 * previous + next]. That's all summary.py needs, and it is the
+    # same size however long the match was.
+    transitions = [0] * 16
+    for previous, following in zip(outcomes, outcomes[1:]):
+        transitions[4 * previous + following] += 1
+    return [outcomes.count(code) for code in range(4)], transitions
+
+
+# Bots call the random module's functions (random.random(), random.choice(), ...), which all share
+# one generator. So that matches in different threads can each have their own, while a match with its
+# own generator (play_match's rng) is being played those functions are replaced by ones that use the
+# generator of the match the calling thread is playing, and the shared generator otherwise, exactly as
+# before. Once no such match is left the random module gets its own functions back.
+_match_random = threading.local()
+_routing_lock = threading.Lock()
+_routing_matches = 0
+RANDOM_FUNCTIONS = ('random', 'uniform', 'triangular', 'randint', 'randrange', 'choice', 'choices', 'sample',
+                    'shuffle', 'getrandbits', 'randbytes', 'gauss', 'normalvariate', 'lognormvariate',
+                    'expovariate', 'vonmisesvariate', 'gammavariate', 'betavariate', 'paretovariate',
+                    'weibullvariate')
+
+
+def _routed(name: str, shared: Callable) -> Callable:
+    def function(*args, **kwargs):
+        rng = getattr(_match_random, 'rng', None)
+        return shared(*args, **kwargs) if rng is None else getattr(rng, name)(*args, **kwargs)
+    function.__name__ = function.__qualname__ = name
+    function.__doc__ = shared.__doc__
+    function.shared = shared
+    return function
+
+
+def _start_routing():
+    global _routing_matches
+    with _routing_lock:
+        if _routing_matches == 0:
+            for name in RANDOM_FUNCTIONS:
+                if hasattr(random, name) and not hasattr(getattr(random, name), 'shared'):
+                    setattr(random, name, _routed(name, getattr(random, name)))
+        _routing_matches += 1
+
+
+def _stop_routing():
+    global _routing_matches
+    with _routing_lock:
+        _routing_matches -= 1
+        if _routing_matches == 0:
+            for name in RANDOM_FUNCTIONS:
+                function = getattr(random, name, None)
+                if hasattr(function, 'shared'):
+                    setattr(random, name, function.shared)
+
+
+# What happens when a strategy raises an error (see play_match's on_error, and sandbox.py):
+#   'defect'     that move counts as a defection and the match goes on.
+#   'forfeit'    the match stops: the bot scores 0 and its opponent scores as if both had cooperated
+#                every round.
+FORFEIT_POLICIES = ('defect', 'forfeit')
+
+
+class Forfeit(BaseException):
+    # A BaseException, so a strategy's own `except Exception` can't swallow it.
+    def __init__(self, side: int, played: int):
+        super().__init__(side, played)
+        self.side = side
+        self.played = played
+
+
+def forfeit_scores(game: PrisonersDilemma, rounds: int, side: Optional[int]) -> Tuple[int, int]:
+    # The scores of a match that `side` (0 for bot1, 1 for bot2) forfeited. None means nobody can be
+    # blamed, and both get nothing.
+    if side is None:
+        return 0, 0
+    scores = [0, 0]
+    scores[1 - side] = rounds * game.payoffs[COOPERATE][COOPERATE][1 - side]
+    return tuple(scores)
+
+
+class _Guard:
+    """Catches one bot's errors for the length of a match and applies a forfeit policy to them."""
+
+    def __init__(self, bot: Bot, policy: str, side: int, faults: Optional[list]):
+        self.bot = bot
+        self.policy = policy
+        self.side = side
+        self.faults = faults
+        self.failed = False
+        self.make_code = bot.make_code
+        self.observe = bot.observe
+        bot.make_code = self.guarded_make_code
+        if bot.learns:
+            bot.observe = self.guarded_observe
+
+    def _fail(self, error: Exception, played: int):
+        # Only the first error of a match is logged, like the sandbox's faults.
+        if not self.failed and self.faults is not None:
+            self.faults.append((self.side, f'error: {type(error).__name__}: {error}'))
+        self.failed = True
+        if self.policy == 'forfeit':
+            raise Forfeit(self.side, played)
+
+    def guarded_make_code(self, history) -> int:
+        try:
+            return self.make_code(history)
+        except Exception as error:
+            self._fail(error, len(history))
+            return DEFECT
+
+    def guarded_observe(self, reward: int, history):
+        try:
+            self.observe(reward, history)
+        except Exception as error:
+            self._fail(error, len(history))
+
+    def remove(self):
+        self.bot.__dict__.pop('make_code', None)
+        self.bot.__dict__.pop('observe', None)
+
+
+def play_match(game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int, seed: Optional[int] = None,
+               outcomes: Optional[array] = None, rng: Optional[random.Random] = None,
+               on_error: Optional[str] = None, faults: Optional[list] = None) -> Tuple[int, int]:
+    # Plays one match and returns the scores without touching Bot.score.
+    # With an rng, everything random in the match (the bots' random module calls and the noise) comes
+    # from it and nothing else, so matches can be played side by side in threads. Without one they use
+    # the random module's shared generator, which the caller can seed.
+    # seed only matters for noise; without one it is drawn from the match's random numbers.
+    # Pass outcomes (an array('b') of length rounds) to get every round's outcome code written into it.
+    # A bot can play itself: the second side is then a mirror of it, see Bot.mirror.
+    # With on_error (one of FORFEIT_POLICIES) a strategy that raises an error doesn't stop everything:
+    # the policy decides what happens, and (side, what went wrong) goes into faults if given. A
+    # forfeited match's outcomes are cut off after the last round played.
+    if bot2 is bot1:
+        bot2 = bot1.mirror()
+    if on_error is not None and on_error not in FORFEIT_POLICIES:
+        raise ValueError(f"on_error must be one of {FORFEIT_POLICIES}, not {on_error!r}")
+    previous = getattr(_match_random, 'rng', None)
+    if rng is not None:
+        _start_routing()
+        _match_random.rng = rng
+    guards = (_Guard(bot1, on_error, 0, faults), _Guard(bot2, on_error, 1, faults)) if on_error else ()
+    try:
+        bot1.start_match()
+        bot2.start_match()
+        try:
+            return _play_rounds(game, bot1, bot2, rounds, seed, outcomes)
+        finally:
+            bot1.end_match()
+            bot2.end_match()
+    except Forfeit as forfeit:
+        if not guards:
+            raise
+        if outcomes is not None:
+            del outcomes[forfeit.played:]
+        return forfeit_scores(game, rounds, forfeit.side)
+    finally:
+        for guard in guards:
+            guard.remove()
+        _match_random.rng = previous
+        if rng is not None:
+            _stop_routing()
+
+
+def _play_rounds(game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int, seed: Optional[int],
+                 outcomes: Optional[array] = None) -> Tuple[int, int]:
+    # The whole match is stored in one preallocated byte array, one outcome code (2 * move1 + move2) per round.
+    recording = outcomes is not None
+    if not recording:
+        outcomes = array('b', bytes(rounds))
+    # Both bots look at that same buffer. In each view the first element is always the bot's own move.
+    history1 = HistoryView(outcomes, PLAYER1_CODES if bot1.encoded else PLAYER1_NAMES)
+    history2 = HistoryView(outcomes, PLAYER2_CODES if bot2.encoded else PLAYER2_NAMES)
+    noise1, noise2 = noise_rates(game, bot1, bot2)
+    learns1, learns2 = bot1.learns, bot2.learns
+    flips1 = flips2 = None
+    if noise1 or noise2:
+        rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        flips1 = flip_mask(noise1, rounds, rng) if noise1 else bytes(rounds)
+        flips2 = flip_mask(noise2, rounds, rng) if noise2 else bytes(rounds)
+    if bot1.machine is not None and bot2.machine is not None and not (learns1 or learns2):
+        return _play_machines(game, bot1.machine, bot2.machine, rounds, outcomes, recording, flips1, flips2)
+    if noise1 or noise2 or learns1 or learns2:
+        if flips1 is None:
+            flips1 = flips2 = bytes(rounds)
+        payoffs = game.payoffs
+        # Both bots see the moves that were actually played, flips included.
+        for r in range(rounds):
+            move1 = bot1.make_code(history1) ^ flips1[r]
+            move2 = bot2.make_code(history2) ^ flips2[r]
+            outcomes[r] = 2 * move1 + move2
+            history1._stop = history2._stop = r + 1
+            if learns1:
+                bot1.observe(payoffs[move1][move2][0], history1)
+            if learns2:
+                bot2.observe(payoffs[move1][move2][1], history2)
+        return game.total_scores([outcomes.count(code) for code in range(4)])
+
+    window = cycle_window(bot1, bot2)
+    if window is None:
+        for r in range(rounds):
+            move1 = bot1.make_code(history1)
+            move2 = bot2.make_code(history2)
+            outcomes[r] = 2 * move1 + move2
+            history1._stop = history2._stop = r + 1
+        return game.total_scores([outcomes.count(code) for code in range(4)])
+
+    # Same loop, but watching for the last `window` rounds to repeat. Once they do the rest of the
+    # match is known, so a million round match finishes after a handful of rounds.
+    seen = {}
+    for r in range(rounds):
+        if r >= window:
+            state = outcomes[r - window:r].tobytes()
+            if state in seen:
+                return _finish_cycle(game, outcomes, seen[state], r, rounds, recording)
+            seen[state] = r
+        move1 = bot1.make_code(history1)
+        move2 = bot2.make_code(history2)
+        outcomes[r] = 2 * move1 + move2
+        history1._stop = history2._stop = r + 1
+    return game.total_scores([outcomes.count(code) for code in range(4)])
+
+
+def _finish_cycle(game: PrisonersDilemma, outcomes: array, start: int, end: int, rounds: int,
+                  recording: bool) -> Tuple[int, int]:
+    # Rounds start..end-1 repeat for the rest of the match: score it without playing on.
+    if recording:
+        # Nobody plays the rest of the match, but whoever asked for it still gets it in full.
+        period = end - start
+        for k in range(end, rounds):
+            outcomes[k] = outcomes[k - period]
+    return game.total_scores(_cycle_counts(outcomes, start, end, rounds))
+
+
+def _play_machines(game: PrisonersDilemma, machine1, machine2, rounds: int, outcomes: array, recording: bool,
+                   flips1: Optional[bytes] = None, flips2: Optional[bytes] = None) -> Tuple[int, int]:
+    # Two compiled strategies: every round is two lookups for the moves and two for the next states.
+    # Transition tables are indexed by 4 * state + the outcome code seen from that machine's own side.
+    moves1, next1 = machine1.moves, machine1.transitions
+    moves2, next2 = machine2.moves, machine2.transitions
+    state1, state2 = machine1.start, machine2.start
+    if flips1 is not None:
+        for r in range(rounds):
+            move1 = moves1[state1] ^ flips1[r]
+            move2 = moves2[state2] ^ flips2[r]
+            outcomes[r] = 2 * move1 + move2
+            state1 = next1[4 * state1 + 2 * move1 + move2]
+            state2 = next2[4 * state2 + 2 * move2 + move1]
+        return game.total_scores([outcomes.count(code) for code in range(4)])
+
+    # Without noise the pair of states decides everything that follows, so the match is in a cycle
+    # as soon as a pair comes back, at the latest after len(machine1) * len(machine2) rounds.
+    seen = {}
+    for r in range(rounds):
+        pair = (state1, state2)
+        if pair in seen:
+            return _finish_cycle(game, outcomes, seen[pair], r, rounds, recording)
+        seen[pair] = r
+        move1 = moves1[state1]
+        move2 = moves2[state2]
+        outcomes[r] = 2 * move1 + move2
+        state1 = next1[4 * state1 + 2 * move1 + move2]
+        state2 = next2[4 * state2 + 2 * move2 + move1]
+    return game.total_scores([outcomes.count(code) for code in range(4)])
+
+
+def run_simulation(game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int, seed: Optional[int] = None) -> Tuple[int, int]:
+    gamescore1, gamescore2 = play_match(game, bot1, bot2, rounds, seed)
+    bot1.score += gamescore1
+    bot2.score += gamescore2
+    return gamescore1, gamescore2
@@ -0,0 +1,122 @@
+import csv
+import random
+from typing import List, Optional
+
+import numpy as np
+
+from cache import MatchCache
+from engine import PrisonersDilemma, Bot
+from tournament import round_robin
+
+# Evolutionary versions of the tournament. Instead of one round robin, bots are species in a
+# population and the ones that score well grow. Matches are never replayed here: everything runs
+# off a matrix of average matchup scores, so a generation is a little linear algebra.
+
+
+def matchup_matrix(game: PrisonersDilemma, bots: List[Bot], rounds: int = 100, repetitions: int = 1,
+                   seed: Optional[int] = None, workers: Optional[int] = None) -> np.ndarray:
+    """Average score of each bot against each other bot, themselves included.
+
+    result[i, j] is what bot i scores against bot j in one match, averaged over `repetitions`
+    round robins. Bot.score is left as it was.
+    """
+    rng = random.Random(seed)
+    cache = MatchCache()
+    count = len(bots)
+    totals = np.zeros((count, count))
+    starting_scores = [bot.score for bot in bots]
+    try:
+        for _ in range(repetitions):
+            tournament_seed = rng.randrange(2 ** 32)
+            # With self-play, since a population is mostly made of bots meeting their own kind.
+            for (i, j), (score1, score2) in round_robin(game, bots, rounds, seed=tournament_seed, workers=workers,
+                                                        cache=cache, self_play=True).items():
+                totals[i, j] += score1
+                if j != i:
+                    totals[j, i] += score2
+    finally:
+        for bot, score in zip(bots, starting_scores):
+            bot.score = score
+    return totals / repetitions
+
+
+def replicator(payoffs: np.ndarray, generations: int = 10000, shares: Optional[np.ndarray] = None,
+               record_every: int = 1) -> np.ndarray:
+    """Discrete replicator dynamics (an "ecological tournament").
+
+    Each generation a species' share grows in proportion to its average score against the current
+    population. Starts from equal shares unless given. Returns the shares every `record_every`
+    generations, first row being the start.
+    """
+    payoffs = np.asarray(payoffs, dtype=np.float64)
+    if (payoffs < 0).any():
+        raise ValueError("replicator dynamics needs non-negative payoffs")
+    count = len(payoffs)
+    shares = np.full(count, 1 / count) if shares is None else np.asarray(shares, dtype=np.float64) / np.sum(shares)
+    records = [shares]
+    for generation in range(1, generations + 1):
+        fitness = payoffs @ shares
+        average = shares @ fitness
+        if average <= 0:
+            break
+        shares = shares * fitness / average
+        if generation % record_every == 0:
+            records.append(shares)
+    return np.array(records)
+
+
+def moran(payoffs: np.ndarray, population: int = 100, steps: int = 10000, counts: Optional[np.ndarray] = None,
+          selection: float = 1.0, seed: Optional[int] = None, record_every: int = 1) -> np.ndarray:
+    """Frequency-dependent Moran process in a population of `population` bots.
+
+    Each step one bot, picked in proportion to its fitness, reproduces and a random bot dies. A bot's
+    fitness is 1 - selection + selection * (its average score against everyone else in the population).
+    Stops early once a single species is left. Returns the species counts every `record_every` steps.
+    """
+    payoffs = np.asarray(payoffs, dtype=np.float64)
+    count = len(payoffs)
+    if counts is None:
+        counts = np.bincount(np.arange(population) % count, minlength=count)
+    counts = np.asarray(counts, dtype=np.int64).copy()
+    population = int(counts.sum())
+    if population < 2:
+        raise ValueError("a Moran process needs at least two bots")
+    rng = random.Random(seed)
+    species = range(count)
+    # Total score of one member of each species against the whole population, itself excluded.
+    # A birth or death only changes one column, so this is updated instead of recomputed.
+    totals = payoffs @ counts - np.diag(payoffs)
+    records = [counts.copy()]
+    for step in range(1, steps + 1):
+        fitness = 1 - selection + selection * totals / (population - 1)
+        parent = rng.choices(species, weights=(counts * fitness).tolist())[0]
+        dead = rng.choices(species, weights=counts.tolist())[0]
+        if parent != dead:
+            counts[parent] += 1
+            counts[dead] -= 1
+            totals += payoffs[:, parent] - payoffs[:, dead]
+        if step % record_every == 0:
+            records.append(counts.copy())
+        if counts[parent] == population:
+            if step % record_every:
+                records.append(counts.copy())
+            break
+    return np.array(records)
+
+
+def save_shares(bots: List[Bot], shares: np.ndarray, path: str = 'evolution.csv'):
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Bot", "Share"])
+        for k in np.argsort(shares)[::-1]:
+            writer.writerow([bots[k].name, shares[k]])
+
+
+if __name__ == "__main__":
+    from version1 import make_bots
+
+    bots = make_bots()
+    payoffs = matchup_matrix(PrisonersDilemma(), bots, repetitions=10)
+    shares = replicator(payoffs, generations=10000, record_every=10000)[-1]
+    save_shares(bots, shares)
+    print("Population shares after 10000 generations have been saved to 'evolution.csv'")
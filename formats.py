@@ -0,0 +1,239 @@
+import argparse
+import math
+import random
+from typing import Dict, List, Optional, Set, Tuple
+
+from engine import PrisonersDilemma, Bot
+from tournament import Pairing, round_robin, pairings
+
+# Tournament formats that need far fewer matches than a round robin, for rosters too big to play
+# everyone against everyone (5,000 bots is 12.5 million matches):
+#
+#   swiss        a few rounds; each round, bots are paired with the closest bot by running score they
+#                haven't met yet. About N / 2 matches per round.
+#   sampled      every bot plays k opponents picked at random. Its average score is an unbiased
+#                estimate of its round robin average, with a standard error to go with it.
+#   elimination  a knockout bracket: whoever scores more in a match goes through. N - 1 matches.
+#
+# Every match is played by tournament.round_robin with the same seed and in the same order as in the
+# round robin, so a format plays exactly the matches the round robin would have; the only thing it
+# gets wrong is which matches it leaves out. accuracy() measures that against a full round robin.
+
+
+class FormatResult:
+    """What a format came up with. scores[i] estimates bot i's round robin total (its average score
+    per match times N - 1); ranking lists the bots from first to last."""
+
+    def __init__(self, name: str, ranking: List[int], scores: List[float], matches: int,
+                 errors: Optional[List[float]] = None):
+        self.name = name
+        self.ranking = ranking
+        self.scores = scores
+        self.matches = matches
+        # The standard error of each score, where the format can tell.
+        self.errors = errors
+
+    def __repr__(self):
+        return f"FormatResult({self.name!r}, {len(self.ranking)} bots, {self.matches} matches)"
+
+
+class _Ledger:
+    # Plays batches of pairings and keeps every bot's total score and number of matches.
+
+    def __init__(self, game: PrisonersDilemma, bots: List[Bot], rounds: int, seed: int, workers: Optional[int]):
+        self.game, self.bots, self.rounds, self.seed, self.workers = game, bots, rounds, seed, workers
+        self.totals = [0] * len(bots)
+        self.played = [0] * len(bots)
+        self.met: Set[Pairing] = set()
+
+    def play(self, pairs: List[Pairing]) -> Dict[Pairing, Tuple[int, int]]:
+        # Pairs are put in round robin order (i < j), so every match is seeded just as it would be there.
+        pairs = [(min(i, j), max(i, j)) for i, j in pairs]
+        starting_scores = [bot.score for bot in self.bots]
+        try:
+            results = round_robin(self.game, self.bots, self.rounds, seed=self.seed, workers=self.workers,
+                                  pairs=pairs)
+        finally:
+            for bot, score in zip(self.bots, starting_scores):
+                bot.score = score
+        for (i, j), (score1, score2) in results.items():
+            self.totals[i] += score1
+            self.totals[j] += score2
+            self.played[i] += 1
+            self.played[j] += 1
+            self.met.add((i, j))
+        return results
+
+    def average(self, i: int) -> float:
+        return self.totals[i] / self.played[i] if self.played[i] else 0.0
+
+    def estimates(self) -> List[float]:
+        return [self.average(i) * (len(self.bots) - 1) for i in range(len(self.bots))]
+
+
+def _ranked(scores: List[float]) -> List[int]:
+    return sorted(range(len(scores)), key=lambda i: -scores[i])
+
+
+def swiss(game: PrisonersDilemma, bots: List[Bot], rounds: int, swiss_rounds: Optional[int] = None,
+          seed: Optional[int] = None, workers: Optional[int] = None) -> FormatResult:
+    """A Swiss tournament, by default of ceil(log2 N) + 2 rounds. With an odd number of bots, the lowest
+    placed bot that hasn't had a bye yet sits each round out."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    count = len(bots)
+    swiss_rounds = math.ceil(math.log2(max(count, 2))) + 2 if swiss_rounds is None else swiss_rounds
+    rng = random.Random(seed)
+    ledger = _Ledger(game, bots, rounds, seed, workers)
+    had_bye: Set[int] = set()
+    # Random tie breaks, so the first round's pairings (everyone on 0) are random too.
+    tie_break = [rng.random() for _ in range(count)]
+    for _ in range(swiss_rounds):
+        standing = sorted(range(count), key=lambda i: (-ledger.average(i), tie_break[i]))
+        if count % 2:
+            bye = next((i for i in reversed(standing) if i not in had_bye), standing[-1])
+            had_bye.add(bye)
+            standing.remove(bye)
+        pairs, waiting = [], list(standing)
+        while waiting:
+            first = waiting.pop(0)
+            # The nearest bot in the standings it hasn't met yet. One that has met everyone left sits out.
+            partner = next((k for k, other in enumerate(waiting)
+                            if (min(first, other), max(first, other)) not in ledger.met), None)
+            if partner is not None:
+                pairs.append((first, waiting.pop(partner)))
+        if not pairs:
+            break
+        ledger.play(pairs)
+    scores = ledger.estimates()
+    return FormatResult('swiss', _ranked(scores), scores, len(ledger.met))
+
+
+def sampled(game: PrisonersDilemma, bots: List[Bot], rounds: int, opponents: int = 10, seed: Optional[int] = None,
+            workers: Optional[int] = None) -> FormatResult:
+    """Every bot plays `opponents` others (rounded up to an even number), drawn at random.
+
+    The bots are put in a random circle, and each of opponents / 2 random distances d pairs every bot
+    with the ones d places ahead and behind it. Everyone plays the same number of matches and no
+    pairing is played twice, and for any one bot its opponents are a uniformly random set, so its
+    average score is an unbiased estimate of its round robin average.
+    """
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    count = len(bots)
+    rng = random.Random(seed)
+    circle = list(range(count))
+    rng.shuffle(circle)
+    # Distances up to (count - 1) / 2 are all different pairings; count / 2 would pair everyone twice.
+    distances = rng.sample(range(1, (count + 1) // 2), min((opponents + 1) // 2, (count - 1) // 2))
+    pairs = [(circle[k], circle[(k + distance) % count]) for distance in distances for k in range(count)]
+    ledger = _Ledger(game, bots, rounds, seed, workers)
+    results = ledger.play(pairs)
+    # Standard errors from each bot's own scores, with the finite population correction: the more of
+    # the roster a bot has played, the less its average can be off.
+    squares = [0.0] * count
+    for (i, j), (score1, score2) in results.items():
+        squares[i] += (score1 - ledger.average(i)) ** 2
+        squares[j] += (score2 - ledger.average(j)) ** 2
+    errors = []
+    for i in range(count):
+        n = ledger.played[i]
+        if n < 2:
+            errors.append(float('inf'))
+            continue
+        variance = squares[i] / (n - 1)
+        correction = max(0.0, 1 - n / (count - 1))
+        errors.append(math.sqrt(variance / n * correction) * (count - 1))
+    scores = ledger.estimates()
+    return FormatResult('sampled', _ranked(scores), scores, len(ledger.met), errors)
+
+
+def elimination(game: PrisonersDilemma, bots: List[Bot], rounds: int, seed: Optional[int] = None,
+                workers: Optional[int] = None) -> FormatResult:
+    """A single elimination bracket in random order. The winner of a match is whoever scored more in
+    it (a tie is settled by a coin toss). Bots are ranked by how far they got, then by average score."""
+    seed = random.randrange(2 ** 32) if seed is None else seed
+    rng = random.Random(seed)
+    alive = list(range(len(bots)))
+    rng.shuffle(alive)
+    ledger = _Ledger(game, bots, rounds, seed, workers)
+    reached = [0] * len(bots)
+    stage = 0
+    while len(alive) > 1:
+        stage += 1
+        pairs = [(alive[k], alive[k + 1]) for k in range(0, len(alive) - 1, 2)]
+        results = ledger.play(pairs)
+        winners = []
+        for first, second in pairs:
+            i, j = min(first, second), max(first, second)
+            score1, score2 = results[(i, j)]
+            winners.append(i if score1 > score2 else j if score2 > score1 else rng.choice((i, j)))
+        # An odd one out goes through without playing.
+        alive = winners + alive[len(pairs) * 2:]
+        for i in alive:
+            reached[i] = stage
+    scores = ledger.estimates()
+    ranking = sorted(range(len(bots)), key=lambda i: (-reached[i], -scores[i]))
+    return FormatResult('elimination', ranking, scores, len(ledger.met))
+
+
+def _positions(ranking: List[int]) -> List[int]:
+    positions = [0] * len(ranking)
+    for place, i in enumerate(ranking):
+        positions[i] = place
+    return positions
+
+
+def accuracy(result: FormatResult, totals: List[float], top: int = 10) -> Dict[str, float]:
+    """How close a format's ranking is to the round robin's, given every bot's round robin total.
+
+    spearman        rank correlation between the two rankings (1 is the same order)
+    top_overlap     the share of the round robin's top `top` the format also puts in its top `top`
+    mean_rank_error how many places a bot is off by, on average
+    score_error     the root mean square error of the estimated totals (for the formats that estimate them)
+    match_share     the format's matches as a share of the round robin's
+    """
+    count = len(totals)
+    true_ranking = _ranked(totals)
+    estimated = _positions(result.ranking)
+    actual = _positions(true_ranking)
+    squared = sum((estimated[i] - actual[i]) ** 2 for i in range(count))
+    spearman = 1 - 6 * squared / (count * (count ** 2 - 1)) if count > 1 else 1.0
+    top = min(top, count)
+    overlap = len(set(result.ranking[:top]) & set(true_ranking[:top])) / top if top else 1.0
+    score_error = math.sqrt(sum((result.scores[i] - totals[i]) ** 2 for i in range(count)) / count)
+    return {'spearman': spearman, 'top_overlap': overlap,
+            'mean_rank_error': sum(abs(estimated[i] - actual[i]) for i in range(count)) / count,
+            'score_error': score_error, 'match_share': result.matches / max(len(pairings(count)), 1)}
+
+
+def round_robin_totals(game: PrisonersDilemma, bots: List[Bot], rounds: int, seed: int,
+                       workers: Optional[int] = None) -> List[float]:
+    # The full round robin to compare with, leaving Bot.score as it was.
+    ledger = _Ledger(game, bots, rounds, seed, workers)
+    ledger.play(pairings(len(bots)))
+    return ledger.totals
+
+
+if __name__ == "__main__":
+    from version1 import registry
+
+    parser = argparse.ArgumentParser(description="Compare the tournament formats with a full round robin.")
+    parser.add_argument('--copies', type=int, default=4, help="instances of every bot in the roster")
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--opponents', type=int, default=10, help="opponents per bot in the sampled format")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    names = registry().names()
+    bots = [registry().make_bot(name) for _ in range(args.copies) for name in names]
+    game = PrisonersDilemma()
+    totals = round_robin_totals(game, bots, args.rounds, args.seed, args.workers)
+    results = [swiss(game, bots, args.rounds, seed=args.seed, workers=args.workers),
+               sampled(game, bots, args.rounds, args.opponents, seed=args.seed, workers=args.workers),
+               elimination(game, bots, args.rounds, seed=args.seed, workers=args.workers)]
+    print(f"{len(bots)} bots, {len(pairings(len(bots)))} matches in the round robin")
+    print(f"{'Format':<14}{'Matches':>9}{'Share':>8}{'Spearman':>10}{'Top 10':>8}{'Rank error':>12}{'Score RMSE':>12}")
+    for result in results:
+        report = accuracy(result, totals)
+        print(f"{result.name:<14}{result.matches:>9}{report['match_share']:>8.1%}{report['spearman']:>10.3f}"
+              f"{report['top_overlap']:>8.0%}{report['mean_rank_error']:>12.1f}{report['score_error']:>12.1f}")
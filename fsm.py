@@ -0,0 +1,242 @@
+import itertools
+import random
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from engine import Bot, HistoryView, PLAYER1_CODES, PLAYER1_NAMES, COOPERATE, DEFECT, MOVE_NAMES
+from cache import is_deterministic
+
+# Compiles strategies into finite-state machines. Most bots only look at how many rounds have been
+# played and at the last few rounds (Rock_3, doggo, Bains2, exploitnoobs, ...), so what they do is a
+# function of a small state:
+#
+#   phase    the round number, counted up to `prefix` and from there on round and round a cycle of
+#            `period` phases (Bains2 needs the round number's parity: prefix 1, period 2)
+#   window   the outcome codes of the last `memory` rounds, seen from the bot's own side
+#
+# compile_bot asks the bot what it does after every possible history of up to `depth` rounds, and
+# after some long ones, and looks for the smallest (memory, prefix, period) that explains every
+# answer. If one does, the bot becomes a table: moves[state] and transitions[4 * state + outcome].
+# Two compiled bots then play a match with no Python call and no history at all (see
+# engine._play_machines). It's a guess, like cache.is_deterministic: a bot that only changes its
+# mind after 50 defections in a row can fool it, so only compile bots that are meant to be simple.
+
+DEPTH = 8
+MAX_MEMORY = 4
+
+# History entries (names or codes, as the bot sees them) to the outcome code from the bot's own side.
+ENTRY_CODES = {entry: code for entries in (PLAYER1_NAMES, PLAYER1_CODES) for code, entry in enumerate(entries)}
+
+
+class NotCompilable(ValueError):
+    pass
+
+
+class Machine:
+    """A compiled strategy. State 0 is the start of a match."""
+
+    def __init__(self, memory: int, prefix: int, period: int, keys: List[tuple], moves: List[int],
+                 transitions: List[int]):
+        self.memory = memory
+        self.prefix = prefix
+        self.period = period
+        self.start = 0
+        # keys[state] is the (phase, window) it stands for.
+        self.keys = keys
+        self.index = {key: state for state, key in enumerate(keys)}
+        self.moves = bytes(moves)
+        self.transitions = array('i', transitions)
+
+    def __len__(self) -> int:
+        return len(self.moves)
+
+    def phase(self, played: int) -> int:
+        if played < self.prefix:
+            return played
+        return self.prefix + (played - self.prefix) % self.period
+
+    def state_of(self, history) -> int:
+        played = len(history)
+        window = tuple(ENTRY_CODES[entry] for entry in history[max(0, played - self.memory):]) if self.memory else ()
+        return self.index[(self.phase(played), window)]
+
+    def move(self, history) -> int:
+        return self.moves[self.state_of(history)]
+
+    def window_memory(self) -> Optional[int]:
+        # The Bot.memory this machine has, if any: the last rounds it needs to tell its states apart.
+        # A counter that never cycles back only tells the first `prefix` rounds apart, which a window
+        # that long does too; a repeating counter needs the whole history.
+        if self.period != 1:
+            return None
+        return max(self.memory, self.prefix)
+
+    def __repr__(self):
+        return f"Machine({len(self)} states, memory={self.memory}, prefix={self.prefix}, period={self.period})"
+
+
+class CompiledBot(Bot):
+    """A bot that moves by its machine instead of calling its strategy.
+
+    The original bot is kept (and is what gets pickled), so the strategy is still there for anyone
+    who wants it, and the match cache treats both as the same strategy.
+    """
+
+    machine: Machine
+
+    def __init__(self, bot: Bot, machine: Machine):
+        self.bot = bot
+        memory = machine.window_memory()
+        super().__init__(bot.name, bot.strategy, bot.encoded, deterministic=True,
+                         memory=bot.memory if memory is None else memory, noise=bot.noise)
+        self.machine = machine
+        self._state, self._played = machine.start, 0
+
+    @property
+    def strategy(self):
+        return self.bot.strategy
+
+    @strategy.setter
+    def strategy(self, strategy):
+        self.bot.strategy = strategy
+
+    def start_match(self):
+        self._state, self._played = self.machine.start, 0
+
+    def make_code(self, history) -> int:
+        # Against a bot that isn't compiled there is a history anyway. The machine follows it one round
+        # at a time, and only works its state out from scratch if it gets a history out of order.
+        machine = self.machine
+        played = len(history)
+        if played == self._played + 1:
+            self._state = machine.transitions[4 * self._state + ENTRY_CODES[history[-1]]]
+        elif played != self._played or played == 0:
+            self._state = machine.state_of(history)
+        self._played = played
+        return machine.moves[self._state]
+
+
+def _ask(bot: Bot, played: List[int]) -> int:
+    entries = PLAYER1_CODES if bot.encoded else PLAYER1_NAMES
+    return bot.make_code(HistoryView(array('b', played), entries, 0, len(played)))
+
+
+def probe(bot: Bot, depth: int = DEPTH, long_rounds: int = 200, long_runs: int = 12,
+          seed: int = 0) -> Dict[tuple, int]:
+    """The bot's move after every history of fewer than `depth` rounds, and after every prefix of a few
+    long ones: {outcome codes from the bot's side: move}.
+
+    The long histories are played against scripted opponents, half with the bot's own moves and half
+    with random ones (as noise would make them).
+    """
+    answers = {}
+    for length in range(depth):
+        for played in itertools.product(range(4), repeat=length):
+            answers[played] = _ask(bot, list(played))
+    rng = random.Random(seed)
+    scripts = [[COOPERATE] * long_rounds, [DEFECT] * long_rounds, [r % 2 for r in range(long_rounds)]]
+    scripts += [[rng.randint(0, 1) for _ in range(long_rounds)] for _ in range(long_runs - len(scripts))]
+    for run, script in enumerate(scripts * 2):
+        played = []
+        for opponent in script:
+            move = _ask(bot, played)
+            answers[tuple(played)] = move
+            if run >= len(scripts):
+                move = rng.randint(0, 1)
+            played.append(2 * move + opponent)
+    return answers
+
+
+def _candidates(depth: int, max_memory: int) -> List[Tuple[int, int, int]]:
+    # Every (memory, prefix, period) whose states all show up among histories shorter than `depth`,
+    # smallest machines first.
+    candidates = [(memory, prefix, period) for memory in range(max_memory + 1) for prefix in range(depth)
+                  for period in range(1, depth) if max(prefix, memory) + period <= depth - 1]
+    return sorted(candidates, key=lambda candidate: ((candidate[1] + candidate[2]) * 4 ** candidate[0], candidate))
+
+
+def _fits(answers: Dict[tuple, int], memory: int, prefix: int, period: int) -> Optional[Dict[tuple, int]]:
+    # The move in every (phase, window) state, or None if two histories in the same state got different answers.
+    table = {}
+    for played, move in answers.items():
+        length = len(played)
+        phase = length if length < prefix else prefix + (length - prefix) % period
+        key = (phase, played[length - memory:] if memory and length >= memory else played if memory else ())
+        known = table.setdefault(key, move)
+        if known != move:
+            return None
+    return table
+
+
+def _build(table: Dict[tuple, int], memory: int, prefix: int, period: int) -> Machine:
+    # Numbers the states reachable from the start of a match and links them up.
+    keys = [(0, ())]
+    index = {keys[0]: 0}
+    transitions = []
+    for phase, window in keys:
+        following = phase + 1 if phase + 1 < prefix + period else prefix
+        for code in range(4):
+            key = (following, (window + (code,))[-memory:] if memory else ())
+            if key not in index:
+                index[key] = len(keys)
+                keys.append(key)
+            transitions.append(index[key])
+    return Machine(memory, prefix, period, keys, [table[key] for key in keys], transitions)
+
+
+def compile_strategy(bot: Bot, depth: int = DEPTH, max_memory: int = MAX_MEMORY) -> Machine:
+    """The smallest machine that makes the same moves as the bot, or NotCompilable saying why not."""
+    if bot.learns:
+        raise NotCompilable("it learns from its payoffs")
+    if bot.machine is not None:
+        return bot.machine
+    saved_state = random.getstate()
+    try:
+        if not (bot.deterministic if bot.deterministic is not None else is_deterministic(bot)):
+            raise NotCompilable("it uses randomness")
+        try:
+            answers = probe(bot, depth)
+        except Exception as error:
+            raise NotCompilable(f"it raised {type(error).__name__}: {error}") from None
+    finally:
+        random.setstate(saved_state)
+    for memory, prefix, period in _candidates(depth, max_memory):
+        table = _fits(answers, memory, prefix, period)
+        if table is not None:
+            return _build(table, memory, prefix, period)
+    raise NotCompilable(f"no machine remembering up to {max_memory} rounds and counting up to {depth - 1} "
+                        f"rounds fits its moves")
+
+
+def compile_bot(bot: Bot, depth: int = DEPTH, max_memory: int = MAX_MEMORY) -> Bot:
+    # The compiled bot. Raises NotCompilable if it can't be.
+    if bot.machine is not None:
+        return bot
+    return CompiledBot(bot, compile_strategy(bot, depth, max_memory))
+
+
+def compile_bots(bots: List[Bot], depth: int = DEPTH, max_memory: int = MAX_MEMORY
+                 ) -> Tuple[List[Bot], Dict[str, str]]:
+    """Compiles every bot that can be. Returns the new list of bots, in the same order, and why each
+    of the others is still played as Python: {bot name: reason}."""
+    compiled, reasons = [], {}
+    for bot in bots:
+        try:
+            compiled.append(compile_bot(bot, depth, max_memory))
+        except NotCompilable as reason:
+            reasons[bot.name] = str(reason)
+            compiled.append(bot)
+    return compiled, reasons
+
+
+if __name__ == "__main__":
+    from version1 import make_bots
+
+    bots, reasons = compile_bots(make_bots())
+    for bot in bots:
+        if bot.machine is not None:
+            machine = bot.machine
+            print(f"{bot.name:<24}{len(machine):>5} states  memory {machine.memory}, prefix {machine.prefix}, "
+                  f"period {machine.period}, first move {MOVE_NAMES[machine.moves[0]]}")
+        else:
+            print(f"{bot.name:<24}  not compiled: {reasons[bot.name]}")
@@ -0,0 +1,230 @@
+import itertools
+import random
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from engine import PrisonersDilemma, Bot, MOVE_NAMES
+from tournament import Pairing, round_robin
+
+# Games other than the classic Prisoner's Dilemma. A Game is any two-player game where both players
+# choose from the same k actions, with its payoffs compiled into a dense (k, k, 2) NumPy array:
+# table[a, b] is (score of player 1, score of player 2) when player 1 plays action a and player 2
+# plays action b, so scoring a round is one index.
+#
+# Two-action games can be played by all the existing bots, with the first action standing in for
+# 'cooperate' and the second for 'defect' (Stag Hunt: stag / hare, Chicken: swerve / straight).
+#
+# Because the bots only ever see moves, never scores, the moves of a match don't depend on the
+# payoffs. So a tournament can be played once, keeping only how often each pair of actions happened
+# in every match, and then scored under thousands of payoff matrices at once (see sweep_totals).
+
+Payoffs = Union[Dict[Tuple[str, str], Tuple[float, float]], Sequence]
+
+
+class Game:
+    def __init__(self, name: str, actions: Sequence[str], payoffs: Payoffs):
+        """payoffs is either {(action1, action2): (score1, score2)} or a nested k x k list of score pairs."""
+        self.name = name
+        self.actions = tuple(actions)
+        if len(set(self.actions)) != len(self.actions) or len(self.actions) < 2:
+            raise ValueError(f"{name}: a game needs at least two actions, all with different names")
+        self.index = {action: k for k, action in enumerate(self.actions)}
+        self.table = self._compile(payoffs)
+
+    def _compile(self, payoffs: Payoffs) -> np.ndarray:
+        count = len(self.actions)
+        if isinstance(payoffs, dict):
+            missing = [pair for pair in itertools.product(self.actions, repeat=2) if pair not in payoffs]
+            if missing:
+                raise ValueError(f"{self.name}: no payoffs for {missing}")
+            unknown = [pair for pair in payoffs if not (isinstance(pair, tuple) and len(pair) == 2
+                                                        and all(action in self.index for action in pair))]
+            if unknown:
+                raise ValueError(f"{self.name}: payoffs for unknown actions {unknown}")
+            payoffs = [[payoffs[(a, b)] for b in self.actions] for a in self.actions]
+        try:
+            table = np.array(payoffs, dtype=np.float64)
+        except (TypeError, ValueError):
+            raise ValueError(f"{self.name}: the payoffs must all be numbers") from None
+        if table.shape != (count, count, 2):
+            raise ValueError(f"{self.name}: expected {count} x {count} pairs of payoffs, got shape {table.shape}")
+        if not np.isfinite(table).all():
+            raise ValueError(f"{self.name}: the payoffs must be finite")
+        return table
+
+    @classmethod
+    def symmetric(cls, name: str, actions: Sequence[str], row_payoffs: Sequence[Sequence[float]]) -> 'Game':
+        # A symmetric game from player 1's payoffs alone: player 2 gets the transpose.
+        row = np.asarray(row_payoffs, dtype=np.float64)
+        return cls(name, actions, np.stack([row, row.T], axis=-1))
+
+    @classmethod
+    def from_trps(cls, t: float, r: float, p: float, s: float, name: str = "Prisoner's Dilemma",
+                  actions: Sequence[str] = MOVE_NAMES) -> 'Game':
+        # The usual symmetric 2x2 game: R for mutual cooperation, P for mutual defection, T for
+        # defecting against a cooperator, who gets S.
+        return cls.symmetric(name, actions, [[r, s], [t, p]])
+
+    def score(self, action1: int, action2: int) -> Tuple[float, float]:
+        score1, score2 = self.table[action1, action2]
+        return float(score1), float(score2)
+
+    def total_scores(self, outcome_counts) -> np.ndarray:
+        # outcome_counts[k * action1 + action2], like engine.PrisonersDilemma.total_scores for k actions.
+        return np.asarray(outcome_counts, dtype=np.float64) @ self.table.reshape(-1, 2)
+
+    def trps(self) -> Optional[Tuple[float, float, float, float]]:
+        # (T, R, P, S) if this is a symmetric two-action game, else None.
+        if len(self.actions) != 2 or not np.array_equal(self.table[..., 0], self.table[..., 1].T):
+            return None
+        (r, s), (t, p) = self.table[..., 0].tolist()
+        return t, r, p, s
+
+    def is_prisoners_dilemma(self) -> bool:
+        trps = self.trps()
+        if trps is None:
+            return False
+        t, r, p, s = trps
+        # Defecting always pays, and taking turns exploiting each other is worse than cooperating.
+        return t > r > p > s and 2 * r > t + s
+
+    def prisoners_dilemma(self, noise: float = 0.0) -> PrisonersDilemma:
+        """This game in the engine's form, so the existing bots can play it. Only for two-action games."""
+        if len(self.actions) != 2:
+            raise ValueError(f"{self.name} has {len(self.actions)} actions; the bots can only play two-action games")
+        matrix = {(MOVE_NAMES[a], MOVE_NAMES[b]): tuple(_plain(score) for score in self.table[a, b])
+                  for a in range(2) for b in range(2)}
+        return PrisonersDilemma(matrix, noise=noise)
+
+    def __repr__(self):
+        return f"Game({self.name!r}, {self.actions})"
+
+
+def _plain(score: float):
+    # Whole-number payoffs stay ints, so scores and CSV files look the same as before.
+    return int(score) if float(score).is_integer() else float(score)
+
+
+PRISONERS_DILEMMA = Game.from_trps(5, 3, 1, 0)
+STAG_HUNT = Game.symmetric("Stag Hunt", ('stag', 'hare'), [[4, 0], [3, 3]])
+CHICKEN = Game.symmetric("Chicken", ('swerve', 'straight'), [[3, 1], [4, 0]])
+HARMONY = Game.symmetric("Harmony", ('cooperate', 'defect'), [[4, 3], [2, 1]])
+# The Prisoner's Dilemma with a way out: a loner refuses to play and gets a small sure payoff.
+OPTIONAL_PD = Game.symmetric("Optional Prisoner's Dilemma", ('cooperate', 'defect', 'abstain'),
+                             [[3, 0, 2], [5, 1, 2], [2, 2, 2]])
+ROCK_PAPER_SCISSORS = Game.symmetric("Rock Paper Scissors", ('rock', 'paper', 'scissors'),
+                                     [[0, -1, 1], [1, 0, -1], [-1, 1, 0]])
+GAMES = {game.name: game for game in (PRISONERS_DILEMMA, STAG_HUNT, CHICKEN, HARMONY, OPTIONAL_PD,
+                                      ROCK_PAPER_SCISSORS)}
+
+
+def play_game(game: Game, strategy1: Callable, strategy2: Callable, rounds: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Plays a match of any game between two strategies and returns (scores, outcome counts).
+
+    Like the bots, a strategy gets the history as a list of (own action, opponent action) names
+    and returns the name of its action.
+    """
+    count = len(game.actions)
+    history1, history2 = [], []
+    counts = np.zeros(count * count, dtype=np.int64)
+    for _ in range(rounds):
+        action1 = game.index[strategy1(history1)]
+        action2 = game.index[strategy2(history2)]
+        counts[count * action1 + action2] += 1
+        history1.append((game.actions[action1], game.actions[action2]))
+        history2.append((game.actions[action2], game.actions[action1]))
+    return game.total_scores(counts), counts
+
+
+class OutcomeCounts:
+    """Collects how often each pair of moves happened in every match of a round robin.
+
+    Pass it to tournament.round_robin as `stats`: it takes the same per-match summaries TournamentStats does.
+    """
+
+    def __init__(self):
+        self.pairs: List[Pairing] = []
+        self.counts: List[List[int]] = []
+
+    def add_match(self, i: int, j: int, rounds: int, scores, summary):
+        self.pairs.append((i, j))
+        self.counts.append(summary[0])
+
+
+def outcome_counts(bots: List[Bot], rounds: int, seed: Optional[int] = None, workers: Optional[int] = None,
+                   noise: float = 0.0, self_play: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Plays one round robin and returns (pairs, counts): pairs[m] is (i, j) and counts[m] how often
+    each outcome code (2 * move_i + move_j) happened in their match. With self_play, (i, i) pairs too.
+
+    Learning agents are told their scores, so what they do depends on the payoffs; they can't be
+    scored under other matrices afterwards and are refused here.
+    """
+    learners = [bot.name for bot in bots if bot.learns]
+    if learners:
+        raise ValueError(f"These bots learn from their payoffs, so their matches can't be rescored: {learners}")
+    collector = OutcomeCounts()
+    starting_scores = [bot.score for bot in bots]
+    try:
+        round_robin(PrisonersDilemma(noise=noise), bots, rounds, seed=seed, workers=workers, stats=collector,
+                    self_play=self_play)
+    finally:
+        for bot, score in zip(bots, starting_scores):
+            bot.score = score
+    return np.array(collector.pairs, dtype=np.int64).reshape(-1, 2), np.array(collector.counts, dtype=np.int64)
+
+
+def trps_grid(t: Sequence[float], r: Sequence[float], p: Sequence[float], s: Sequence[float],
+              prisoners_dilemma_only: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+    """Every combination of the given T, R, P and S values.
+
+    Returns (points, tables): points[g] is (T, R, P, S) and tables[g] the matching (2, 2, 2) payoff table.
+    With prisoners_dilemma_only, combinations that aren't a Prisoner's Dilemma are left out.
+    """
+    points = np.array(list(itertools.product(t, r, p, s)), dtype=np.float64).reshape(-1, 4)
+    if prisoners_dilemma_only:
+        T, R, P, S = points.T
+        points = points[(T > R) & (R > P) & (P > S) & (2 * R > T + S)]
+    T, R, P, S = points.T
+    row = np.stack([np.stack([R, S], axis=-1), np.stack([T, P], axis=-1)], axis=1)
+    tables = np.stack([row, row.transpose(0, 2, 1)], axis=-1)
+    return points, tables
+
+
+def sweep_totals(pairs: np.ndarray, counts: np.ndarray, tables: np.ndarray, bot_count: int) -> np.ndarray:
+    """Every bot's tournament total under each of many payoff tables, in one go.
+
+    pairs and counts come from outcome_counts, tables is (G, k, k, 2) (e.g. from trps_grid).
+    Returns a (G, bot_count) array. Nothing is replayed: each bot's outcome counts are added up once
+    per side, and every table is then just a (bots x k*k) by (k*k) product.
+    """
+    tables = np.asarray(tables, dtype=np.float64)
+    outcomes = tables.shape[1] * tables.shape[2]
+    # How often each outcome happened in the matches where the bot was player 1, and player 2.
+    as_first = np.zeros((bot_count, outcomes))
+    as_second = np.zeros((bot_count, outcomes))
+    # A bot playing itself scores once, as player 1, like tournament.score_totals counts it.
+    other = pairs[:, 0] != pairs[:, 1]
+    np.add.at(as_first, pairs[:, 0], counts)
+    np.add.at(as_second, pairs[other, 1], counts[other])
+    flat = tables.reshape(len(tables), outcomes, 2)
+    return flat[:, :, 0] @ as_first.T + flat[:, :, 1] @ as_second.T
+
+
+def sweep_rankings(totals: np.ndarray) -> np.ndarray:
+    # rankings[g] lists the bots from best to worst under table g.
+    return np.argsort(-totals, axis=1, kind='stable')
+
+
+if __name__ == "__main__":
+    from version1 import make_bots
+
+    bots = [bot for bot in make_bots() if not bot.learns]
+    pairs, counts = outcome_counts(bots, rounds=100, seed=random.randrange(2 ** 32))
+    values = np.arange(0, 11)
+    points, tables = trps_grid(values, values, values, values, prisoners_dilemma_only=True)
+    winners = sweep_rankings(sweep_totals(pairs, counts, tables, len(bots)))[:, 0]
+    print(f"{len(points)} Prisoner's Dilemma payoff matrices:")
+    for k, wins in sorted(enumerate(np.bincount(winners, minlength=len(bots))), key=lambda item: -item[1])[:10]:
+        if wins:
+            print(f"  {bots[k].name} wins under {wins}")
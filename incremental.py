@@ -0,0 +1,169 @@
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from cache import strategy_key
+from engine import PrisonersDilemma, Bot, MOVE_NAMES
+from tournament import Pairing, round_robin
+
+# A round robin that is kept on disk and only ever plays the matches it hasn't got yet. Every bot is
+# identified by a hash of its code (see registry.BotEntry.source_hash), and every match is stored
+# under the two bots' hashes and seeded from them rather than from the bots' positions, so its
+# result doesn't depend on who else is in the tournament. When a bot is added or edited only its
+# pairings are played: with 500 bots, 499 matches instead of 124,750.
+#
+#   python incremental.py                 bring tournament_state.json up to date with the bots/ folder
+#                                         and rewrite round_robin_results.csv and final_scores.csv
+#
+# The settings (payoffs, noise, rounds, seed, continuation) are saved with the matches and can't change
+# afterwards, since every stored result depends on them; start a new state file instead. Persistent
+# learning agents carry what they learned from match to match, so their results depend on the order
+# matches are played in and shouldn't be kept like this.
+
+STATE_FILE = 'tournament_state.json'
+
+
+def bot_hash(bot: Bot) -> str:
+    # Plugin bots are hashed from their definition without importing it; anything else from its code.
+    entry = getattr(bot, 'entry', None) or getattr(getattr(bot, 'bot', None), 'entry', None)
+    if entry is not None:
+        return entry.source_hash
+    key = strategy_key(bot) if getattr(bot, 'make_agent', None) is None else None
+    if key is None:
+        raise ValueError(f"Can't tell from {bot.name!r}'s code what it plays (see cache.strategy_key), so its "
+                         f"results can't be kept; put it in a plugin file instead")
+    return hashlib.sha1(repr((key, bot.noise)).encode()).hexdigest()[:16]
+
+
+def _settings(game: PrisonersDilemma, rounds: int, seed: int, continuation: Optional[float]) -> dict:
+    # As they come back from JSON, so they compare equal to saved ones.
+    return json.loads(json.dumps({'payoffs': game.payoffs, 'noise': game.noise, 'rounds': rounds, 'seed': seed,
+                                  'continuation': continuation}))
+
+
+class IncrementalTournament:
+    """A round robin's results, kept in a JSON file and updated one bot at a time."""
+
+    def __init__(self, path: str = STATE_FILE, game: Optional[PrisonersDilemma] = None, rounds: Optional[int] = None,
+                 seed: Optional[int] = None, continuation: Optional[float] = None):
+        """Opens the state in `path`, or starts a new one. Settings left as None are taken from the file."""
+        self.path = path
+        self.game = game or PrisonersDilemma()
+        self.matches: Dict[str, List] = {}
+        saved = None
+        if os.path.exists(path):
+            with open(path) as f:
+                state = json.load(f)
+            saved = state['settings']
+            self.matches = state['matches']
+            rounds = saved['rounds'] if rounds is None else rounds
+            seed = saved['seed'] if seed is None else seed
+            if game is None:
+                payoffs = saved['payoffs']
+                self.game = PrisonersDilemma({(MOVE_NAMES[a], MOVE_NAMES[b]): tuple(payoffs[a][b])
+                                              for a in range(2) for b in range(2)}, noise=saved['noise'])
+            if continuation is None:
+                continuation = saved['continuation']
+        self.rounds = 100 if rounds is None else rounds
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+        self.continuation = continuation
+        self.settings = _settings(self.game, self.rounds, self.seed, self.continuation)
+        if saved is not None and saved != self.settings:
+            changed = sorted(key for key in self.settings if saved.get(key) != self.settings[key])
+            raise ValueError(f"{path} was played with other settings ({', '.join(changed)}); "
+                             f"use a new state file to change them")
+
+    @staticmethod
+    def _key(hash1: str, hash2: str) -> str:
+        return f"{hash1}:{hash2}" if hash1 < hash2 else f"{hash2}:{hash1}"
+
+    def update(self, bots: List[Bot], workers: Optional[int] = None) -> int:
+        """Plays every pairing of these bots that isn't stored yet, saves, and returns how many that was.
+
+        Matches of bots that are no longer in the list (or whose code has changed since) are dropped.
+        Bot.score isn't touched; see totals.
+        """
+        hashes = [bot_hash(bot) for bot in bots]
+        if len(set(hashes)) != len(hashes):
+            twins = sorted({bot.name for bot, h in zip(bots, hashes) if hashes.count(h) > 1})
+            raise ValueError(f"These bots are the same strategy, so their results can't be told apart: {twins}")
+        todo = []
+        for i in range(len(bots)):
+            for j in range(i + 1, len(bots)):
+                if self._key(hashes[i], hashes[j]) not in self.matches:
+                    # The bot with the smaller hash always plays first, whatever the order of the list.
+                    todo.append((i, j) if hashes[i] < hashes[j] else (j, i))
+        starting_scores = [bot.score for bot in bots]
+        try:
+            played = round_robin(self.game, bots, self.rounds, seed=self.seed, workers=workers,
+                                 continuation=self.continuation, pairs=todo, ids=hashes) if todo else {}
+        finally:
+            for bot, score in zip(bots, starting_scores):
+                bot.score = score
+        current = {self._key(hashes[i], hashes[j]) for i in range(len(bots)) for j in range(i + 1, len(bots))}
+        self.matches = {key: scores for key, scores in self.matches.items() if key in current}
+        for (i, j), scores in played.items():
+            self.matches[self._key(hashes[i], hashes[j])] = list(scores)
+        self.save()
+        return len(played)
+
+    def save(self):
+        # Written next to the old file and swapped in, so a crash never leaves half a state behind.
+        temporary = self.path + '.tmp'
+        with open(temporary, 'w') as f:
+            json.dump({'settings': self.settings, 'matches': self.matches}, f)
+        os.replace(temporary, self.path)
+
+    def results(self, bots: List[Bot]) -> Dict[Pairing, Tuple]:
+        # {(i, j): (score_i, score_j)} for i < j, like round_robin returns, for bots already updated.
+        hashes = [bot_hash(bot) for bot in bots]
+        results = {}
+        for i in range(len(bots)):
+            for j in range(i + 1, len(bots)):
+                score1, score2 = self.matches[self._key(hashes[i], hashes[j])]
+                results[(i, j)] = (score1, score2) if hashes[i] < hashes[j] else (score2, score1)
+        return results
+
+    def totals(self, bots: List[Bot]) -> List:
+        totals = [0] * len(bots)
+        for (i, j), (score1, score2) in self.results(bots).items():
+            totals[i] += score1
+            totals[j] += score2
+        return totals
+
+    def write_csv(self, bots: List[Bot], results_path: str = 'round_robin_results.csv',
+                  scores_path: str = 'final_scores.csv'):
+        # The same files main() writes, rebuilt from the stored matches.
+        from spec import write_results_csv, write_scores_csv
+
+        names = [bot.name for bot in bots]
+        write_results_csv(names, self.results(bots), results_path)
+        write_scores_csv(names, self.totals(bots), scores_path)
+
+
+if __name__ == "__main__":
+    from version1 import make_bots
+
+    parser = argparse.ArgumentParser(description="Play only the new matches of a round robin kept on disk.")
+    parser.add_argument('--state', default=STATE_FILE, help="the tournament state file")
+    parser.add_argument('--rounds', type=int, help="rounds per match (only for a new state file)")
+    parser.add_argument('--seed', type=int, help="the tournament's seed (only for a new state file)")
+    parser.add_argument('--workers', type=int, help="worker processes, every CPU by default")
+    args = parser.parse_args()
+
+    bots = make_bots()
+    try:
+        tournament = IncrementalTournament(args.state, rounds=args.rounds, seed=args.seed)
+        played = tournament.update(bots, args.workers)
+    except ValueError as error:
+        # Other settings than the state file's, or bots that can't be told apart.
+        print(error, file=sys.stderr)
+        raise SystemExit(2)
+    tournament.write_csv(bots)
+    matches = len(bots) * (len(bots) - 1) // 2
+    print(f"Played {played} new matches, reused {matches - played}. "
+          f"Results saved to 'round_robin_results.csv' and 'final_scores.csv'")
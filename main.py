@@ -1,32 +1,10 @@
 import random
 from typing import List, Tuple, Callable
 import csv
+from engine import PrisonersDilemma, Bot, run_simulation
 
 # I will try my best to document the code here so that it is easily accessible to everyone.
 
-class PrisonersDilemma:
-    def __init__(self):
-        # Below is the matrix of rewards for cooperating and defecting.
-        self.payoff_matrix = {
-            ('cooperate', 'cooperate'): (3, 3),
-            ('cooperate', 'defect'): (0, 5),
-            ('defect', 'cooperate'): (5, 0),
-            ('defect', 'defect'): (1, 1)
-        }
-
-    def play_round(self, move1, move2) -> Tuple[int, int]:
-        # The function runs one round between two players, returning the points for the round.
-        return self.payoff_matrix[(move1, move2)]
-
-class Bot:
-    def __init__(self, name: str, strategy: Callable[[List[Tuple[str, str]]], str]):
-        self.name = name
-        self.score = 0
-        self.strategy = strategy
-
-    def make_move(self, history: List[Tuple[str, str]]) -> str:
-        return self.strategy(history)
-
 def always_defect(history: List[Tuple[str, str]]) -> str:
     return 'defect'
 
@@ -64,21 +42,6 @@ def checkLastThree(history):
 
 # ----- add your bot here! You can look at the previous code for some inspiration. Don't forget to add your bot to the main function below later!
 
-def run_simulation(game: PrisonersDilemma, bot1: Bot, bot2: Bot, rounds: int) -> Tuple[int, int]:
-    history = []
-    gamescore1 = 0
-    gamescore2 = 0
-    for _ in range(rounds):
-        move1 = bot1.make_move(history)
-        move2 = bot2.make_move([(m2, m1) for m1, m2 in history])  # Reverse history for bot2. The first element in the array is always the bots own move.
-        score1, score2 = game.play_round(move1, move2)
-        gamescore1 += score1
-        gamescore2 += score2
-        history.append((move1, move2))
-    bot1.score += gamescore1
-    bot2.score += gamescore2
-    return gamescore1, gamescore2
-
 def main():
     game = PrisonersDilemma()
     # IMPORTANT: ADD YOUR BOT HERE WITH THE NAME TO YOUR FUNCTION.
@@ -0,0 +1,102 @@
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from batch import TableStrategy, EMPTY, DIGITS, state_count
+from engine import PrisonersDilemma
+
+# Exact expected scores for strategies that only look at the last few rounds (TableStrategy, from
+# batch.py), without playing a single match. What happens next only depends on the last `memory`
+# rounds, so a match is a Markov chain over those states. With a match that goes on after every round
+# with probability w (tournament.round_robin's continuation), the expected total score is
+#
+#     sum over rounds t of w ** t * (expected score in round t)  =  start . (I - w P)^-1 . r
+#
+# where P is the chain's transition matrix and r the expected score of a round played from each
+# state: one linear solve. A match of a fixed number of rounds is the same sum cut off, done by
+# stepping the state distribution forward instead.
+
+# The outcome code seen from the other player's side: (move1, move2) becomes (move2, move1).
+SWAPPED = np.array([0, 2, 1, 3, EMPTY])
+
+
+def memory_one(name: str, first: float, cc: float, cd: float, dc: float, dd: float) -> TableStrategy:
+    """A memory-1 strategy: its chance of cooperating on the first move and after each last round
+    (own move, opponent's move), e.g. Tit for Tat is memory_one("Tit for Tat", 1, 1, 0, 1, 0)."""
+    return TableStrategy(name, 1, [cc, cd, dc, dd, first])
+
+
+def _swapped_states(memory: int) -> np.ndarray:
+    # The state player 2 is in when player 1 is in each state: every remembered round seen from the other side.
+    states = np.arange(state_count(memory))
+    swapped = np.zeros_like(states)
+    for place in range(memory):
+        digit = states // DIGITS ** place % DIGITS
+        swapped += SWAPPED[digit] * DIGITS ** place
+    return swapped
+
+
+def _chain(strategy1: TableStrategy, strategy2: TableStrategy, game: PrisonersDilemma
+           ) -> Tuple[np.ndarray, np.ndarray, int]:
+    # Returns the transition matrix, each state's expected scores (states x 2) and the start state,
+    # with states seen from player 1's side.
+    memory = max(strategy1.memory, strategy2.memory, 1)
+    size = state_count(memory)
+    states = np.arange(size)
+    chance1 = strategy1.lifted(memory)
+    chance2 = strategy2.lifted(memory)[_swapped_states(memory)]
+    # Each strategy's own noise, like Bot.noise, or the game's if it has none.
+    noise1 = game.noise if strategy1.noise is None else strategy1.noise
+    noise2 = game.noise if strategy2.noise is None else strategy2.noise
+    chance1 = chance1 * (1 - noise1) + (1 - chance1) * noise1
+    chance2 = chance2 * (1 - noise2) + (1 - chance2) * noise2
+    # Chance of each outcome code (2 * move1 + move2) from each state.
+    outcome = np.stack([chance1 * chance2, chance1 * (1 - chance2), (1 - chance1) * chance2,
+                        (1 - chance1) * (1 - chance2)], axis=1)
+    transitions = np.zeros((size, size))
+    for code in range(4):
+        np.add.at(transitions, (states, (states * DIGITS + code) % size), outcome[:, code])
+    payoffs = np.array(game.payoffs, dtype=np.float64).reshape(4, 2)
+    return transitions, outcome @ payoffs, size - 1
+
+
+def expected_scores(strategy1: TableStrategy, strategy2: TableStrategy, game: Optional[PrisonersDilemma] = None,
+                    continuation: Optional[float] = None, rounds: Optional[int] = None) -> Tuple[float, float]:
+    """Expected match scores of two table strategies, computed exactly.
+
+    Give either a continuation probability (the match goes on after every round with that chance)
+    or a fixed number of rounds. Noise (each strategy's, or else the game's) is taken into account.
+    """
+    game = game or PrisonersDilemma()
+    transitions, reward, start = _chain(strategy1, strategy2, game)
+    if continuation is not None:
+        if not 0 <= continuation < 1:
+            raise ValueError("the continuation probability must be at least 0 and below 1")
+        # Expected number of visits to each state, discounted: the row `start` of (I - w P)^-1.
+        visits = np.linalg.solve((np.eye(len(transitions)) - continuation * transitions).T,
+                                 np.eye(len(transitions))[start])
+        score1, score2 = visits @ reward
+        return float(score1), float(score2)
+    if rounds is None:
+        raise ValueError("give either a continuation probability or a number of rounds")
+    distribution = np.zeros(len(transitions))
+    distribution[start] = 1.0
+    total = np.zeros(2)
+    for _ in range(rounds):
+        total += distribution @ reward
+        distribution = distribution @ transitions
+    return float(total[0]), float(total[1])
+
+
+def expected_matrix(strategies: List[TableStrategy], game: Optional[PrisonersDilemma] = None,
+                    continuation: Optional[float] = None, rounds: Optional[int] = None) -> np.ndarray:
+    """result[i, j] is the expected score of strategy i against strategy j, self-play included.
+
+    Drop-in for evolution.matchup_matrix when every bot can be written as a table, with no sampling noise.
+    """
+    count = len(strategies)
+    result = np.zeros((count, count))
+    for i in range(count):
+        for j in range(i, count):
+            result[i, j], result[j, i] = expected_scores(strategies[i], strategies[j], game, continuation, rounds)
+    return result
@@ -0,0 +1,150 @@
+import csv
+import math
+import random
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+from cache import MatchCache
+from engine import PrisonersDilemma, Bot
+from tournament import Pairing, round_robin
+
+# Repeats the whole round robin many times. A single tournament is mostly noise because so many
+# bots (and the number of rounds) are random, so here every bot and every matchup gets a running
+# mean, variance and confidence interval. Only those running totals are kept between repetitions,
+# never the runs themselves.
+
+
+class RunningStats:
+    """Mean and variance of a stream of numbers, updated one value at a time (Welford's method)."""
+    __slots__ = ('count', 'mean', '_m2')
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def add(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> float:
+        return self._m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        return math.sqrt(self.variance)
+
+    def half_width(self, confidence: float = 0.95) -> float:
+        # Half the width of the normal-approximation confidence interval for the mean.
+        if self.count < 2:
+            return math.inf
+        z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        return z * self.stdev / math.sqrt(self.count)
+
+    def interval(self, confidence: float = 0.95) -> Tuple[float, float]:
+        half = self.half_width(confidence)
+        return self.mean - half, self.mean + half
+
+
+class MonteCarloResult:
+    def __init__(self, bots: List[Bot], confidence: float):
+        self.bots = bots
+        self.confidence = confidence
+        self.repetitions = 0
+        self.settled = False
+        # Total tournament score of each bot, one value per repetition.
+        self.bot_stats = [RunningStats() for _ in bots]
+        # Match scores for both sides of every pairing, keyed like round_robin's results.
+        self.matchup_stats: Dict[Pairing, Tuple[RunningStats, RunningStats]] = {}
+        # Difference between the totals of bots i and j (i < j) within the same repetition. Comparing
+        # bots inside a repetition cancels out noise they all share, like the number of rounds.
+        self.difference_stats: Dict[Pairing, RunningStats] = {}
+
+    def add_tournament(self, results: Dict[Pairing, Tuple[int, int]]):
+        totals = [0] * len(self.bots)
+        for (i, j), (score1, score2) in results.items():
+            totals[i] += score1
+            totals[j] += score2
+            if (i, j) not in self.matchup_stats:
+                self.matchup_stats[(i, j)] = (RunningStats(), RunningStats())
+            stats1, stats2 = self.matchup_stats[(i, j)]
+            stats1.add(score1)
+            stats2.add(score2)
+        for stats, total in zip(self.bot_stats, totals):
+            stats.add(total)
+        for i in range(len(totals)):
+            for j in range(i + 1, len(totals)):
+                if (i, j) not in self.difference_stats:
+                    self.difference_stats[(i, j)] = RunningStats()
+                self.difference_stats[(i, j)].add(totals[i] - totals[j])
+        self.repetitions += 1
+
+    def ranking(self) -> List[int]:
+        return sorted(range(len(self.bots)), key=lambda k: self.bot_stats[k].mean, reverse=True)
+
+    def ranking_settled(self, tolerance: float) -> bool:
+        # The ranking is settled when every pair of neighbours in it is either clearly apart (the
+        # confidence interval of their score difference excludes zero) or known to be tied, i.e. the
+        # difference is pinned down to within `tolerance` as a fraction of their mean score.
+        order = self.ranking()
+        for above, below in zip(order, order[1:]):
+            i, j = min(above, below), max(above, below)
+            difference = self.difference_stats[(i, j)]
+            half = difference.half_width(self.confidence)
+            if abs(difference.mean) > half:
+                continue
+            if half <= tolerance * abs(self.bot_stats[above].mean):
+                continue
+            return False
+        return True
+
+    def save(self, path: str = 'monte_carlo_scores.csv'):
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Bot", "Mean Points", "Std Dev", "CI Low", "CI High", "Runs"])
+            for k in self.ranking():
+                stats = self.bot_stats[k]
+                low, high = stats.interval(self.confidence)
+                writer.writerow([self.bots[k].name, stats.mean, stats.stdev, low, high, stats.count])
+
+
+def monte_carlo(game: PrisonersDilemma, bots: List[Bot], repetitions: int = 1000, rounds: Tuple[int, int] = (90, 110),
+                seed: Optional[int] = None, workers: Optional[int] = None, min_repetitions: int = 10,
+                confidence: float = 0.95, tolerance: float = 0.01) -> MonteCarloResult:
+    """Plays up to `repetitions` full round robins and returns the aggregated statistics.
+
+    Every repetition draws its own number of rounds from the `rounds` range, like main() does.
+    After `min_repetitions` it stops as soon as the ranking is settled (see ranking_settled).
+    Bot.score is left as it was before the call.
+    """
+    rng = random.Random(seed)
+    # Matches between deterministic bots are the same in every repetition, so they're only played
+    # once per number of rounds.
+    cache = MatchCache()
+    result = MonteCarloResult(bots, confidence)
+    starting_scores = [bot.score for bot in bots]
+    try:
+        for _ in range(repetitions):
+            tournament_rounds = rng.randint(*rounds)
+            results = round_robin(game, bots, tournament_rounds, seed=rng.randrange(2 ** 32), workers=workers,
+                                  cache=cache)
+            result.add_tournament(results)
+            if result.repetitions >= min_repetitions and result.ranking_settled(tolerance):
+                result.settled = True
+                break
+    finally:
+        for bot, score in zip(bots, starting_scores):
+            bot.score = score
+    return result
+
+
+if __name__ == "__main__":
+    from version1 import make_bots
+
+    result = monte_carlo(PrisonersDilemma(), make_bots())
+    result.save()
+    state = "settled" if result.settled else "not settled yet"
+    print(f"Ranking {state} after {result.repetitions} tournaments, saved to 'monte_carlo_scores.csv'")
@@ -0,0 +1,332 @@
+import ast
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from engine import Bot, AgentBot
+
+# Finds bots without importing them. Bots live in plugin files (the bots/ folder by default) and
+# register themselves with the @bot / @agent decorators below, or come from installed packages
+# through the 'prisoners_dilemma.bots' entry point group. Plugin files are only read as text
+# (and that scan is cached), so listing 500 submissions doesn't import 500 modules. A bot's module
+# is imported the first time the bot actually makes a move, in whichever process plays it.
+
+DEFAULT_PLUGIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bots')
+ENTRY_POINT_GROUP = 'prisoners_dilemma.bots'
+INDEX_FILE = 'bot-index.json'
+INDEX_VERSION = 3
+
+# Plugin modules that have been imported, by file path, so each is only ever executed once.
+_modules = {}
+
+
+def bot(name: str, **options):
+    """Registers a strategy function under `name`. Options are passed on to Bot, e.g.
+
+        @bot("Tit for Tat", deterministic=True, memory=1)
+        def tit_for_tat(history): ...
+
+    The arguments must be plain literals, since they are read without running the file.
+    """
+    def register(strategy):
+        strategy.bot_name = name
+        strategy.bot_options = options
+        return strategy
+    return register
+
+
+def agent(name: str, **options):
+    """Registers an Agent class or factory function under `name`, to be played as an AgentBot."""
+    def register(factory):
+        factory.bot_name = name
+        factory.bot_options = options
+        return factory
+    return register
+
+
+class BotEntry:
+    """Where to find one registered bot: enough to build it without importing its module."""
+
+    def __init__(self, name: str, kind: str, attribute: str, options: dict, path: Optional[str] = None,
+                 entry_point: Optional[str] = None, digest: Optional[str] = None):
+        self.name = name
+        self.kind = kind
+        self.attribute = attribute
+        self.options = options
+        self.path = path
+        self.entry_point = entry_point
+        # sha1 of the bot's definition in its plugin file (see definition_digest), if known.
+        self.digest = digest
+
+    @property
+    def source(self) -> str:
+        return self.path or self.entry_point
+
+    @property
+    def source_hash(self) -> str:
+        # Changes whenever the bot might play differently: its definition (helpers and all, see
+        # definition_digest), or its options. Read from the file without importing anything. Bots from
+        # an installed package aren't scanned, so they go by their whole file instead.
+        digest = self.digest
+        if digest is None:
+            path = self.path
+            if path is None:
+                spec = importlib.util.find_spec(self.entry_point.partition(':')[0])
+                path = spec.origin if spec is not None else None
+            if path is None or not os.path.exists(path):
+                digest = self.source
+            else:
+                with open(path, 'rb') as f:
+                    digest = hashlib.sha1(f.read()).hexdigest()
+            self.digest = digest
+        identity = json.dumps([digest, self.kind, self.attribute, self.options], sort_keys=True)
+        return hashlib.sha1(identity.encode()).hexdigest()[:16]
+
+    def load(self):
+        # Returns the strategy function (or agent factory), importing its module if needed.
+        if self.entry_point is not None:
+            module_name, _, attribute = self.entry_point.partition(':')
+            target = importlib.import_module(module_name)
+            for part in attribute.split('.'):
+                target = getattr(target, part)
+            return target
+        return getattr(load_module(self.path), self.attribute)
+
+    def make_bot(self) -> Bot:
+        if self.kind == 'agent':
+            return LazyAgentBot(self)
+        return LazyBot(self)
+
+
+def load_module(path: str):
+    path = os.path.abspath(path)
+    module = _modules.get(path)
+    if module is None:
+        # Named after the file and a hash of its path, so bots/rock.py and other_bots/rock.py don't
+        # replace each other in sys.modules.
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name = f"pd_plugins.{stem}_{hashlib.sha1(path.encode()).hexdigest()[:10]}"
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        # The normal import machinery caches the compiled module in __pycache__ next to the plugin.
+        spec.loader.exec_module(module)
+        _modules[path] = module
+    return module
+
+
+class LazyBot(Bot):
+    """A Bot whose strategy is only imported the first time it's needed."""
+
+    def __init__(self, entry: BotEntry):
+        self.entry = entry
+        self._strategy = None
+        super().__init__(entry.name, None, **entry.options)
+
+    @property
+    def strategy(self):
+        if self._strategy is None:
+            self._strategy = self.entry.load()
+        return self._strategy
+
+    @strategy.setter
+    def strategy(self, strategy):
+        self._strategy = strategy
+
+    def __getstate__(self):
+        # Other processes get the entry and import the strategy themselves.
+        state = self.__dict__.copy()
+        state['_strategy'] = None
+        return state
+
+
+class LazyAgentBot(AgentBot):
+    """An AgentBot whose agent class or factory is only imported when a match starts."""
+
+    def __init__(self, entry: BotEntry):
+        self.entry = entry
+        self._make_agent = None
+        super().__init__(entry.name, None, **entry.options)
+
+    @property
+    def make_agent(self):
+        if self._make_agent is None:
+            self._make_agent = self.entry.load()
+        return self._make_agent
+
+    @make_agent.setter
+    def make_agent(self, make_agent):
+        self._make_agent = make_agent
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_make_agent'] = None
+        return state
+
+
+def _literal(node: ast.AST, path: str):
+    try:
+        return ast.literal_eval(node)
+    except ValueError:
+        raise ValueError(f"{path}:{node.lineno}: bot registration arguments must be plain literals") from None
+
+
+def _top_level(tree: ast.Module) -> Tuple[Dict[str, List[ast.stmt]], List[ast.stmt]]:
+    # The top-level statements that give each name in a module its value (definitions, assignments and
+    # imports), and every other statement but the docstring: code that runs whenever the file is imported.
+    defined, other = {}, []
+    for k, node in enumerate(tree.body):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            names = [node.name]
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            names = [(alias.asname or alias.name).partition('.')[0] for alias in node.names]
+        elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.AugAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            names = [name.id for target in targets for name in ast.walk(target) if isinstance(name, ast.Name)]
+        else:
+            if not (k == 0 and isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)):
+                other.append(node)
+            continue
+        for name in names:
+            defined.setdefault(name, []).append(node)
+    return defined, other
+
+
+def definition_digest(node: ast.stmt, defined: Dict[str, List[ast.stmt]], other: List[ast.stmt]) -> str:
+    """A hash of one bot's code in its plugin file, so editing one bot in a file full of them only
+    changes that bot's hash.
+
+    It covers the bot's function or class, every top-level helper, constant and import it uses
+    (directly or through another one), and whatever else runs when the file is imported. Comments and
+    layout don't count, since it hashes the syntax tree.
+    """
+    seen, todo, parts = set(), [node] + other, []
+    while todo:
+        current = todo.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        parts.append(ast.dump(current))
+        for child in ast.walk(current):
+            if isinstance(child, ast.Name):
+                todo.extend(defined.get(child.id, ()))
+    return hashlib.sha1('\n'.join(sorted(parts)).encode()).hexdigest()
+
+
+def scan_file(path: str) -> dict:
+    """Reads a plugin file's registrations and top-level names without running it."""
+    with open(path, 'rb') as f:
+        source = f.read()
+    tree = ast.parse(source, filename=path)
+    defined, other = _top_level(tree)
+    bots = []
+    names = []
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+            continue
+        names.append(node.name)
+        for decorator in node.decorator_list:
+            if not isinstance(decorator, ast.Call):
+                continue
+            func = decorator.func
+            kind = func.id if isinstance(func, ast.Name) else func.attr if isinstance(func, ast.Attribute) else None
+            if kind not in ('bot', 'agent') or not decorator.args:
+                continue
+            options = {keyword.arg: _literal(keyword.value, path) for keyword in decorator.keywords}
+            bots.append({'name': _literal(decorator.args[0], path), 'kind': kind, 'attribute': node.name,
+                         'options': options, 'digest': definition_digest(node, defined, other)})
+    return {'bots': bots, 'names': names}
+
+
+class Registry:
+    """All the bots that can take part in a tournament, by name.
+
+    Scans the plugin directories (and entry points, if use_entry_points) once, on creation. Two bots
+    with the same name are an error, so results can never be mixed up.
+    """
+
+    def __init__(self, plugin_dirs: Optional[List[str]] = None, use_entry_points: bool = True):
+        self.plugin_dirs = [DEFAULT_PLUGIN_DIR] if plugin_dirs is None else list(plugin_dirs)
+        self.entries: Dict[str, BotEntry] = {}
+        # Every top-level function and class in the plugin files, for finding strategies by function name,
+        # and the names more than one file defines: {name: [paths]}.
+        self.definitions: Dict[str, str] = {}
+        self.duplicates: Dict[str, List[str]] = {}
+        for directory in self.plugin_dirs:
+            self._scan_directory(directory)
+        if use_entry_points:
+            # importlib.metadata is slow to import, so it's only loaded when entry points are wanted.
+            from importlib.metadata import entry_points
+            for point in entry_points(group=ENTRY_POINT_GROUP):
+                self._add(BotEntry(point.name, 'bot', point.value, {}, entry_point=point.value))
+
+    def _add(self, entry: BotEntry):
+        if entry.name in self.entries:
+            raise ValueError(f"Two bots are called {entry.name!r}: one in {self.entries[entry.name].source}, "
+                             f"one in {entry.source}. Please give one of them another name.")
+        self.entries[entry.name] = entry
+
+    def _scan_directory(self, directory: str):
+        if not os.path.isdir(directory):
+            return
+        index_path = os.path.join(directory, '__pycache__', INDEX_FILE)
+        try:
+            with open(index_path) as f:
+                index = json.load(f)
+            if index.get('version') != INDEX_VERSION:
+                index = {}
+        except (OSError, ValueError):
+            index = {}
+        files = index.get('files', {})
+        fresh = {}
+        changed = False
+        for filename in sorted(os.listdir(directory)):
+            if not filename.endswith('.py') or filename.startswith('_'):
+                continue
+            path = os.path.join(directory, filename)
+            stat = os.stat(path)
+            cached = files.get(filename)
+            if cached is None or cached['mtime_ns'] != stat.st_mtime_ns or cached['size'] != stat.st_size:
+                cached = dict(scan_file(path), mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+                changed = True
+            fresh[filename] = cached
+            for found in cached['bots']:
+                self._add(BotEntry(found['name'], found['kind'], found['attribute'], found['options'], path=path,
+                                   digest=found['digest']))
+            for name in cached['names']:
+                if name in self.definitions:
+                    self.duplicates.setdefault(name, [self.definitions[name]]).append(path)
+                else:
+                    self.definitions[name] = path
+        if changed or set(fresh) != set(files):
+            try:
+                os.makedirs(os.path.dirname(index_path), exist_ok=True)
+                with open(index_path, 'w') as f:
+                    json.dump({'version': INDEX_VERSION, 'files': fresh}, f)
+            except OSError:
+                pass  # A read-only plugin directory just means scanning again next time.
+
+    def names(self) -> List[str]:
+        return list(self.entries)
+
+    def make_bot(self, name: str) -> Bot:
+        try:
+            return self.entries[name].make_bot()
+        except KeyError:
+            raise KeyError(f"No bot called {name!r}") from None
+
+    def bots(self, names: Optional[List[str]] = None) -> List[Bot]:
+        return [self.make_bot(name) for name in (self.names() if names is None else names)]
+
+    def find(self, attribute: str):
+        # Imports and returns a top-level function or class from the plugin files by its Python name.
+        path = self.definitions.get(attribute)
+        if path is None:
+            raise AttributeError(attribute)
+        if attribute in self.duplicates:
+            raise AttributeError(f"{attribute!r} is defined in more than one plugin file "
+                                 f"({', '.join(self.duplicates[attribute])}), so it's not clear which one is meant")
+        return getattr(load_module(path), attribute)
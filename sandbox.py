@@ -0,0 +1,370 @@
+import multiprocessing
+import os
+import random
+import signal
+import time
+from array import array
+from collections import deque
+from multiprocessing.connection import wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from engine import (PrisonersDilemma, Bot, play_match, match_summary, DEFECT, FORFEIT_POLICIES, Forfeit,
+                    forfeit_scores)
+
+# Plays untrusted bots in separate worker processes, so a bot that loops forever, eats all the memory
+# or crashes the interpreter costs itself the match instead of stalling the whole tournament.
+#
+# Whole matches are sent to a worker (a few at a time), not single moves: a round costs no IPC at
+# all, and the limits are enforced inside the worker instead.
+#   move_time    CPU seconds a bot may spend on one move (or one observe call, for learning agents).
+#                A CPU timer interrupts the bot when it runs out, where the platform has one.
+#   match_time   CPU seconds a bot may spend on a whole match.
+#   memory       MB of extra memory a worker may allocate on top of what it started with.
+# When a bot breaks a limit or raises an error, the forfeit policy decides what happens:
+#   'defect'     that move counts as a defection and the match goes on. A bot that has used up its
+#                match time defects for the rest of the match.
+#   'forfeit'    the match stops: the bot scores 0 and its opponent scores as if both had cooperated
+#                every round.
+# A worker that stops answering altogether is killed, and the bot that was moving forfeits the match
+# whatever the policy, since there is nothing left to carry on with. A bot whose plugin can't be
+# imported (it raises, or breaks a limit while it loads) forfeits every match it has.
+
+
+class SandboxPolicy:
+    def __init__(self, move_time: float = 0.1, match_time: float = 2.0, memory: Optional[int] = 512,
+                 forfeit: str = 'defect', startup_time: float = 30.0):
+        if forfeit not in FORFEIT_POLICIES:
+            raise ValueError(f"forfeit must be one of {FORFEIT_POLICIES}, not {forfeit!r}")
+        self.move_time = move_time
+        self.match_time = match_time
+        self.memory = memory
+        self.forfeit = forfeit
+        # Wall clock seconds a new worker gets to import its bots before it counts as hung. Any one bot
+        # may use half of it in CPU time, so one that hogs the CPU is caught before the clock runs out.
+        self.startup_time = startup_time
+
+    @property
+    def kill_after(self) -> float:
+        # Wall clock seconds without any answer after which a worker is killed. Both bots can use their
+        # whole match time, plus some slack for a busy machine.
+        return 2 * self.match_time + 1.0
+
+
+class MoveTimeout(BaseException):
+    # A BaseException, so a strategy's own `except Exception` can't swallow it.
+    pass
+
+
+class _Guard:
+    """Wraps one bot's make_code (and observe) inside a worker with the policy's limits."""
+
+    def __init__(self, bot: Bot, policy: SandboxPolicy, current, side: int):
+        self.policy = policy
+        self.current = current
+        self.side = side
+        self.make_code = bot.make_code
+        self.observe = bot.observe
+        self.spent = 0.0
+        self.fault = None
+        self.played = 0
+        bot.make_code = self.guarded_make_code
+        if bot.learns:
+            bot.observe = self.guarded_observe
+        # Setting up and finishing a match (an agent's reset, say) only has the wall clock limit, but
+        # a hang there is still the bot's.
+        bot.start_match = self._marked(bot.start_match)
+        bot.end_match = self._marked(bot.end_match)
+
+    def _marked(self, function):
+        def call(*args):
+            self.current.value = self.side
+            try:
+                return function(*args)
+            finally:
+                self.current.value = -1
+        return call
+
+    def _run(self, function, *args):
+        # Calls into the bot under the limits. Returns (ok, result).
+        global _armed
+        if self.spent >= self.policy.match_time:
+            return False, None  # Out of time for this match: defect without asking the bot.
+        self.current.value = self.side
+        start = time.process_time()
+        fault = None
+        _armed = True
+        if hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_PROF, self.policy.move_time)
+        try:
+            result = function(*args)
+        except MoveTimeout:
+            fault = 'move time'
+        except MemoryError:
+            fault = 'memory'
+        except Exception as error:
+            fault = f'error: {type(error).__name__}: {error}'
+        finally:
+            _armed = False
+            if hasattr(signal, 'setitimer'):
+                signal.setitimer(signal.ITIMER_PROF, 0)
+            self.current.value = -1
+        used = time.process_time() - start
+        self.spent += used
+        # Without a CPU timer (Windows) a slow move can only be noticed once it's over.
+        if fault is None and used > self.policy.move_time:
+            fault = 'move time'
+        if fault is None and self.spent > self.policy.match_time:
+            fault = 'match time'
+        if fault is None:
+            return True, result
+        if self.fault is None:
+            self.fault = fault
+        if self.policy.forfeit == 'forfeit':
+            raise Forfeit(self.side, self.played)
+        return False, None
+
+    def guarded_make_code(self, history) -> int:
+        self.played = len(history)
+        ok, move = self._run(self.make_code, history)
+        return move if ok else DEFECT
+
+    def guarded_observe(self, reward: int, history):
+        self._run(self.observe, reward, history)
+
+
+# Whether a bot is running right now, so a timer that goes off just as a move ends is ignored.
+_armed = False
+
+
+def _timeout(signum, frame):
+    if _armed:
+        raise MoveTimeout()
+
+
+def _limit_memory(megabytes: Optional[int]):
+    try:
+        import resource
+        with open('/proc/self/statm') as f:
+            baseline = int(f.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (ImportError, OSError, ValueError):
+        return  # No way to cap memory here; the wall clock limit still applies.
+    limit = baseline + megabytes * 1024 * 1024
+    hard = resource.getrlimit(resource.RLIMIT_AS)[1]
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def _load(bot: Bot, policy: SandboxPolicy) -> Optional[str]:
+    # Imports a bot's plugin under the limits. Returns what went wrong, if anything.
+    global _armed
+    _armed = True
+    if hasattr(signal, 'setitimer'):
+        signal.setitimer(signal.ITIMER_PROF, policy.startup_time / 2)
+    try:
+        bot.strategy
+        getattr(bot, 'make_agent', None)
+    except MoveTimeout:
+        return 'load time'
+    except MemoryError:
+        return 'memory'
+    except Exception as error:
+        return f'load error: {type(error).__name__}: {error}'
+    finally:
+        _armed = False
+        if hasattr(signal, 'setitimer'):
+            signal.setitimer(signal.ITIMER_PROF, 0)
+    return None
+
+
+def _worker(connection, current, loading, game, bots, rounds, seed, policy, record, summarize, continuation, ids,
+            broken):
+    from tournament import match_seed, match_rounds, match_ids
+
+    # The limits apply from the start, so a plugin that hangs or eats memory as it is imported is
+    # caught like a bot doing it in a move.
+    if hasattr(signal, 'setitimer'):
+        signal.signal(signal.SIGPROF, _timeout)
+    if policy.memory is not None:
+        _limit_memory(policy.memory)
+    # Import every bot up front, so loading a plugin doesn't count against its first move. Bots that
+    # can't be loaded (or were already found not to load, `broken`) forfeit all their matches.
+    broken = dict(broken)
+    for k, bot in enumerate(bots):
+        if k not in broken:
+            loading.value = k
+            fault = _load(bot, policy)
+            loading.value = -1
+            if fault is not None:
+                broken[k] = fault
+    connection.send(broken)  # Ready: from now on the worker is expected to keep up.
+    while True:
+        try:
+            chunk = connection.recv()
+        except EOFError:
+            return
+        if chunk is None:
+            return
+        for i, j in chunk:
+            first, second = match_ids(i, j, ids)
+            length = match_rounds(seed, first, second, rounds, continuation)
+            if i in broken or j in broken:
+                culprits = [side for side, k in enumerate((i, j)[:1 if i == j else 2]) if k in broken]
+                scores = forfeit_scores(game, length, culprits[0] if len(culprits) == 1 else None)
+                faults = [(side, broken[(i, j)[side]]) for side in culprits]
+                connection.send(((i, j), _result(scores, array('b'), record, summarize), faults))
+                continue
+            # A bot playing itself gets its mirror made here, so each side has its own guard.
+            players = (bots[i], bots[j] if j != i else bots[i].mirror())
+            guards = (_Guard(players[0], policy, current, 0), _Guard(players[1], policy, current, 1))
+            rng = random.Random(match_seed(seed, first, second))
+            outcomes = array('b', bytes(length)) if record or summarize else None
+            try:
+                scores = play_match(game, players[0], players[1], length, outcomes=outcomes, rng=rng)
+            except Forfeit as forfeit:
+                scores = forfeit_scores(game, length, forfeit.side)
+                if outcomes is not None:
+                    outcomes = outcomes[:forfeit.played]
+            finally:
+                # The bots are shared between matches, so they get their own methods back.
+                for bot in players:
+                    for method in ('make_code', 'observe', 'start_match', 'end_match'):
+                        bot.__dict__.pop(method, None)
+            faults = [(side, guard.fault) for side, guard in enumerate(guards) if guard.fault is not None]
+            connection.send(((i, j), _result(scores, outcomes, record, summarize), faults))
+
+
+def _result(scores, outcomes: Optional[array], record: bool, summarize: bool):
+    # What tournament.play_pairing would return for the match.
+    if record or summarize:
+        return scores, outcomes.tobytes() if record else None, match_summary(outcomes) if summarize else None
+    return scores
+
+
+class _Worker:
+    def __init__(self, context, arguments, broken: Dict[int, str]):
+        # The side whose bot is running, and the bot being imported, -1 for none.
+        self.current = context.Value('i', -1, lock=False)
+        self.loading = context.Value('i', -1, lock=False)
+        self.connection, child = context.Pipe()
+        self.process = context.Process(target=_worker, args=(child, self.current, self.loading) + arguments + (broken,),
+                                       daemon=True)
+        self.process.start()
+        child.close()
+        self.chunk = deque()
+        self.deadline = None
+
+    def send(self, chunk: List[Tuple[int, int]], timeout: float):
+        self.chunk = deque(chunk)
+        self.deadline = time.monotonic() + timeout
+        self.connection.send(chunk)
+
+    def stop(self):
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join(1)
+        self.kill()
+
+    def kill(self):
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class Sandbox:
+    """Runs the matches of tournament.round_robin (sandbox=...) in isolated worker processes.
+
+    Every limit broken is logged in `faults` as (bot1, bot2, culprit, what happened), with bots given
+    by their position in the tournament's list of bots.
+    """
+
+    def __init__(self, policy: Optional[SandboxPolicy] = None, workers: Optional[int] = None,
+                 chunk_size: int = 8):
+        self.policy = policy or SandboxPolicy()
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.faults: List[Tuple[int, int, int, str]] = []
+
+    def play(self, game: PrisonersDilemma, bots: List[Bot], rounds: int, seed: int,
+             pending: List[Tuple[int, int]], record: bool = False, summarize: bool = False,
+             continuation: Optional[float] = None, ids: Optional[list] = None) -> Iterator[tuple]:
+        """Plays the pending pairings, yielding ((i, j), result) as matches finish, in any order.
+
+        result is what tournament.play_pairing would return for the same arguments.
+        """
+        if not pending:
+            return
+        context = multiprocessing.get_context()
+        arguments = (game, bots, rounds, seed, self.policy, record, summarize, continuation, ids)
+        chunks = deque(pending[k:k + self.chunk_size] for k in range(0, len(pending), self.chunk_size))
+        count = min(self.workers or os.cpu_count() or 1, len(chunks))
+        # With more workers than CPUs a match takes longer on the clock than the CPU time it uses.
+        kill_after = self.policy.kill_after * max(1.0, count / (os.cpu_count() or 1))
+        active: Dict[object, _Worker] = {}
+        # Bots that couldn't be loaded, by position, and why. New workers don't try them again.
+        broken: Dict[int, str] = {}
+        try:
+            for _ in range(count):
+                worker = _Worker(context, arguments, broken)
+                worker.send(chunks.popleft(), self.policy.startup_time)
+                active[worker.connection] = worker
+            while active:
+                timeout = max(0.0, min(worker.deadline for worker in active.values()) - time.monotonic())
+                for connection in wait(list(active), timeout):
+                    worker = active[connection]
+                    try:
+                        message = connection.recv()
+                    except (EOFError, OSError):
+                        yield from self._replace(worker, active, context, arguments, record, summarize, broken)
+                        continue
+                    worker.deadline = time.monotonic() + kill_after
+                    if isinstance(message, dict):
+                        broken.update(message)  # The worker is ready, and these bots didn't load.
+                        continue
+                    pairing, result, faults = message
+                    worker.chunk.popleft()
+                    for side, fault in faults:
+                        self.faults.append(pairing + (pairing[side], fault))
+                    yield pairing, result
+                    if not worker.chunk:
+                        if chunks:
+                            worker.send(chunks.popleft(), kill_after)
+                        else:
+                            del active[connection]
+                            worker.stop()
+                now = time.monotonic()
+                for worker in [worker for worker in active.values() if worker.deadline <= now]:
+                    yield from self._replace(worker, active, context, arguments, record, summarize, broken)
+        finally:
+            for worker in active.values():
+                worker.kill()
+
+    def _replace(self, worker: _Worker, active: dict, context, arguments, record: bool,
+                 summarize: bool, broken: Dict[int, str]) -> Iterator[tuple]:
+        # The worker hung or died in the middle of its first unfinished match. Whoever was moving
+        # forfeits it, and a fresh worker takes over the rest of the chunk. If it was still importing
+        # a bot instead, that bot is broken: the fresh worker skips it and forfeits all its matches.
+        side, loading = worker.current.value, worker.loading.value
+        worker.kill()
+        del active[worker.connection]
+        if loading >= 0:
+            broken[loading] = 'killed while loading'
+            replacement = _Worker(context, arguments, broken)
+            replacement.send(list(worker.chunk), self.policy.startup_time)
+            active[replacement.connection] = replacement
+            return
+        pairing = worker.chunk.popleft()
+        side = side if side in (0, 1) else None
+        self.faults.append(pairing + (None if side is None else pairing[side], 'killed'))
+        from tournament import match_rounds, match_ids
+
+        game, _, rounds, seed, _, _, _, continuation, ids = arguments
+        scores = forfeit_scores(game, match_rounds(seed, *match_ids(*pairing, ids), rounds, continuation), side)
+        yield pairing, _result(scores, array('b'), record, summarize)
+        if worker.chunk:
+            replacement = _Worker(context, arguments, broken)
+            replacement.send(list(worker.chunk), self.policy.startup_time)
+            active[replacement.connection] = replacement
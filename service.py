@@ -0,0 +1,335 @@
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from http import HTTPStatus
+from typing import AsyncIterator, Dict, List, Optional
+
+from engine import PrisonersDilemma, Bot
+from registry import BotEntry, scan_file
+from sandbox import Sandbox, SandboxPolicy
+
+# A small web service for submitting bots, instead of sending them by DM. Everything runs on one
+# asyncio event loop with nothing but the standard library, so it works offline and on any machine.
+#
+#   POST /submissions          {"code": "<a plugin file, like the ones in bots/>"}
+#                              -> 202 {"job": id, ...}, or 400 saying what's wrong with the code
+#   GET  /jobs/<id>            the job's status, and its result once it's done
+#   GET  /jobs/<id>/events     its progress as it happens, one JSON object per line
+#   GET  /leaderboard          every evaluated submission, best first
+#   GET  /leaderboard/events   the leaderboard again every time it changes
+#
+# A submission is checked without running it (the same way registry.py reads plugin files) and
+# queued. A fixed number of evaluations run at once, each playing the new bot against every bot in
+# the roster in a Sandbox (see sandbox.py), since it's a stranger's code. The same code submitted
+# twice is only ever evaluated once: the second submission gets the first one's job, finished or not.
+#
+#   python service.py --port 8000
+
+MAX_BODY = 256 * 1024
+
+
+class SubmissionError(ValueError):
+    pass
+
+
+class Job:
+    """One submission's evaluation. Its events are kept, so anyone following it late sees them all."""
+
+    def __init__(self, job_id: str, name: str, entry: BotEntry):
+        self.id = job_id
+        self.name = name
+        self.entry = entry
+        self.status = 'queued'
+        self.result: Optional[dict] = None
+        self.error: Optional[str] = None
+        self.events: List[dict] = []
+        self.created = time.time()
+        self._changed = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return self.status in ('finished', 'failed')
+
+    def add_event(self, event: dict):
+        # Only ever called on the event loop. Everyone waiting is woken by setting the old Event.
+        self.events.append(event)
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def follow(self) -> AsyncIterator[dict]:
+        index = 0
+        while True:
+            changed = self._changed
+            while index < len(self.events):
+                yield self.events[index]
+                index += 1
+            if self.done:
+                return
+            await changed.wait()
+
+    def describe(self) -> dict:
+        return {'job': self.id, 'name': self.name, 'status': self.status, 'result': self.result, 'error': self.error}
+
+
+def _check(path: str, taken: set) -> dict:
+    # The one bot a submission registers, as registry.scan_file found it.
+    try:
+        found = scan_file(path)['bots']
+    except SyntaxError as error:
+        raise SubmissionError(f"syntax error on line {error.lineno}: {error.msg}") from None
+    except ValueError as error:
+        raise SubmissionError(str(error).replace(path, 'submission')) from None
+    if len(found) != 1:
+        raise SubmissionError(f"a submission must register exactly one bot with @bot(...) or @agent(...), "
+                              f"this one registers {len(found)}")
+    name = found[0]['name']
+    if not isinstance(name, str) or not name:
+        raise SubmissionError("the bot's name must be a non-empty string")
+    if name in taken:
+        raise SubmissionError(f"there is already a bot called {name!r}, in the tournament or submitted earlier")
+    return found[0]
+
+
+class Service:
+    """The submission queue and leaderboard, usable without any HTTP (which is how tests/test_service.py uses it)."""
+
+    def __init__(self, roster: List[Bot], submissions_dir: str = 'submissions', game: Optional[PrisonersDilemma] = None,
+                 rounds: int = 100, seed: int = 0, evaluations: int = 2, workers: Optional[int] = None,
+                 policy: Optional[SandboxPolicy] = None):
+        self.roster = roster
+        self.submissions_dir = submissions_dir
+        self.game = game or PrisonersDilemma()
+        self.rounds = rounds
+        self.seed = seed
+        self.evaluations = evaluations
+        self.workers = workers
+        self.policy = policy or SandboxPolicy()
+        self.jobs: Dict[str, Job] = {}
+        # Every evaluated submission, by bot name (no two submissions can have the same one, see submit).
+        self.standings: Dict[str, dict] = {}
+        self.queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._leaderboard_changed: Optional[asyncio.Event] = None
+
+    async def start(self):
+        os.makedirs(self.submissions_dir, exist_ok=True)
+        self.queue = asyncio.Queue()
+        self._leaderboard_changed = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._evaluator()) for _ in range(self.evaluations)]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def submit(self, code: str) -> tuple:
+        """Checks and queues a submission. Returns (job, whether it's a duplicate of an earlier one).
+
+        Raises SubmissionError if the code can't be accepted.
+        """
+        source = code.encode()
+        if len(source) > MAX_BODY:
+            raise SubmissionError(f"the code is over {MAX_BODY // 1024} KB")
+        job_id = hashlib.sha1(source).hexdigest()[:16]
+        if job_id in self.jobs:
+            return self.jobs[job_id], True
+        # The code is only read here, never run: it runs in the sandbox's workers, which import it from this file.
+        path = os.path.join(self.submissions_dir, f"submission_{job_id}.py")
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as f:
+            f.write(source)
+        try:
+            # A name belongs to whoever submitted it first, unless that submission failed.
+            taken = {bot.name for bot in self.roster}
+            taken |= {job.name for job in self.jobs.values() if job.status != 'failed'}
+            found = _check(temporary, taken)
+        except SubmissionError:
+            os.remove(temporary)
+            raise
+        os.replace(temporary, path)
+        name = found['name']
+        entry = BotEntry(name, found['kind'], found['attribute'], found['options'], path=path)
+        job = Job(job_id, name, entry)
+        self.jobs[job_id] = job
+        self.queue.put_nowait(job)
+        job.add_event({'event': 'queued', 'job': job_id, 'name': name, 'position': self.queue.qsize()})
+        return job, False
+
+    async def _evaluator(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                job.status = 'running'
+                job.add_event({'event': 'started', 'opponents': len(self.roster)})
+                # The sandbox blocks while it waits for its workers, so it runs in a thread and reports
+                # back to the loop.
+                result = await loop.run_in_executor(None, self._evaluate, job, loop)
+                job.result = result
+                job.status = 'finished'
+                self._record(job)
+                job.add_event({'event': 'finished', 'result': result, 'rank': self.rank(job.name)})
+            except Exception as error:
+                job.status = 'failed'
+                job.error = f"{type(error).__name__}: {error}"
+                job.add_event({'event': 'failed', 'error': job.error})
+            finally:
+                self.queue.task_done()
+
+    def _evaluate(self, job: Job, loop: asyncio.AbstractEventLoop) -> dict:
+        # Runs in a worker thread: plays the submission against every bot in the roster.
+        bots = self.roster + [job.entry.make_bot()]
+        newcomer = len(bots) - 1
+        sandbox = Sandbox(self.policy, self.workers)
+        scores = {}
+        for (opponent, _), (opponent_score, score) in sandbox.play(self.game, bots, self.rounds, self.seed,
+                                                                    [(k, newcomer) for k in range(newcomer)]):
+            # The submission is the second player of every pairing. Scores are given as (the
+            # submission's, the opponent's) from here on.
+            scores[bots[opponent].name] = (score, opponent_score)
+            event = {'event': 'match', 'opponent': bots[opponent].name, 'scores': [score, opponent_score],
+                     'played': len(scores), 'total': newcomer}
+            loop.call_soon_threadsafe(job.add_event, event)
+        total = sum(score for score, _ in scores.values())
+        faults = sorted({what for _, _, culprit, what in sandbox.faults if culprit == newcomer})
+        return {'score': total, 'average': total / max(len(scores), 1), 'matches': scores, 'faults': faults}
+
+    def _record(self, job: Job):
+        self.standings[job.name] = {'name': job.name, 'job': job.id, 'score': job.result['score'],
+                                    'average': job.result['average']}
+        changed, self._leaderboard_changed = self._leaderboard_changed, asyncio.Event()
+        changed.set()
+
+    def leaderboard(self) -> List[dict]:
+        ranked = sorted(self.standings.values(), key=lambda row: row['average'], reverse=True)
+        return [dict(row, rank=k + 1) for k, row in enumerate(ranked)]
+
+    def rank(self, name: str) -> Optional[int]:
+        return next((row['rank'] for row in self.leaderboard() if row['name'] == name), None)
+
+    async def follow_leaderboard(self) -> AsyncIterator[List[dict]]:
+        while True:
+            changed = self._leaderboard_changed
+            yield self.leaderboard()
+            await changed.wait()
+
+    # HTTP
+
+    async def serve(self, host: str = '127.0.0.1', port: int = 8000) -> asyncio.AbstractServer:
+        if self.queue is None:
+            await self.start()
+        return await asyncio.start_server(self._handle, host, port)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request_line = (await reader.readline()).decode('latin-1')
+            method, target, _ = request_line.split(' ', 2)
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+            length = int(headers.get('content-length') or 0)
+            if length > MAX_BODY:
+                await _send_json(writer, 413, {'error': f"request bodies are limited to {MAX_BODY // 1024} KB"})
+                return
+            body = await reader.readexactly(length) if length else b''
+            await self._route(method, target.split('?')[0].rstrip('/') or '/', body, writer)
+        except ValueError:
+            await _send_json(writer, 400, {'error': "malformed request"})
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes, writer: asyncio.StreamWriter):
+        parts = path.strip('/').split('/')
+        if parts == ['submissions'] and method == 'POST':
+            try:
+                code = json.loads(body)['code']
+                if not isinstance(code, str):
+                    raise TypeError
+            except (ValueError, KeyError, TypeError):
+                await _send_json(writer, 400, {'error': 'expected a JSON object with the code as "code"'})
+                return
+            try:
+                job, duplicate = self.submit(code)
+            except SubmissionError as error:
+                await _send_json(writer, 400, {'error': str(error)})
+                return
+            await _send_json(writer, 200 if duplicate else 202, dict(job.describe(), duplicate=duplicate))
+        elif parts[0] == 'jobs' and len(parts) in (2, 3) and method == 'GET':
+            job = self.jobs.get(parts[1])
+            if job is None:
+                await _send_json(writer, 404, {'error': f"no job {parts[1]!r}"})
+            elif len(parts) == 2:
+                await _send_json(writer, 200, job.describe())
+            elif parts[2] == 'events':
+                await _stream(writer, job.follow())
+            else:
+                await _send_json(writer, 404, {'error': 'not found'})
+        elif parts == ['leaderboard'] and method == 'GET':
+            await _send_json(writer, 200, self.leaderboard())
+        elif parts == ['leaderboard', 'events'] and method == 'GET':
+            await _stream(writer, self.follow_leaderboard())
+        elif parts[0] in ('submissions', 'jobs', 'leaderboard'):
+            await _send_json(writer, 405, {'error': f"{method} isn't allowed here"})
+        else:
+            await _send_json(writer, 404, {'error': 'not found'})
+
+
+def _head(status: int, content_type: str, extra: str = '') -> bytes:
+    return (f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\nContent-Type: {content_type}\r\n{extra}"
+            f"Connection: close\r\n\r\n").encode()
+
+
+async def _send_json(writer: asyncio.StreamWriter, status: int, payload):
+    body = json.dumps(payload).encode()
+    writer.write(_head(status, 'application/json', f"Content-Length: {len(body)}\r\n") + body)
+    await writer.drain()
+
+
+async def _stream(writer: asyncio.StreamWriter, items: AsyncIterator):
+    # Newline-delimited JSON in a chunked response, one chunk per item, until the items run out or
+    # the client goes away.
+    writer.write(_head(200, 'application/x-ndjson', "Transfer-Encoding: chunked\r\n"))
+    try:
+        async for item in items:
+            line = json.dumps(item).encode() + b'\n'
+            writer.write(f"{len(line):x}\r\n".encode() + line + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+    finally:
+        await items.aclose()
+
+
+async def _main(args):
+    from version1 import make_bots
+
+    service = Service(make_bots(), args.submissions, rounds=args.rounds, seed=args.seed,
+                      evaluations=args.evaluations, workers=args.workers)
+    server = await service.serve(args.host, args.port)
+    print(f"Taking submissions on http://{args.host}:{args.port}/submissions")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the bot submission service.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--submissions', default='submissions', help="folder the submitted code is kept in")
+    parser.add_argument('--rounds', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--evaluations', type=int, default=2, help="submissions evaluated at the same time")
+    parser.add_argument('--workers', type=int, help="sandbox worker processes per evaluation")
+    try:
+        asyncio.run(_main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
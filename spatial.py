@@ -0,0 +1,142 @@
+import numpy as np
+
+from engine import PrisonersDilemma
+
+# A spatial Prisoner's Dilemma on the Game of Life board from test.py. Every cell holds one bot from
+# the roster. Each generation every cell plays its 8 neighbours, then copies whichever bot in its
+# neighbourhood (itself included) scored best. Bots don't actually play here: a cell's score comes
+# from the matrix of average matchup scores (see evolution.matchup_matrix), and every step is done
+# for the whole board at once with shifted copies of it instead of looping over cells.
+
+NEIGHBOUR_OFFSETS = [(dx, dy) for dx in (-1, 0, 1) for dy in (-1, 0, 1) if (dx, dy) != (0, 0)]
+
+
+def initialize_grid(size, species, seed=None):
+    """
+    Fill a board with randomly chosen bots.
+
+    Args:
+    size (int): The size of the board.
+    species (int): The number of different bots.
+    seed (int): Seed for the random choice, optional.
+
+    Returns:
+    np.ndarray: A 2D numpy array of bot indexes.
+    """
+    return np.random.default_rng(seed).integers(species, size=(size, size), dtype=np.int32)
+
+
+def _padded(board, wrap, fill):
+    # A one cell border around the board, so each neighbour direction is just a slice of it.
+    if wrap:
+        return np.pad(board, 1, mode='wrap')
+    return np.pad(board, 1, mode='constant', constant_values=fill)
+
+
+def _neighbours(padded, shape):
+    rows, cols = shape
+    for dx, dy in NEIGHBOUR_OFFSETS:
+        yield padded[1 + dx:1 + dx + rows, 1 + dy:1 + dy + cols]
+
+
+def neighbour_payoffs(grid, matrix, wrap=True):
+    """
+    Score every cell against its 8 neighbours.
+
+    Args:
+    grid (np.ndarray): The board of bot indexes.
+    matrix (np.ndarray): matrix[i, j] is what bot i scores against bot j.
+    wrap (bool): Whether the board wraps around at the edges. If not, cells on the edge have fewer neighbours.
+
+    Returns:
+    np.ndarray: The total score of each cell.
+    """
+    species = len(matrix)
+    # An extra "nobody" bot outside the board that is worth nothing to play against.
+    extended = np.zeros((species + 1, species + 1))
+    extended[:species, :species] = matrix
+    padded = _padded(grid, wrap, species)
+    payoff = np.zeros(grid.shape)
+    for neighbour in _neighbours(padded, grid.shape):
+        payoff += extended[grid, neighbour]
+    return payoff
+
+
+def next_generation(grid, matrix, wrap=True):
+    """
+    Compute the next generation: every cell imitates the best scoring bot around it.
+
+    Args:
+    grid (np.ndarray): The current board of bot indexes.
+    matrix (np.ndarray): matrix[i, j] is what bot i scores against bot j.
+    wrap (bool): Whether the board wraps around at the edges.
+
+    Returns:
+    tuple: The next board and the scores the current board earned.
+    """
+    payoff = neighbour_payoffs(grid, matrix, wrap)
+    best_payoff = payoff.copy()
+    best_species = grid.copy()
+    padded_payoff = _padded(payoff, wrap, -np.inf)
+    padded_grid = _padded(grid, wrap, 0)
+    # Ties go to the cell's own bot, so a cell only changes when a neighbour did strictly better.
+    for neighbour_payoff, neighbour in zip(_neighbours(padded_payoff, grid.shape), _neighbours(padded_grid, grid.shape)):
+        better = neighbour_payoff > best_payoff
+        best_payoff[better] = neighbour_payoff[better]
+        best_species[better] = neighbour[better]
+    return best_species, payoff
+
+
+def spatial_tournament(matrix, size=100, generations=100, grid=None, wrap=True, seed=None):
+    """
+    Run the spatial game for a number of generations.
+
+    Args:
+    matrix (np.ndarray): matrix[i, j] is what bot i scores against bot j.
+    size (int): The size of the board, if no starting grid is given.
+    generations (int): The number of generations to run.
+    grid (np.ndarray): Starting board of bot indexes, optional.
+    wrap (bool): Whether the board wraps around at the edges.
+    seed (int): Seed for the starting board, optional.
+
+    Returns:
+    tuple: The final board and an array with the number of cells held by each bot in every generation.
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    grid = initialize_grid(size, len(matrix), seed) if grid is None else np.asarray(grid, dtype=np.int32)
+    counts = [np.bincount(grid.ravel(), minlength=len(matrix))]
+    for _ in range(generations):
+        new_grid, _ = next_generation(grid, matrix, wrap)
+        counts.append(np.bincount(new_grid.ravel(), minlength=len(matrix)))
+        if np.array_equal(new_grid, grid):
+            grid = new_grid
+            break
+        grid = new_grid
+    return grid, np.array(counts)
+
+
+def draw_grid(grid, species):
+    """
+    Draw the board using matplotlib, one colour per bot.
+
+    Args:
+    grid (np.ndarray): The board of bot indexes.
+    species (int): The number of different bots.
+    """
+    import matplotlib.pyplot as plt
+
+    plt.imshow(grid, cmap='tab20', vmin=0, vmax=max(species - 1, 1))
+    plt.draw()
+    plt.pause(0.1)
+    plt.clf()
+
+
+if __name__ == "__main__":
+    from evolution import matchup_matrix
+    from version1 import make_bots
+
+    bots = make_bots()
+    matrix = matchup_matrix(PrisonersDilemma(), bots)
+    grid, counts = spatial_tournament(matrix, size=200, generations=100)
+    for k in np.argsort(counts[-1])[::-1][:10]:
+        print(f"{bots[k].name}: {counts[-1][k]} cells")
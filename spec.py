@@ -0,0 +1,319 @@
+import argparse
+import csv
+import json
+import os
+import random
+import sys
+from typing import Dict, List, Optional, Tuple
+
+from engine import PrisonersDilemma, format_score
+from registry import Registry, BotEntry
+from tournament import round_robin, match_lengths
+
+# Tournaments described in a JSON file instead of being hard-coded in main():
+#
+#   {
+#     "bots": ["Tit for Tat", "Always Defect", "Random"],   or "all" for every bot in the plugin folders
+#                                                            (a bot listed twice plays as two players)
+#     "plugin_dirs": ["bots"],                               optional, relative to the spec file
+#     "rounds": [90, 110],                                   a number, or a range drawn from every repetition
+#     "continuation": null,                                  w: every match goes on after each round with
+#                                                            chance w instead, and "rounds" isn't used
+#     "noise": 0.0,
+#     "repetitions": 1,
+#     "seed": 1234,                                          null picks one (and the plan shows which)
+#     "payoffs": {"T": 5, "R": 3, "P": 1, "S": 0},
+#     "workers": null,                                       null uses every CPU
+#     "compile": false,                                      play simple bots as state machines (see fsm.py)
+#     "self_play": false,                                    every bot also plays a copy of itself
+#     "sandbox": {"move_time": 0.1, "match_time": 2.0, "memory": 512, "forfeit": "defect"},   optional
+#     "output": {"results": "round_robin_results.csv", "scores": "final_scores.csv",
+#                "summary": null, "store": null, "traces": null}
+#   }
+#
+#   python spec.py tournament.json            check the spec, then run it
+#   python spec.py tournament.json --dry-run  only check it and print the plan
+#
+# The whole spec is checked before anything runs, and every problem is reported at once. Only the
+# bots it names are ever imported, and NumPy only when an output needs it, so a small spec starts
+# in milliseconds.
+
+DEFAULT_PAYOFFS = {'T': 5, 'R': 3, 'P': 1, 'S': 0}
+DEFAULT_OUTPUT = {'results': 'round_robin_results.csv', 'scores': 'final_scores.csv', 'summary': None,
+                  'store': None, 'traces': None}
+SPEC_KEYS = {'bots', 'plugin_dirs', 'rounds', 'continuation', 'noise', 'repetitions', 'seed', 'payoffs', 'workers',
+             'compile', 'self_play', 'sandbox', 'output'}
+SANDBOX_KEYS = {'move_time', 'match_time', 'memory', 'forfeit'}
+
+
+class SpecError(ValueError):
+    def __init__(self, problems: List[str]):
+        super().__init__("Invalid tournament spec:\n  " + "\n  ".join(problems))
+        self.problems = problems
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def check_spec(spec: dict) -> List[str]:
+    """Returns everything wrong with a spec's shape and values (the bots are checked by compile_plan)."""
+    if not isinstance(spec, dict):
+        return ["the spec must be a JSON object"]
+    problems = [f"unknown key {key!r}" for key in sorted(set(spec) - SPEC_KEYS)]
+    bots = spec.get('bots')
+    if bots != 'all':
+        if not isinstance(bots, list) or not all(isinstance(name, str) for name in bots):
+            problems.append("'bots' must be a list of bot names, or \"all\"")
+        elif len(bots) < 2:
+            problems.append("'bots' needs at least two bots")
+    plugin_dirs = spec.get('plugin_dirs', [])
+    if not isinstance(plugin_dirs, list) or not all(isinstance(path, str) for path in plugin_dirs):
+        problems.append("'plugin_dirs' must be a list of folders")
+    rounds = spec.get('rounds', 100)
+    if _is_int(rounds):
+        if rounds < 1:
+            problems.append("'rounds' must be at least 1")
+    elif not (isinstance(rounds, list) and len(rounds) == 2 and all(_is_int(value) for value in rounds)
+              and 1 <= rounds[0] <= rounds[1]):
+        problems.append("'rounds' must be a number of rounds or a [lowest, highest] range")
+    continuation = spec.get('continuation')
+    if continuation is not None and (not _is_number(continuation) or not 0 <= continuation < 1):
+        problems.append("'continuation' must be a probability, at least 0 and below 1, or null")
+    noise = spec.get('noise', 0.0)
+    if not _is_number(noise) or not 0 <= noise <= 1:
+        problems.append("'noise' must be a probability between 0 and 1")
+    repetitions = spec.get('repetitions', 1)
+    if not _is_int(repetitions) or repetitions < 1:
+        problems.append("'repetitions' must be a whole number, at least 1")
+    seed = spec.get('seed')
+    if seed is not None and not _is_int(seed):
+        problems.append("'seed' must be a whole number or null")
+    payoffs = spec.get('payoffs', DEFAULT_PAYOFFS)
+    if not isinstance(payoffs, dict) or set(payoffs) != set(DEFAULT_PAYOFFS) \
+            or not all(_is_number(value) for value in payoffs.values()):
+        problems.append("'payoffs' must give numbers for exactly T, R, P and S")
+    workers = spec.get('workers')
+    if workers is not None and (not _is_int(workers) or workers < 1):
+        problems.append("'workers' must be a positive whole number or null")
+    for key in ('compile', 'self_play'):
+        if not isinstance(spec.get(key, False), bool):
+            problems.append(f"'{key}' must be true or false")
+    sandbox = spec.get('sandbox')
+    if sandbox is not None and spec.get('compile'):
+        # Compiling asks every bot for its moves right here, outside any sandbox.
+        problems.append("'compile' can't be used with 'sandbox'")
+    if sandbox is not None:
+        if not isinstance(sandbox, dict):
+            problems.append("'sandbox' must be an object")
+        else:
+            problems += [f"unknown sandbox key {key!r}" for key in sorted(set(sandbox) - SANDBOX_KEYS)]
+            for key in ('move_time', 'match_time'):
+                if key in sandbox and (not _is_number(sandbox[key]) or sandbox[key] <= 0):
+                    problems.append(f"sandbox '{key}' must be a positive number of seconds")
+            if sandbox.get('memory') is not None and (not _is_int(sandbox['memory']) or sandbox['memory'] < 1):
+                problems.append("sandbox 'memory' must be a positive number of MB or null")
+            if sandbox.get('forfeit', 'defect') not in ('defect', 'forfeit'):
+                problems.append("sandbox 'forfeit' must be \"defect\" or \"forfeit\"")
+    output = spec.get('output', {})
+    if not isinstance(output, dict):
+        problems.append("'output' must be an object")
+    else:
+        problems += [f"unknown output {key!r}" for key in sorted(set(output) - set(DEFAULT_OUTPUT))]
+        problems += [f"output {key!r} must be a path or null" for key, value in output.items()
+                     if value is not None and not isinstance(value, str)]
+    return problems
+
+
+class Plan:
+    """A checked spec, ready to run: which bots, and the rounds and seed of every repetition."""
+
+    def __init__(self, entries: List[BotEntry], game: PrisonersDilemma, schedule: List[Tuple[int, int]],
+                 workers: Optional[int], sandbox: Optional[dict], output: Dict[str, Optional[str]],
+                 continuation: Optional[float] = None, compiled: bool = False, self_play: bool = False):
+        self.entries = entries
+        self.game = game
+        self.schedule = schedule
+        self.workers = workers
+        self.sandbox = sandbox
+        self.output = output
+        self.continuation = continuation
+        self.compiled = compiled
+        self.self_play = self_play
+
+    @property
+    def names(self) -> List[str]:
+        # A bot listed more than once plays as that many separate players, told apart as "Name (2)" and so on.
+        names, seen = [], {}
+        for entry in self.entries:
+            seen[entry.name] = seen.get(entry.name, 0) + 1
+            names.append(entry.name if seen[entry.name] == 1 else f"{entry.name} ({seen[entry.name]})")
+        return names
+
+    def describe(self) -> str:
+        count = len(self.entries)
+        matches = count * (count - 1) // 2 + (count if self.self_play else 0)
+        lines = [f"{count} bots, {matches} matches per repetition, {len(self.schedule)} repetitions",
+                 f"payoffs {self.game.payoffs}, noise {self.game.noise}",
+                 "match length: fixed" if self.continuation is None
+                 else f"match length: goes on with chance {self.continuation} after every round",
+                 f"workers: {self.workers or 'all CPUs'}{', sandboxed' if self.sandbox is not None else ''}"
+                 f"{', simple bots compiled' if self.compiled else ''}{', with self-play' if self.self_play else ''}"]
+        lines += [f"  repetition {k + 1}: {rounds} rounds, seed {seed}" for k, (rounds, seed) in enumerate(self.schedule)]
+        lines += [f"  {name}: {self.output[name]}" for name in DEFAULT_OUTPUT if self.output[name]]
+        return "\n".join(lines)
+
+
+def _registry(plugin_dirs: Optional[List[str]], names) -> Registry:
+    # Entry points are slow to look up, so they're only searched for bots the plugin folders don't have.
+    registry = Registry(plugin_dirs, use_entry_points=False)
+    if names != 'all' and all(name in registry.entries for name in names):
+        return registry
+    return Registry(plugin_dirs, use_entry_points=True)
+
+
+def compile_plan(spec: dict, base_dir: str = '.') -> Plan:
+    """Checks a spec (raising SpecError with every problem found) and turns it into a Plan."""
+    problems = check_spec(spec)
+    if problems:
+        raise SpecError(problems)
+    plugin_dirs = [os.path.join(base_dir, path) for path in spec['plugin_dirs']] if 'plugin_dirs' in spec else None
+    names = spec['bots']
+    try:
+        registry = _registry(plugin_dirs, names)
+    except ValueError as error:
+        raise SpecError([str(error)]) from None
+    if names == 'all':
+        names = registry.names()
+    missing = [name for name in names if name not in registry.entries]
+    if missing:
+        raise SpecError([f"no bot called {name!r}" for name in missing])
+
+    payoffs = spec.get('payoffs', DEFAULT_PAYOFFS)
+    t, r, p, s = payoffs['T'], payoffs['R'], payoffs['P'], payoffs['S']
+    game = PrisonersDilemma({('cooperate', 'cooperate'): (r, r), ('cooperate', 'defect'): (s, t),
+                             ('defect', 'cooperate'): (t, s), ('defect', 'defect'): (p, p)}, noise=spec.get('noise', 0.0))
+
+    # Every repetition's rounds and seed are drawn now, so the plan says exactly what will be played.
+    seed = spec.get('seed')
+    rng = random.Random(random.randrange(2 ** 32) if seed is None else seed)
+    rounds = spec.get('rounds', 100)
+    low, high = (rounds, rounds) if _is_int(rounds) else rounds
+    schedule = [(rng.randint(low, high), rng.randrange(2 ** 32)) for _ in range(spec.get('repetitions', 1))]
+
+    output = dict(DEFAULT_OUTPUT, **spec.get('output', {}))
+    output = {key: os.path.join(base_dir, path) if path else None for key, path in output.items()}
+    return Plan([registry.entries[name] for name in names], game, schedule, spec.get('workers'), spec.get('sandbox'),
+                output, spec.get('continuation'), spec.get('compile', False), spec.get('self_play', False))
+
+
+def load_plan(path: str) -> Plan:
+    try:
+        with open(path) as f:
+            spec = json.load(f)
+    except ValueError as error:
+        raise SpecError([f"{path} is not valid JSON: {error}"]) from None
+    return compile_plan(spec, os.path.dirname(os.path.abspath(path)))
+
+
+def write_results_csv(names: List[str], results: Dict[Tuple[int, int], Tuple[float, float]], path: str):
+    """Writes the same matrix of "score - opponent score" strings main() has always written.
+
+    Every CSV of round robin results is written by this, whether it comes from a run, the results
+    store (store.py) or an incremental tournament. Pairings that weren't played are left empty.
+    """
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow([''] + names)
+        for i, name in enumerate(names):
+            row = [name]
+            for j in range(len(names)):
+                if (i, j) in results:
+                    score, opponent_score = results[(i, j)]
+                elif (j, i) in results:
+                    opponent_score, score = results[(j, i)]
+                else:
+                    # Only a tournament with self-play has the diagonal.
+                    row.append("")
+                    continue
+                row.append(f"{format_score(score)} - {format_score(opponent_score)}")
+            writer.writerow(row)
+
+
+def write_scores_csv(names: List[str], totals: List[float], path: str):
+    # Bots from the highest total down, ties in roster order. Like write_results_csv, the only writer of these files.
+    with open(path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(["Bot", "Points"])
+        for k in sorted(range(len(names)), key=lambda k: totals[k], reverse=True):
+            writer.writerow([names[k], format_score(totals[k])])
+
+
+def run_plan(plan: Plan) -> List[int]:
+    """Plays every repetition, writes the outputs and returns each bot's total over all of them."""
+    names = plan.names
+    bots = [entry.make_bot() for entry in plan.entries]
+    if plan.compiled:
+        from fsm import compile_bots
+        bots, _ = compile_bots(bots)
+    output = plan.output
+    # The outputs that need NumPy are only imported when they're asked for.
+    store = recorder = stats = sandbox = None
+    if output['store']:
+        from store import ResultsStore, roster_id
+        store = ResultsStore(os.path.join(output['store'], roster_id(names)), names)
+    if output['traces']:
+        from traces import TraceRecorder
+        recorder = TraceRecorder(names)
+    if output['summary']:
+        from summary import TournamentStats
+        stats = TournamentStats(names)
+    if plan.sandbox is not None:
+        from sandbox import Sandbox, SandboxPolicy
+        sandbox = Sandbox(SandboxPolicy(**plan.sandbox), plan.workers)
+    cache = None
+    if recorder is None and stats is None and sandbox is None and len(plan.schedule) > 1:
+        from cache import MatchCache
+        cache = MatchCache()
+
+    results = {}
+    for rounds, seed in plan.schedule:
+        results = round_robin(plan.game, bots, rounds, seed=seed, workers=plan.workers, cache=cache,
+                              recorder=recorder, stats=stats, sandbox=sandbox, continuation=plan.continuation,
+                              self_play=plan.self_play)
+        if store is not None:
+            store.add_run(results, rounds, seed, match_lengths(results, rounds, seed, plan.continuation))
+
+    # The matrix shows the last repetition; the scores add up all of them.
+    if output['results']:
+        write_results_csv(names, results, output['results'])
+    totals = [bot.score for bot in bots]
+    if output['scores']:
+        write_scores_csv(names, totals, output['scores'])
+    if stats is not None:
+        stats.save(output['summary'])
+    if recorder is not None:
+        recorder.save(output['traces'])
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a Prisoner's Dilemma tournament described in a JSON file.")
+    parser.add_argument('spec', help="the tournament spec file")
+    parser.add_argument('--dry-run', action='store_true', help="check the spec and show the plan without running it")
+    args = parser.parse_args()
+
+    try:
+        plan = load_plan(args.spec)
+    except (SpecError, OSError) as error:
+        print(error, file=sys.stderr)
+        raise SystemExit(2)
+    print(plan.describe())
+    if not args.dry_run:
+        totals = run_plan(plan)
+        best = max(range(len(totals)), key=totals.__getitem__)
+        print(f"Done. {plan.names[best]} scored the most, {totals[best]} points.")
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from spec import write_results_csv, write_scores_csv
+from tournament import Pairing
+
+# Tournament results as NumPy arrays on disk, instead of "227 - 212" strings in a CSV. A store is a
+# folder holding:
+#
+#   meta.json    the bot names (a bot's id is its position in that list) and how many runs there are
+#   scores.npy   scores[run, i, j] is what bot i scored against bot j in that run, NaN if they didn't play
+#                (floats, since payoffs can be fractions or negative)
+#   rounds.npy   rounds[run], the number of rounds the run was played with
+#   lengths.npy  lengths[run, i, j], how many rounds the match between bots i and j lasted, 0 if they
+#                didn't play. Only different from rounds[run] with a continuation probability.
+#   seeds.npy    seeds[run], the seed the run was played with (-1 if unknown)
+#
+# The arrays are opened memory-mapped, so summing 10,000 tournaments is a reduction over a file
+# rather than parsing 10,000 CSVs, and never needs all of it in memory at once.
+
+NO_SEED = -1
+META_FILE = 'meta.json'
+
+
+def roster_id(bot_names: List[str]) -> str:
+    # A short name for a roster, so every set of bots gets its own store.
+    return hashlib.sha1(json.dumps(list(bot_names)).encode()).hexdigest()[:12]
+
+
+class ResultsStore:
+    def __init__(self, path: str, bot_names: Optional[List[str]] = None, capacity: int = 16):
+        """Opens the store in folder `path`, creating it if bot_names are given and it doesn't exist yet."""
+        self.path = path
+        meta_path = os.path.join(path, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                meta = json.load(f)
+            if bot_names is not None and list(bot_names) != meta['bots']:
+                raise ValueError(f"{path} holds results for different bots")
+            self.bot_names = meta['bots']
+            self.runs = meta['runs']
+            self._scores = np.load(self._file('scores'), mmap_mode='r+')
+            self._rounds = np.load(self._file('rounds'), mmap_mode='r+')
+            self._seeds = np.load(self._file('seeds'), mmap_mode='r+')
+            if self._scores.dtype != np.float64:
+                self._upgrade()
+            if os.path.exists(self._file('lengths')):
+                self._lengths = np.load(self._file('lengths'), mmap_mode='r+')
+            else:
+                self._add_lengths()
+        else:
+            if bot_names is None:
+                raise FileNotFoundError(f"No results store in {path}")
+            os.makedirs(path, exist_ok=True)
+            self.bot_names = list(bot_names)
+            self.runs = 0
+            self._allocate(max(capacity, 1))
+            self._save_meta()
+
+    def _file(self, name: str) -> str:
+        return os.path.join(self.path, name + '.npy')
+
+    def _allocate(self, capacity: int):
+        # (Re)creates the files with room for `capacity` runs, keeping whatever runs are already stored.
+        count = len(self.bot_names)
+        arrays = {'scores': ((capacity, count, count), np.float64, np.nan), 'rounds': ((capacity,), np.int32, 0),
+                  'lengths': ((capacity, count, count), np.int32, 0), 'seeds': ((capacity,), np.int64, NO_SEED)}
+        for name, (shape, dtype, empty) in arrays.items():
+            old = getattr(self, '_' + name, None)
+            temporary = self._file(name + '.tmp')
+            new = np.lib.format.open_memmap(temporary, mode='w+', dtype=dtype, shape=shape)
+            new[:] = empty
+            if old is not None:
+                new[:self.runs] = old[:self.runs]
+            new.flush()
+            del new, old
+            setattr(self, '_' + name, None)
+            os.replace(temporary, self._file(name))
+            setattr(self, '_' + name, np.load(self._file(name), mmap_mode='r+'))
+
+    def _upgrade(self):
+        # Stores written before scores were floats kept them as int32, with -1 for "didn't play".
+        old = self._scores
+        temporary = self._file('scores.tmp')
+        new = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.float64, shape=old.shape)
+        new[:] = np.where(old == -1, np.nan, old)
+        new.flush()
+        del new, old
+        self._scores = None
+        os.replace(temporary, self._file('scores'))
+        self._scores = np.load(self._file('scores'), mmap_mode='r+')
+
+    def _add_lengths(self):
+        # Stores written before match lengths were kept: every match of a run lasted its rounds.
+        count = len(self.bot_names)
+        temporary = self._file('lengths.tmp')
+        new = np.lib.format.open_memmap(temporary, mode='w+', dtype=np.int32, shape=(len(self._rounds), count, count))
+        new[:] = np.where(np.isnan(self._scores), 0, self._rounds[:, None, None])
+        new.flush()
+        del new
+        os.replace(temporary, self._file('lengths'))
+        self._lengths = np.load(self._file('lengths'), mmap_mode='r+')
+
+    def _save_meta(self):
+        with open(os.path.join(self.path, META_FILE), 'w') as f:
+            json.dump({'bots': self.bot_names, 'runs': self.runs}, f)
+
+    def add_run(self, results: Dict[Pairing, Tuple[int, int]], rounds: int, seed: Optional[int] = None,
+                lengths: Optional[Dict[Pairing, int]] = None) -> int:
+        """Stores one round robin (as returned by tournament.round_robin) and returns its run number.
+
+        lengths gives every match's number of rounds (see tournament.match_lengths), if they weren't all `rounds`.
+        """
+        if self.runs == len(self._rounds):
+            self._allocate(2 * len(self._rounds))
+        run = self.runs
+        matrix = self._scores[run]
+        played = self._lengths[run]
+        for (i, j), (score1, score2) in results.items():
+            # A self-play match (i == j) keeps its first side's score on the diagonal.
+            matrix[j, i] = score2
+            matrix[i, j] = score1
+            played[i, j] = played[j, i] = rounds if lengths is None else lengths[(i, j)]
+        self._rounds[run] = rounds
+        self._seeds[run] = NO_SEED if seed is None else seed
+        self.runs += 1
+        self.flush()
+        return run
+
+    def flush(self):
+        self._scores.flush()
+        self._rounds.flush()
+        self._lengths.flush()
+        self._seeds.flush()
+        self._save_meta()
+
+    @property
+    def scores(self) -> np.ndarray:
+        # (runs, bots, bots), memory-mapped.
+        return self._scores[:self.runs]
+
+    @property
+    def rounds(self) -> np.ndarray:
+        return self._rounds[:self.runs]
+
+    @property
+    def lengths(self) -> np.ndarray:
+        # (runs, bots, bots), memory-mapped.
+        return self._lengths[:self.runs]
+
+    @property
+    def seeds(self) -> np.ndarray:
+        return self._seeds[:self.runs]
+
+    def played(self) -> np.ndarray:
+        return ~np.isnan(self.scores)
+
+    def totals(self) -> np.ndarray:
+        # (runs, bots): each bot's tournament total in every run, like Bot.score.
+        return np.nansum(self.scores, axis=2)
+
+    def per_round(self) -> np.ndarray:
+        # Scores divided by the number of rounds each match lasted, so matches of different lengths can
+        # be compared. NaN where not played.
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return self.scores / self.lengths
+
+    def mean_matrix(self) -> np.ndarray:
+        # Average score of i against j over every run where they played.
+        scores = self.scores
+        played = ~np.isnan(scores)
+        total = np.where(played, scores, 0).sum(axis=0)
+        count = played.sum(axis=0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(count > 0, total / np.maximum(count, 1), np.nan)
+
+    def results(self, run: int = -1) -> Dict[Pairing, Tuple[float, float]]:
+        # One run as tournament.round_robin returned it, {(i, j): (score_i, score_j)} for i <= j.
+        matrix = self.scores[run]
+        return {(int(i), int(j)): (matrix[i, j], matrix[j, i]) for i, j in zip(*np.nonzero(~np.isnan(matrix)))
+                if i <= j}
+
+    def export_csv(self, run: int = -1, path: str = 'round_robin_results.csv'):
+        """Writes one run as the classic matrix of "score - opponent score" strings."""
+        write_results_csv(self.bot_names, self.results(run), path)
+
+    def export_final_scores(self, run: int = -1, path: str = 'final_scores.csv'):
+        write_scores_csv(self.bot_names, list(self.totals()[run]), path)
@@ -0,0 +1,123 @@
+import csv
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from engine import format_score
+
+# Per-bot and per-matchup statistics, built up one match at a time as a tournament plays (pass a
+# TournamentStats to tournament.round_robin). Each match only arrives as engine.match_summary's
+# counts, never as its full history, and everything here is running sums plus Welford's running
+# variance kept in NumPy arrays, so the statistics of a 1,000 bot tournament are a few MB and are
+# complete as soon as the last match is.
+#
+# Besides the scores it measures how bots behave:
+#   cooperation rate  share of all rounds in which the bot cooperated
+#   retaliation rate  how often the bot defected right after its opponent defected
+#   forgiveness rate  how often the bot went back to cooperating right after a round in which it
+#                     defected and its opponent cooperated (i.e. once the opponent made peace)
+
+# The outcome code seen from the other player's side: (move1, move2) becomes (move2, move1).
+SWAPPED = (0, 2, 1, 3)
+
+COLUMNS = ["Bot Name", "Average Score For", "Total Score For", "Average Score Against", "Total Score Against",
+           "Score Std Dev", "Cooperation Rate", "Retaliation Rate", "Forgiveness Rate"]
+
+
+def behaviour_counts(counts: List[int], transitions: List[int]) -> Tuple[int, int, int, int, int]:
+    # Player 1's (cooperations, retaliation chances, retaliations, forgiveness chances, forgivenesses).
+    # Outcome code 2 * own move + opponent move: codes 0 and 1 are own cooperation, 1 and 3 the opponent's defection.
+    cooperations = counts[0] + counts[1]
+    retaliation_chances = retaliations = 0
+    for previous in (1, 3):
+        row = transitions[4 * previous:4 * previous + 4]
+        retaliation_chances += sum(row)
+        retaliations += row[2] + row[3]
+    row = transitions[8:12]
+    return cooperations, retaliation_chances, retaliations, sum(row), row[0] + row[1]
+
+
+def swap_summary(counts: List[int], transitions: List[int]) -> Tuple[List[int], List[int]]:
+    # The same summary from player 2's side.
+    return ([counts[SWAPPED[code]] for code in range(4)],
+            [transitions[4 * SWAPPED[previous] + SWAPPED[following]] for previous in range(4) for following in range(4)])
+
+
+def _rate(numerator, denominator):
+    return numerator / denominator if denominator else ''
+
+
+class TournamentStats:
+    def __init__(self, bot_names: List[str]):
+        self.bot_names = list(bot_names)
+        count = len(bot_names)
+        self.matches = np.zeros(count, dtype=np.int64)
+        self.rounds = np.zeros(count, dtype=np.int64)
+        # Floats, since payoffs can be fractions.
+        self.score_for = np.zeros(count)
+        self.score_against = np.zeros(count)
+        # (cooperations, retaliation chances, retaliations, forgiveness chances, forgivenesses) per bot.
+        self.behaviour = np.zeros((count, 5), dtype=np.int64)
+        # Welford state of each bot's score per round, one value per match.
+        self.round_mean = np.zeros(count)
+        self._round_m2 = np.zeros(count)
+        # Welford state of what bot i scores against bot j in a match, over every time they met.
+        self.matchup_count = np.zeros((count, count), dtype=np.int64)
+        self.matchup_mean = np.zeros((count, count))
+        self._matchup_m2 = np.zeros((count, count))
+
+    def add_match(self, i: int, j: int, rounds: int, scores: Tuple[int, int], summary: Tuple[List[int], List[int]]):
+        """Adds one match between bots i and j, given its scores and engine.match_summary."""
+        sides = ((i, j, scores[0], scores[1], summary), (j, i, scores[1], scores[0], swap_summary(*summary)))
+        # A bot playing itself is one match for it, counted from its first side.
+        for bot, opponent, score, opponent_score, (counts, transitions) in sides[:1 if i == j else 2]:
+            self.matches[bot] += 1
+            self.rounds[bot] += rounds
+            self.score_for[bot] += score
+            self.score_against[bot] += opponent_score
+            self.behaviour[bot] += behaviour_counts(counts, transitions)
+            if rounds:
+                value = score / rounds
+                delta = value - self.round_mean[bot]
+                self.round_mean[bot] += delta / self.matches[bot]
+                self._round_m2[bot] += delta * (value - self.round_mean[bot])
+            self.matchup_count[bot, opponent] += 1
+            delta = score - self.matchup_mean[bot, opponent]
+            self.matchup_mean[bot, opponent] += delta / self.matchup_count[bot, opponent]
+            self._matchup_m2[bot, opponent] += delta * (score - self.matchup_mean[bot, opponent])
+
+    @property
+    def round_stdev(self) -> np.ndarray:
+        # How much a bot's score per round varies from match to match.
+        return np.sqrt(self._round_m2 / np.maximum(self.matches - 1, 1))
+
+    @property
+    def matchup_stdev(self) -> np.ndarray:
+        return np.sqrt(self._matchup_m2 / np.maximum(self.matchup_count - 1, 1))
+
+    def rates(self, bot: int) -> Tuple[float, float, float]:
+        # Cooperation, retaliation and forgiveness rate of one bot ('' where it never had the chance).
+        cooperations, retaliation_chances, retaliations, forgiveness_chances, forgivenesses = self.behaviour[bot]
+        return (_rate(cooperations, self.rounds[bot]), _rate(retaliations, retaliation_chances),
+                _rate(forgivenesses, forgiveness_chances))
+
+    def save(self, path: str = 'summary_statistics.csv'):
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(COLUMNS)
+            stdev = self.round_stdev
+            for k, name in enumerate(self.bot_names):
+                rounds = self.rounds[k]
+                writer.writerow([name, _rate(self.score_for[k], rounds), format_score(self.score_for[k]),
+                                 _rate(self.score_against[k], rounds), format_score(self.score_against[k]), stdev[k],
+                                 *self.rates(k)])
+
+    def save_matchups(self, path: str = 'matchup_statistics.csv', bots: Optional[List[int]] = None):
+        stdev = self.matchup_stdev
+        with open(path, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["Bot Name", "Opponent", "Matches", "Mean Score", "Std Dev"])
+            for i in range(len(self.bot_names)) if bots is None else bots:
+                for j in np.flatnonzero(self.matchup_count[i]):
+                    writer.writerow([self.bot_names[i], self.bot_names[j], int(self.matchup_count[i, j]),
+                                     self.matchup_mean[i, j], stdev[i, j]])
@@ -0,0 +1,44 @@
+import numpy as np
+
+import version1
+from batch import TableStrategy, play_batch
+from cache import MatchCache
+from engine import PrisonersDilemma, Bot, run_simulation
+from tournament import round_robin
+
+ALWAYS_COOPERATE = TableStrategy("Always Cooperate", 1, [1, 1, 1, 1, 1])
+ALWAYS_DEFECT = TableStrategy("Always Defect", 1, [0, 0, 0, 0, 0])
+TIT_FOR_TAT = TableStrategy.from_bot(Bot("Tit for Tat", version1.tit_for_tat, memory=1))
+
+
+def test_tables_play_like_their_bots():
+    strategies = [TIT_FOR_TAT, ALWAYS_DEFECT, ALWAYS_COOPERATE]
+    pairs = [(i, j) for i in range(3) for j in range(3)]
+    scores, _ = play_batch(strategies, pairs, 50)
+    for (i, j), batch_scores in zip(pairs, scores):
+        expected = run_simulation(PrisonersDilemma(), strategies[i].as_bot(), strategies[j].as_bot(), 50)
+        assert tuple(batch_scores) == expected
+
+
+def test_fractional_payoffs_are_kept():
+    game = PrisonersDilemma({('cooperate', 'cooperate'): (2.5, 2.5), ('cooperate', 'defect'): (-1, 5.5),
+                             ('defect', 'cooperate'): (5.5, -1), ('defect', 'defect'): (0.5, 0.5)})
+    scores, _ = play_batch([ALWAYS_DEFECT, ALWAYS_COOPERATE], [(0, 1), (1, 1)], 10, game)
+    assert np.array_equal(scores, [[55, -10], [25, 25]])
+
+
+def test_table_bots_share_no_cache_entries():
+    game = PrisonersDilemma()
+    cache = MatchCache()
+    round_robin(game, [ALWAYS_COOPERATE.as_bot(), ALWAYS_COOPERATE.as_bot()], 10, seed=1, workers=1, cache=cache)
+    results = round_robin(game, [ALWAYS_DEFECT.as_bot(), ALWAYS_COOPERATE.as_bot()], 10, seed=1, workers=1,
+                          cache=cache)
+    assert results[(0, 1)] == (50, 0)
+
+
+def test_each_table_keeps_its_own_noise():
+    noisy = TableStrategy("Noisy Cooperator", 1, [1, 1, 1, 1, 1], noise=0.5)
+    pairs = [(0, 1)] * 2000
+    scores, outcomes = play_batch([ALWAYS_COOPERATE, noisy], pairs, 10, seed=3, record=True)
+    assert not (outcomes & 2).any()
+    assert 0.45 < (outcomes & 1).mean() < 0.55
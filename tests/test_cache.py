@@ -0,0 +1,52 @@
+import version1
+from cache import MatchCache, is_deterministic, strategy_key
+from engine import PrisonersDilemma, Bot
+from tournament import round_robin
+
+NAMES = ['tit_for_tat', 'always_defect', 'Rock_4', 'doggo', 'copykitr', 'exploitnoobs', 'random_choice', 'madness']
+
+
+def make_bots():
+    return [Bot(name, getattr(version1, name)) for name in NAMES]
+
+
+def test_cached_results_are_the_same():
+    game = PrisonersDilemma()
+    plain = round_robin(game, make_bots(), 100, seed=3, workers=1)
+    cache = MatchCache()
+    first = round_robin(game, make_bots(), 100, seed=3, workers=1, cache=cache)
+    assert cache.hits == 0 and len(cache) > 0
+    second = round_robin(game, make_bots(), 100, seed=3, workers=1, cache=cache)
+    assert cache.hits > 0
+    assert plain == first == second
+
+
+def test_random_bots_are_not_deterministic():
+    assert is_deterministic(Bot("TFT", version1.tit_for_tat))
+    assert not is_deterministic(Bot("Random", version1.random_choice))
+
+
+def always(move):
+    def strategy(history):
+        return move
+    return strategy
+
+
+def test_closures_over_different_values_are_told_apart():
+    # Same code and name, different moves: they must not share cache entries.
+    assert strategy_key(Bot("C", always('cooperate'))) != strategy_key(Bot("D", always('defect')))
+    assert strategy_key(Bot("C", always('cooperate'))) == strategy_key(Bot("C again", always('cooperate')))
+    game = PrisonersDilemma()
+    cache = MatchCache()
+    round_robin(game, [Bot("C", always('cooperate')), Bot("C2", always('cooperate'))], 10, seed=1, workers=1,
+                cache=cache)
+    results = round_robin(game, [Bot("D", always('defect')), Bot("C", always('cooperate'))], 10, seed=1, workers=1,
+                          cache=cache)
+    assert results[(0, 1)] == (50, 0)
+
+
+def test_unidentifiable_strategies_are_not_cached():
+    moves = ['cooperate']
+    mutable = Bot("Mutable", lambda history: moves[0])
+    assert strategy_key(mutable) is None
+    assert not MatchCache().cacheable(PrisonersDilemma(), mutable, Bot("TFT", version1.tit_for_tat))
@@ -0,0 +1,77 @@
+import random
+
+import pytest
+
+import version1
+from engine import PrisonersDilemma, Bot, play_match, run_simulation
+
+# The engine has to play every match exactly like the original run_simulation did: the same moves,
+# so the same scores, given the same random numbers.
+
+# Every strategy in the original main(), in its order (TryHard is an agent and plays differently).
+STRATEGIES = ['peanut', 'Rock_4', 'Sujith3', 'gustavo_6', 'simpl', 'joeTry1', 'last_straw', 'Rock_3', 'glass',
+              'copykitr2', 'always_defect', 'tit_for_tat', 'random_choice', 'Rock_7', 'dannyCopy', 'doggo',
+              'joeEvil', 'danny', 'Hyeon', 'gustavo', 'Bains', 'checkLastThree', 'copykitr', 'madness',
+              'dannyDefect', 'giyushino', 'gustavoSecond', 'simon_last_turn_defect', 'gamblingbutbetter', 'Rock_1',
+              'garymccready', 'simon_1', 'Rock_2', 'Sujith', 'gustavo_5', 'exploitnoobs', 'kitcat_tm', 'gustavo_3',
+              'Sujith2', 'gustavo_4', 'Bains2', 'insanity', 'cruelty', 'Rock_5', 'Rock_6']
+
+PAYOFFS = {('cooperate', 'cooperate'): (3, 3), ('cooperate', 'defect'): (0, 5),
+           ('defect', 'cooperate'): (5, 0), ('defect', 'defect'): (1, 1)}
+
+
+def reference_simulation(strategy1, strategy2, rounds):
+    # The original run_simulation, string tuples and all.
+    history = []
+    total1 = total2 = 0
+    for _ in range(rounds):
+        move1 = strategy1(history)
+        move2 = strategy2([(m2, m1) for m1, m2 in history])
+        score1, score2 = PAYOFFS[(move1, move2)]
+        total1 += score1
+        total2 += score2
+        history.append((move1, move2))
+    return total1, total2
+
+
+@pytest.mark.parametrize('first', STRATEGIES)
+def test_same_scores_as_the_original_engine(first):
+    strategy1 = getattr(version1, first)
+    for second in STRATEGIES:
+        strategy2 = getattr(version1, second)
+        random.seed(first + second)
+        expected = reference_simulation(strategy1, strategy2, 100)
+        random.seed(first + second)
+        bot1, bot2 = Bot(first, strategy1), Bot(second, strategy2)
+        assert run_simulation(PrisonersDilemma(), bot1, bot2, 100) == expected, second
+        assert (bot1.score, bot2.score) == expected
+
+
+def test_encoded_bots_see_move_codes():
+    seen = []
+
+    def encoded(history):
+        seen.append(list(history))
+        return 1
+
+    run_simulation(PrisonersDilemma(), Bot("Encoded", encoded, encoded=True), Bot("TFT", version1.tit_for_tat), 3)
+    assert seen == [[], [(1, 0)], [(1, 0), (1, 1)]]
+
+
+def test_invalid_moves_are_refused():
+    with pytest.raises(ValueError):
+        run_simulation(PrisonersDilemma(), Bot("Bad", lambda history: 'maybe'), Bot("TFT", version1.tit_for_tat), 5)
+
+
+def test_match_generators_only_stand_in_for_the_random_module_during_the_match():
+    original = random.random
+    seen = []
+
+    def draws(history):
+        seen.append(random.random())
+        return 'cooperate'
+
+    play_match(PrisonersDilemma(), Bot("Draws", draws), Bot("TFT", version1.tit_for_tat), 3, rng=random.Random(5))
+    expected = random.Random(5)
+    assert seen == [expected.random() for _ in range(3)]
+    assert random.random is original
@@ -0,0 +1,54 @@
+import itertools
+import random
+
+import pytest
+
+import version1
+from engine import PrisonersDilemma, Bot, play_match
+from fsm import NotCompilable, compile_bot, compile_bots
+
+# A compiled bot has to play exactly like the Python strategy it was compiled from, against compiled
+# and uncompiled opponents alike, with noise or without.
+
+ORIGINAL = version1.make_bots()
+COMPILED, REASONS = compile_bots(version1.make_bots())
+# Positions of the bots that did compile.
+MACHINES = [k for k, bot in enumerate(COMPILED) if bot.machine is not None]
+
+
+def test_simple_bots_compile():
+    names = {COMPILED[k].name for k in MACHINES}
+    assert {"Tit for Tat", "Always Defect", "Checks 3", "Bains2"} <= names
+    assert REASONS["Random"] == "it uses randomness"
+
+
+@pytest.mark.parametrize('noise', [0.0, 0.05])
+def test_machines_play_like_their_strategies(noise):
+    game = PrisonersDilemma(noise=noise)
+    for seed, (i, j) in enumerate(itertools.combinations_with_replacement(MACHINES, 2)):
+        rounds = 150 + seed % 7
+        expected = play_match(game, ORIGINAL[i], ORIGINAL[j], rounds, seed=seed)
+        assert play_match(game, COMPILED[i], COMPILED[j], rounds, seed=seed) == expected, (ORIGINAL[i].name,
+                                                                                         ORIGINAL[j].name)
+        # Against a bot that wasn't compiled the machine answers move by move instead.
+        assert play_match(game, COMPILED[i], ORIGINAL[j], rounds, seed=seed) == expected
+
+
+def test_machines_play_like_their_strategies_against_random_bots():
+    game = PrisonersDilemma()
+    opponent = version1.make_bots(["Random"])[0]
+    for k in MACHINES:
+        random.seed(k)
+        expected = play_match(game, ORIGINAL[k], opponent, 100)
+        random.seed(k)
+        assert play_match(game, COMPILED[k], opponent, 100) == expected
+
+
+def grudger(history):
+    # Remembers everything, so no small machine explains it.
+    return 'defect' if any(opponent == 'defect' for _, opponent in history) else 'cooperate'
+
+
+def test_long_memories_are_not_compiled():
+    with pytest.raises(NotCompilable):
+        compile_bot(Bot("Grudger", grudger))
@@ -0,0 +1,58 @@
+import pytest
+
+from engine import Bot
+from incremental import bot_hash
+from registry import Registry
+
+PLUGIN = '''import random
+
+from registry import bot
+
+LIMIT = 3
+
+
+def grumpy(history):
+    return sum(opponent == 'defect' for _, opponent in history) >= LIMIT
+
+
+@bot("Grudger")
+def grudger(history):
+    return 'defect' if grumpy(history) else 'cooperate'
+
+
+@bot("Coin")
+def coin(history):
+    return random.choice(['cooperate', 'defect'])
+'''
+
+
+def hashes(tmp_path, source):
+    # A new folder every time, so the registry's scan cache can't hand back the last version.
+    folder = tmp_path / str(len(list(tmp_path.iterdir())))
+    folder.mkdir()
+    (folder / 'plugin.py').write_text(source)
+    registry = Registry([str(folder)], use_entry_points=False)
+    return {name: bot_hash(registry.make_bot(name)) for name in registry.names()}
+
+
+def test_editing_a_bot_only_changes_its_own_hash(tmp_path):
+    before = hashes(tmp_path, PLUGIN)
+    edited = hashes(tmp_path, PLUGIN.replace("['cooperate', 'defect']", "['defect', 'cooperate']"))
+    assert edited['Coin'] != before['Coin'] and edited['Grudger'] == before['Grudger']
+
+
+def test_helpers_count_as_part_of_the_bots_using_them(tmp_path):
+    before = hashes(tmp_path, PLUGIN)
+    edited = hashes(tmp_path, PLUGIN.replace("LIMIT = 3", "LIMIT = 4"))
+    assert edited['Grudger'] != before['Grudger'] and edited['Coin'] == before['Coin']
+
+
+def test_comments_and_layout_dont_count(tmp_path):
+    before = hashes(tmp_path, PLUGIN)
+    assert hashes(tmp_path, "# Two bots.\n" + PLUGIN.replace("\n\n\n", "\n\n\n\n")) == before
+
+
+def test_unidentifiable_bots_are_refused():
+    moves = ['cooperate']
+    with pytest.raises(ValueError, match="Closure"):
+        bot_hash(Bot("Closure", lambda history: moves[-1]))
@@ -0,0 +1,90 @@
+import time
+
+from engine import PrisonersDilemma, Bot
+from registry import Registry
+from sandbox import Sandbox, SandboxPolicy
+from tournament import round_robin
+
+# Whatever a sandboxed bot does, the tournament finishes, and the bot that broke the rules is the
+# one that pays for it.
+
+ROUNDS = 20
+
+
+def cooperates(history):
+    return 'cooperate'
+
+
+def loops_on_third_move(history):
+    while len(history) == 2:
+        pass
+    return 'cooperate'
+
+
+def fails_on_third_move(history):
+    if len(history) == 2:
+        raise RuntimeError("oops")
+    return 'cooperate'
+
+
+def play(bots, policy, workers=2):
+    sandbox = Sandbox(policy, workers)
+    results = round_robin(PrisonersDilemma(), bots, ROUNDS, seed=1, sandbox=sandbox)
+    return results, sandbox.faults
+
+
+def test_slow_moves_count_as_defections():
+    bots = [Bot("Loops", loops_on_third_move), Bot("Cooperates", cooperates)]
+    results, faults = play(bots, SandboxPolicy(move_time=0.05))
+    assert results[(0, 1)] == (3 * (ROUNDS - 1) + 5, 3 * (ROUNDS - 1))
+    assert faults == [(0, 1, 0, 'move time')]
+
+
+def test_errors_count_as_defections():
+    bots = [Bot("Cooperates", cooperates), Bot("Fails", fails_on_third_move)]
+    results, faults = play(bots, SandboxPolicy())
+    assert results[(0, 1)] == (3 * (ROUNDS - 1), 3 * (ROUNDS - 1) + 5)
+    assert faults == [(0, 1, 1, 'error: RuntimeError: oops')]
+
+
+def test_errors_can_forfeit_the_match():
+    bots = [Bot("Fails", fails_on_third_move), Bot("Cooperates", cooperates)]
+    results, faults = play(bots, SandboxPolicy(forfeit='forfeit'))
+    assert results[(0, 1)] == (0, 3 * ROUNDS)
+    assert faults == [(0, 1, 0, 'error: RuntimeError: oops')]
+
+
+def plugin_bots(tmp_path, body):
+    # Three cooperators and a plugin that does `body` as it is imported.
+    (tmp_path / 'hostile.py').write_text(f"from registry import bot\n\n{body}\n\n\n"
+                                         f"@bot(\"Hostile\")\ndef hostile(history):\n    return 'defect'\n")
+    hostile = Registry([str(tmp_path)], use_entry_points=False).make_bot("Hostile")
+    return [Bot(f"Cooperates {k}", cooperates) for k in range(3)] + [hostile]
+
+
+def check_forfeits(results, faults, fault):
+    for k in range(3):
+        assert results[(k, 3)] == (3 * ROUNDS, 0)
+    assert sorted(faults) == [(k, 3, 3, fault) for k in range(3)]
+
+
+def test_plugin_that_hangs_on_import_forfeits(tmp_path):
+    bots = plugin_bots(tmp_path, "while True:\n    pass")
+    start = time.monotonic()
+    results, faults = play(bots, SandboxPolicy(startup_time=0.5))
+    check_forfeits(results, faults, 'load time')
+    # Every worker gives up on it once, instead of for every match.
+    assert time.monotonic() - start < 5
+
+
+def test_plugin_that_sleeps_on_import_forfeits(tmp_path):
+    # Sleeping uses no CPU time, so only the wall clock catches it.
+    bots = plugin_bots(tmp_path, "import time\ntime.sleep(60)")
+    results, faults = play(bots, SandboxPolicy(startup_time=0.5), workers=1)
+    check_forfeits(results, faults, 'killed while loading')
+
+
+def test_plugin_that_fails_to_import_forfeits(tmp_path):
+    bots = plugin_bots(tmp_path, "raise ImportError('no such thing')")
+    results, faults = play(bots, SandboxPolicy())
+    check_forfeits(results, faults, 'load error: ImportError: no such thing')
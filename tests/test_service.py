@@ -0,0 +1,90 @@
+import asyncio
+
+import pytest
+
+from engine import Bot
+from sandbox import SandboxPolicy
+from service import Service, SubmissionError
+
+# The service without its HTTP front: submissions go in through submit() and come out as jobs.
+
+ROUNDS = 10
+
+
+def cooperates(history):
+    return 'cooperate'
+
+
+def defects(history):
+    return 'defect'
+
+
+def submission(name, body="return 'defect'", before=""):
+    return f"from registry import bot\n{before}\n\n@bot({name!r})\ndef submitted(history):\n    {body}\n"
+
+
+def run(tmp_path, test, policy=None):
+    # Runs `test(service)` on a fresh service with a roster of two bots.
+    async def main():
+        service = Service([Bot("Cooperates", cooperates), Bot("Defects", defects)], str(tmp_path / 'submissions'),
+                          rounds=ROUNDS, workers=1, policy=policy)
+        await service.start()
+        try:
+            return await asyncio.wait_for(test(service), 60)
+        finally:
+            await service.stop()
+    return asyncio.run(main())
+
+
+async def finished(job):
+    return [event async for event in job.follow()]
+
+
+def test_the_same_code_is_only_evaluated_once(tmp_path):
+    async def test(service):
+        job, duplicate = service.submit(submission("Newcomer"))
+        again, duplicate_again = service.submit(submission("Newcomer"))
+        await finished(job)
+        return job, duplicate, again, duplicate_again, service.leaderboard()
+
+    job, duplicate, again, duplicate_again, leaderboard = run(tmp_path, test)
+    assert again is job and not duplicate and duplicate_again
+    assert job.status == 'finished'
+    assert job.result['matches'] == {"Cooperates": (5 * ROUNDS, 0), "Defects": (ROUNDS, ROUNDS)}
+    assert [(row['name'], row['rank']) for row in leaderboard] == [("Newcomer", 1)]
+
+
+def test_names_belong_to_whoever_had_them_first(tmp_path):
+    async def test(service):
+        with pytest.raises(SubmissionError, match="already a bot called 'Defects'"):
+            service.submit(submission("Defects"))
+        service.submit(submission("Newcomer"))
+        with pytest.raises(SubmissionError, match="already a bot called 'Newcomer'"):
+            service.submit(submission("Newcomer", "return 'cooperate'"))
+        with pytest.raises(SubmissionError, match="exactly one bot"):
+            service.submit("def unregistered(history):\n    return 'defect'\n")
+
+    run(tmp_path, test)
+
+
+def test_progress_is_streamed_as_it_happens(tmp_path):
+    async def test(service):
+        job, _ = service.submit(submission("Newcomer"))
+        return await finished(job)
+
+    events = run(tmp_path, test)
+    assert [event['event'] for event in events] == ['queued', 'started', 'match', 'match', 'finished']
+    assert sorted(event['opponent'] for event in events if event['event'] == 'match') == ["Cooperates", "Defects"]
+    assert events[-1]['rank'] == 1
+
+
+def test_a_submission_that_hangs_on_import_is_reported(tmp_path):
+    async def test(service):
+        job, _ = service.submit(submission("Hangs", before="while True:\n    pass"))
+        await finished(job)
+        return job
+
+    job = run(tmp_path, test, SandboxPolicy(startup_time=0.5))
+    assert job.status == 'finished'
+    assert job.result['score'] == 0
+    assert job.result['faults'] == ['load time']
@@ -0,0 +1,91 @@
+import multiprocessing
+import os
+import random
+
+import pytest
+
+from engine import PrisonersDilemma, Bot
+from tournament import round_robin
+
+# A parallel round robin has to give exactly the same results as a serial one, however the matches
+# are spread over the workers.
+
+
+def tit_for_tat(history):
+    return history[-1][1] if history else 'cooperate'
+
+
+def grudger(history):
+    return 'defect' if any(opponent == 'defect' for _, opponent in history) else 'cooperate'
+
+
+def coin(history):
+    return random.choice(['cooperate', 'defect'])
+
+
+def sometimes_defects(history):
+    return 'defect' if random.random() < 0.1 else 'cooperate'
+
+
+def alternates(history):
+    return 'defect' if len(history) % 2 else 'cooperate'
+
+
+# Strategies from this module, so the bots can be sent to worker processes.
+STRATEGIES = [tit_for_tat, grudger, coin, sometimes_defects, alternates]
+
+
+def make_bots(extra=()):
+    bots = [Bot(f"{strategy.__name__} {k}", strategy) for k in range(2) for strategy in STRATEGIES]
+    return bots + list(extra)
+
+
+def play(bots, workers):
+    results = round_robin(PrisonersDilemma(), bots, 80, seed=7, workers=workers)
+    return results, [bot.score for bot in bots]
+
+
+def test_parallel_matches_serial():
+    assert play(make_bots(), 1) == play(make_bots(), 3)
+
+
+def test_unpicklable_bots_fall_back_to_threads():
+    # A lambda can't be sent to another process.
+    extra = lambda: [Bot("Lambda", lambda history: 'defect' if len(history) % 3 else 'cooperate')]
+    assert play(make_bots(extra()), 1) == play(make_bots(extra()), 3)
+
+
+def dies_in_workers(history):
+    # Takes its worker process down with it, and plays Tit for Tat anywhere else.
+    if multiprocessing.parent_process() is not None and len(history) == 40:
+        os._exit(1)
+    return tit_for_tat(history)
+
+
+def test_broken_pool_falls_back_to_threads():
+    serial = play(make_bots([Bot("Dies", dies_in_workers)]), 1)
+    assert play(make_bots([Bot("Dies", dies_in_workers)]), 3) == serial
+
+
+def fails_late(history):
+    # Like Greedy Gary in a match longer than it expects.
+    if len(history) >= 50:
+        raise ValueError("empty range for randrange()")
+    return 'cooperate'
+
+
+def test_strategy_errors_count_as_defections():
+    bots = [Bot("Fails late", fails_late), Bot("Tit for Tat", tit_for_tat)]
+    faults = []
+    results = round_robin(PrisonersDilemma(), bots, 80, seed=7, workers=1, faults=faults)
+    # 50 rounds of cooperation, then the failing bot defects and Tit for Tat follows a round later.
+    assert results[(0, 1)] == (50 * 3 + 5 + 29 * 1, 50 * 3 + 0 + 29 * 1)
+    assert faults == [(0, 1, 0, 'error: ValueError: empty range for randrange()')]
+
+
+def test_strategy_errors_can_forfeit_the_match():
+    bots = [Bot("Tit for Tat", tit_for_tat), Bot("Fails late", fails_late)]
+    results = round_robin(PrisonersDilemma(), bots, 80, seed=7, workers=3, forfeit='forfeit')
+    assert results[(0, 1)] == (80 * 3, 0)
+    with pytest.raises(ValueError):
+        round_robin(PrisonersDilemma(), bots, 80, seed=7, workers=1, forfeit=None)
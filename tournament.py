@@ -0,0 +1,290 @@
+import math
+import os
+import pickle
+import random
+from array import array
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from cache import MatchCache
+from engine import PrisonersDilemma, Bot, play_match, match_summary, FORFEIT_POLICIES
+
+if TYPE_CHECKING:
+    # Only needed for the type hints. They pull in NumPy, which a plain tournament can do without.
+    from sandbox import Sandbox
+    from summary import TournamentStats
+    from traces import TraceRecorder
+
+# Runs a full round robin, optionally spread over several processes.
+#
+# Every match gets its own random number generator, seeded from (seed, i, j), so a match plays out
+# the same way no matter which worker runs it, in what order, or what runs beside it in another
+# thread. That is what makes a parallel tournament give exactly the same results (and the same
+# Bot.score totals) as a serial one.
+
+Pairing = Tuple[int, int]
+
+# How long a match with a continuation probability can possibly last. It's only there so a w of
+# 0.9999999 can't ask for more memory than there is: at w = 0.999 (1000 rounds on average) one
+# match in e ** 1000 would get that far.
+MAX_ROUNDS = 1_000_000
+
+# State for worker processes, filled in once per worker by _init_worker instead of being
+# pickled again for every task.
+_worker_game = None
+_worker_bots = None
+_worker_rounds = 0
+_worker_continuation = None
+_worker_ids = None
+_worker_seed = 0
+_worker_threads = False
+_worker_record = False
+_worker_summarize = False
+_worker_forfeit = None
+
+
+def pairings(count: int, self_play: bool = False) -> List[Pairing]:
+    # Each pair plays only once, in the same order the original nested loop used. With self_play
+    # every bot also plays itself, (i, i) coming just before its other pairings.
+    return [(i, j) for i in range(count) for j in range(i if self_play else i + 1, count)]
+
+
+def score_totals(results: Dict[Pairing, Tuple[int, int]], count: int) -> List[int]:
+    """Every bot's total from a round robin's results, by position.
+
+    Matches never touch the bots; this is where their scores are added up. A bot playing itself
+    scores what its first side scored, once.
+    """
+    totals = [0] * count
+    for (i, j), (score1, score2) in results.items():
+        totals[i] += score1
+        if j != i:
+            totals[j] += score2
+    return totals
+
+
+def match_seed(seed: int, i: int, j: int) -> str:
+    return f"{seed}:{i}:{j}"
+
+
+def match_ids(i: int, j: int, ids: Optional[list] = None) -> Tuple:
+    # What bots i and j are called in their match's seed: their positions, unless the tournament was
+    # given ids that stay the same whoever else takes part (see incremental.py).
+    return (i, j) if ids is None else (ids[i], ids[j])
+
+
+def geometric_length(continuation: float, rng: random.Random, cap: int) -> int:
+    # A match that goes on after every round with probability `continuation` lasts n rounds with
+    # probability (1 - w) * w ** (n - 1). Drawn in one go rather than round by round.
+    if continuation <= 0:
+        return 1
+    if continuation >= 1:
+        return cap
+    return min(cap, 1 + int(math.log(1.0 - rng.random()) / math.log(continuation)))
+
+
+def match_rounds(seed: int, i: int, j: int, rounds: int, continuation: Optional[float] = None) -> int:
+    # How long the match between bots i and j lasts. Normally that's just `rounds`. With a continuation
+    # probability every match draws its own length, from its own generator so the bots' random numbers
+    # stay the same, and `rounds` isn't used: a cap anywhere near the average length would make the
+    # last round predictable again.
+    if continuation is None:
+        return rounds
+    return geometric_length(continuation, random.Random(match_seed(seed, i, j) + ':length'), MAX_ROUNDS)
+
+
+def match_lengths(results: Dict[Pairing, Tuple[int, int]], rounds: int, seed: int,
+                  continuation: Optional[float] = None, ids: Optional[list] = None) -> Dict[Pairing, int]:
+    # How many rounds each match of a round robin lasted, keyed like its results (see match_rounds).
+    return {(i, j): match_rounds(seed, *match_ids(i, j, ids), rounds, continuation) for i, j in results}
+
+
+def play_pairing(game: PrisonersDilemma, bots: List[Bot], rounds: int, seed: int, i: int, j: int,
+                 record: bool = False, summarize: bool = False, continuation: Optional[float] = None,
+                 ids: Optional[list] = None, forfeit: Optional[str] = None, faults: Optional[list] = None):
+    # Returns the scores. With record or summarize it returns the scores, the outcome code of every
+    # round as bytes (if record) and the match_summary (if summarize), the last two None otherwise.
+    # forfeit and faults are play_match's on_error and faults.
+    first, second = match_ids(i, j, ids)
+    rounds = match_rounds(seed, first, second, rounds, continuation)
+    rng = random.Random(match_seed(seed, first, second))
+    if not (record or summarize):
+        return play_match(game, bots[i], bots[j], rounds, rng=rng, on_error=forfeit, faults=faults)
+    outcomes = array('b', bytes(rounds))
+    scores = play_match(game, bots[i], bots[j], rounds, outcomes=outcomes, rng=rng, on_error=forfeit, faults=faults)
+    return scores, outcomes.tobytes() if record else None, match_summary(outcomes) if summarize else None
+
+
+def _init_worker(game, bots, rounds, seed, threads=False, record=False, summarize=False, continuation=None,
+                 ids=None, forfeit=None):
+    global _worker_game, _worker_bots, _worker_rounds, _worker_seed, _worker_threads, _worker_record
+    global _worker_summarize, _worker_continuation, _worker_ids, _worker_forfeit
+    _worker_game, _worker_bots, _worker_rounds, _worker_seed = game, bots, rounds, seed
+    _worker_threads, _worker_record, _worker_summarize, _worker_continuation = threads, record, summarize, continuation
+    _worker_ids, _worker_forfeit = ids, forfeit
+
+
+def _play_chunk(chunk: List[Pairing]) -> list:
+    # Every match comes back with the faults logged while it was played: (match, [(side, what), ...]).
+    scores = []
+    for i, j in chunk:
+        bots = _worker_bots
+        if _worker_threads:
+            # Threads play their matches at the same time with the same bots, so every match gets
+            # instances of its own (see Bot.mirror) for whatever state a match gives them.
+            bots = {i: _worker_bots[i].mirror(), j: _worker_bots[j].mirror()}
+        faults = []
+        match = play_pairing(_worker_game, bots, _worker_rounds, _worker_seed, i, j, _worker_record,
+                             _worker_summarize, _worker_continuation, _worker_ids, _worker_forfeit, faults)
+        scores.append((match, faults))
+    return scores
+
+
+def _chunks(items: list, workers: int) -> List[list]:
+    # A few chunks per worker keeps everyone busy even when some matches are slower than others.
+    size = max(1, len(items) // (workers * 4))
+    return [items[k:k + size] for k in range(0, len(items), size)]
+
+
+def _picklable(*objects) -> bool:
+    try:
+        pickle.dumps(objects)
+    except Exception:
+        return False
+    return True
+
+
+def _seats(bots: List[Bot]) -> List[Bot]:
+    # A bot listed again gets a mirror for every seat after its first.
+    seen = set()
+    seats = []
+    for bot in bots:
+        seats.append(bot.mirror() if id(bot) in seen else bot)
+        seen.add(id(bot))
+    return seats
+
+
+def round_robin(game: PrisonersDilemma, bots: List[Bot], rounds: int, seed: Optional[int] = None,
+                workers: Optional[int] = None, cache: Optional[MatchCache] = None,
+                recorder: Optional['TraceRecorder'] = None,
+                stats: Optional['TournamentStats'] = None,
+                sandbox: Optional['Sandbox'] = None,
+                continuation: Optional[float] = None, pairs: Optional[List[Pairing]] = None,
+                ids: Optional[list] = None, self_play: bool = False, forfeit: Optional[str] = 'defect',
+                faults: Optional[list] = None) -> Dict[Pairing, Tuple[int, int]]:
+    """Plays every pair of bots once, then adds each bot's total to its Bot.score.
+
+    Returns {(i, j): (score_i, score_j)}, indexed by position in bots, for every pairing played
+    (i < j unless pairs says otherwise, plus (i, i) with self_play). workers=1 runs
+    everything in this process; by default one worker process per CPU is used. If the bots can't
+    be sent to other processes (e.g. a strategy is a lambda) a thread pool is used instead.
+    Pass pairs to play only those pairings, with bots[i] as the first player of (i, j).
+    Matches are seeded from the bots' positions, or from ids[i] and ids[j] if ids are given.
+    With self_play every bot plays a mirror of itself too, returned as (i, i) (see score_totals).
+    The same bot may also be in the list more than once: it's then several players with one strategy.
+    Every seat after the first plays as a mirror of it (see Bot.mirror), with its own state, so the
+    bot's own Bot.score only gets its first seat's total; score_totals has all of them.
+    With a MatchCache, pairings of two deterministic bots are looked up before anything is played.
+    With a TraceRecorder, every match is played (cached or not) and its moves are stored as a new run.
+    With TournamentStats, every match is played too and added to the statistics as it comes back.
+    With a Sandbox, matches are played in isolated worker processes under its time and memory limits
+    (and the cache isn't used).
+    With a continuation probability w, every match lasts a random number of rounds instead: after
+    each round it goes on with probability w, 1 / (1 - w) rounds on average, and `rounds` isn't used
+    (see MAX_ROUNDS). Nobody can know which round is the last, so there is no end game to exploit.
+    A strategy that raises an error is dealt with by the forfeit policy, as in sandbox.py: 'defect'
+    counts that move as a defection, 'forfeit' ends the match (see engine.forfeit_scores) and None
+    lets the error through. With a faults list, every bot that failed is logged in it as (bot1, bot2,
+    culprit, what happened), like Sandbox.faults. Sandboxed matches follow the sandbox's own policy.
+    """
+    if forfeit is not None and forfeit not in FORFEIT_POLICIES:
+        raise ValueError(f"forfeit must be one of {FORFEIT_POLICIES}, not {forfeit!r}")
+    if seed is None:
+        seed = random.randrange(2 ** 32)
+    workers = workers or os.cpu_count() or 1
+    bots = _seats(bots)
+    todo = pairings(len(bots), self_play) if pairs is None else list(pairs)
+
+    def length(i: int, j: int) -> int:
+        return match_rounds(seed, *match_ids(i, j, ids), rounds, continuation)
+
+    record, summarize = recorder is not None, stats is not None
+    # Sandboxed bots are never run in this process, not even to probe whether they can be cached.
+    use_cache = cache is not None and not (record or summarize) and sandbox is None
+    known = {}
+    if use_cache:
+        for i, j in todo:
+            if cache.cacheable(game, bots[i], bots[j]):
+                cached = cache.get(game, bots[i], bots[j], length(i, j))
+                if cached is not None:
+                    known[(i, j)] = cached
+    pending = [pairing for pairing in todo if pairing not in known]
+
+    run = recorder.new_run() if record else None
+
+    def play(i: int, j: int):
+        match_faults = []
+        return play_pairing(game, bots, rounds, seed, i, j, record, summarize, continuation, ids, forfeit,
+                            match_faults), match_faults
+
+    def handle(played):
+        # Takes ((i, j), (match, faults)) as matches come back and keeps only their scores, so faults,
+        # traces and statistics are dealt with straight away instead of piling up until the whole
+        # tournament is done.
+        for (i, j), (match, match_faults) in played:
+            if faults is not None:
+                faults.extend((i, j, (i, j)[side], what) for side, what in match_faults)
+            if record or summarize:
+                match, outcomes, summary = match
+                if record:
+                    recorder.add(run, i, j, outcomes)
+                if summarize:
+                    stats.add_match(i, j, length(i, j), match, summary)
+            yield (i, j), match
+
+    if sandbox is not None:
+        # Sandboxed matches come back in whatever order they finish.
+        played = dict(handle((pairing, (match, [])) for pairing, match in
+                             sandbox.play(game, bots, rounds, seed, pending, record, summarize, continuation, ids)))
+    elif workers == 1 or len(pending) < 2:
+        played = dict(handle(((i, j), play(i, j)) for i, j in pending))
+    else:
+        # Imported here, since a serial tournament (like a quick spec run, see spec.py) never needs them.
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+        from concurrent.futures.process import BrokenProcessPool
+
+        def stream(pool, pairs):
+            # ((i, j), (match, faults)) for every pairing, in order, as the workers finish their chunks.
+            return zip(pairs, (match for chunk in pool.map(_play_chunk, _chunks(pairs, workers)) for match in chunk))
+
+        played = {}
+        remaining = pending
+        if _picklable(game, bots):
+            try:
+                with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                         initargs=(game, bots, rounds, seed, False, record, summarize,
+                                                   continuation, ids, forfeit)) as pool:
+                    for pairing, match in handle(stream(pool, pending)):
+                        played[pairing] = match
+                remaining = []
+            except (OSError, NotImplementedError, pickle.PicklingError, BrokenProcessPool):
+                # Matches that came back before the pool failed have been handled already; only the
+                # rest are played again, so nothing reaches the recorder or the statistics twice.
+                remaining = [pairing for pairing in pending if pairing not in played]
+        if remaining:
+            _init_worker(game, bots, rounds, seed, True, record, summarize, continuation, ids, forfeit)
+            try:
+                with ThreadPoolExecutor(workers) as pool:
+                    played.update(handle(stream(pool, remaining)))
+            finally:
+                _init_worker(None, None, 0, 0)
+
+    for (i, j), match_scores in played.items():
+        if use_cache and cache.cacheable(game, bots[i], bots[j]):
+            cache.put(game, bots[i], bots[j], length(i, j), match_scores)
+        known[(i, j)] = match_scores
+
+    # Scores are only added up here, in the parent, so the totals can't depend on the schedule.
+    results = {(i, j): tuple(known[(i, j)]) for i, j in todo}
+    for bot, total in zip(bots, score_totals(results, len(bots))):
+        bot.score += total
+    return results
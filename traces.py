@@ -0,0 +1,183 @@
+import json
+import os
+from array import array
+from typing import Iterator, List, Optional, Tuple, Union
+
+import numpy as np
+
+from engine import PLAYER1_NAMES, DEFECT
+
+# Keeps the moves of every match instead of only the scores, so a result can be looked into later
+# without replaying anything. Each round is its outcome code (2 * move1 + move2, as in engine.py),
+# which fits in 2 bits, so four rounds go in one byte: a million 100-round matches take 25 MB of
+# moves plus 24 MB of index.
+#
+# Matches are found by (run, bot1, bot2), where a run is one round robin and the bots are their
+# positions in the tournament's list of bots (or their names, if the recorder was given them).
+# Asking for (run, j, i) gives the same match seen from bot j's side.
+
+BotId = Union[int, str]
+
+INDEX_DTYPE = np.dtype([('run', np.int32), ('bot1', np.int32), ('bot2', np.int32), ('rounds', np.int32),
+                        ('offset', np.int64)])
+META_FILE = 'meta.json'
+
+# The outcome code seen from the other player's side: (move1, move2) becomes (move2, move1).
+SWAPPED = np.array([0, 2, 1, 3], dtype=np.int8)
+
+
+def pack(outcomes: bytes) -> bytes:
+    # 2 bits per round, the first round in the lowest bits of the first byte.
+    codes = np.frombuffer(bytes(outcomes), dtype=np.uint8)
+    codes = np.concatenate([codes, np.zeros(-len(codes) % 4, dtype=np.uint8)]).reshape(-1, 4)
+    return (codes[:, 0] | codes[:, 1] << 2 | codes[:, 2] << 4 | codes[:, 3] << 6).astype(np.uint8).tobytes()
+
+
+def unpack(data: Union[bytes, np.ndarray], rounds: int) -> np.ndarray:
+    packed = np.frombuffer(data, dtype=np.uint8) if isinstance(data, bytes) else data
+    codes = (packed[:, None] >> np.array([0, 2, 4, 6], dtype=np.uint8)) & 3
+    return codes.ravel()[:rounds].astype(np.int8)
+
+
+def packed_size(rounds: int) -> int:
+    return (rounds + 3) // 4
+
+
+class TraceRecorder:
+    """Bit-packed move traces of many matches, indexed by (run, bot1, bot2).
+
+    Pass one to tournament.round_robin (recorder=...) and every match it plays is added as a new
+    run. save() writes it to a folder; TraceRecorder.load() opens one again, memory-mapped.
+    """
+
+    def __init__(self, bot_names: Optional[List[str]] = None):
+        self.bot_names = list(bot_names) if bot_names is not None else None
+        self.runs = 0
+        self._data = bytearray()
+        self._index = {name: array('i') for name in ('run', 'bot1', 'bot2', 'rounds')}
+        self._offsets = array('q')
+        # Loaded recorders keep their data in these memory-mapped arrays instead.
+        self._saved_data = None
+        self._saved_index = None
+        self._lookup = None
+        self._built_index = None
+
+    def new_run(self) -> int:
+        self.runs += 1
+        return self.runs - 1
+
+    def add(self, run: int, bot1: int, bot2: int, outcomes: bytes):
+        """Stores one match: outcomes holds each round's outcome code, one byte per round."""
+        if self._saved_index is not None:
+            raise ValueError("a loaded trace file is read-only")
+        for name, value in (('run', run), ('bot1', bot1), ('bot2', bot2), ('rounds', len(outcomes))):
+            self._index[name].append(value)
+        self._offsets.append(len(self._data))
+        self._data += pack(outcomes)
+        self.runs = max(self.runs, run + 1)
+        self._lookup = self._built_index = None
+
+    def __len__(self) -> int:
+        return len(self._index_array())
+
+    def _index_array(self) -> np.ndarray:
+        if self._saved_index is not None:
+            return self._saved_index
+        if self._built_index is not None:
+            return self._built_index
+        index = np.empty(len(self._offsets), dtype=INDEX_DTYPE)
+        for name, values in self._index.items():
+            index[name] = np.frombuffer(values, dtype=np.int32) if values else []
+        index['offset'] = np.frombuffer(self._offsets, dtype=np.int64) if self._offsets else []
+        self._built_index = index
+        return index
+
+    def _packed(self, start: int, size: int) -> np.ndarray:
+        if self._saved_data is not None:
+            return self._saved_data[start:start + size]
+        # A copy, since a view would stop the bytearray from growing while it is alive.
+        return np.frombuffer(bytes(self._data[start:start + size]), dtype=np.uint8)
+
+    def _bot(self, bot: BotId) -> int:
+        if isinstance(bot, str):
+            if self.bot_names is None:
+                raise KeyError(f"This recorder doesn't know bot names, use the bot's position instead of {bot!r}")
+            return self.bot_names.index(bot)
+        return bot
+
+    def _keys(self, index: np.ndarray) -> Tuple[np.ndarray, int]:
+        # One number per match, so finding a match is a binary search rather than a million-entry dict.
+        count = int(max(index['bot1'].max(), index['bot2'].max())) + 1
+        return (index['run'].astype(np.int64) * count + index['bot1']) * count + index['bot2'], count
+
+    def _find(self, run: int, bot1: int, bot2: int) -> Tuple[int, bool]:
+        index = self._index_array()
+        if self._lookup is None:
+            keys, count = self._keys(index) if len(index) else (np.empty(0, dtype=np.int64), 0)
+            order = np.argsort(keys, kind='stable')
+            self._lookup = (keys[order], order, count)
+        keys, order, count = self._lookup
+        for first, second, swapped in ((bot1, bot2, False), (bot2, bot1, True)):
+            if not (0 <= first < count and 0 <= second < count):
+                continue
+            key = (run * count + first) * count + second
+            # The latest recording wins if the same match was somehow added twice.
+            position = np.searchsorted(keys, key, side='right') - 1
+            if position >= 0 and keys[position] == key:
+                return int(order[position]), swapped
+        raise KeyError(f"No trace for run {run}, bots {bot1} and {bot2}")
+
+    def outcomes(self, run: int, bot1: BotId, bot2: BotId) -> np.ndarray:
+        """The outcome code of every round, seen from bot1's side (2 * bot1's move + bot2's move)."""
+        row, swapped = self._find(run, self._bot(bot1), self._bot(bot2))
+        entry = self._index_array()[row]
+        rounds = int(entry['rounds'])
+        codes = unpack(self._packed(int(entry['offset']), packed_size(rounds)), rounds)
+        return SWAPPED[codes] if swapped else codes
+
+    def moves(self, run: int, bot1: BotId, bot2: BotId) -> Tuple[np.ndarray, np.ndarray]:
+        # Each bot's moves as arrays of 0 (cooperate) and 1 (defect).
+        codes = self.outcomes(run, bot1, bot2)
+        return codes >> 1, codes & 1
+
+    def history(self, run: int, bot1: BotId, bot2: BotId) -> List[Tuple[str, str]]:
+        # The match as bot1's strategy saw it at the end: a list of (own move, opponent move) names.
+        return [PLAYER1_NAMES[code] for code in self.outcomes(run, bot1, bot2)]
+
+    def cooperation_rates(self, run: int, bot1: BotId, bot2: BotId) -> Tuple[float, float]:
+        moves1, moves2 = self.moves(run, bot1, bot2)
+        if not len(moves1):
+            return 0.0, 0.0
+        return 1 - float(moves1.mean()), 1 - float(moves2.mean())
+
+    def first_defections(self, run: int, bot1: BotId, bot2: BotId) -> Tuple[Optional[int], Optional[int]]:
+        # The round (counting from 0) in which each bot first defected, or None if it never did.
+        result = []
+        for moves in self.moves(run, bot1, bot2):
+            defections = np.flatnonzero(moves == DEFECT)
+            result.append(int(defections[0]) if len(defections) else None)
+        return tuple(result)
+
+    def matches(self, run: Optional[int] = None) -> Iterator[Tuple[int, int, int]]:
+        # (run, bot1, bot2) of every stored match, in the order they were recorded.
+        index = self._index_array()
+        for entry in index if run is None else index[index['run'] == run]:
+            yield int(entry['run']), int(entry['bot1']), int(entry['bot2'])
+
+    def save(self, path: str):
+        os.makedirs(path, exist_ok=True)
+        data = self._saved_data if self._saved_data is not None else np.frombuffer(self._data, dtype=np.uint8)
+        np.save(os.path.join(path, 'traces.npy'), data)
+        np.save(os.path.join(path, 'index.npy'), self._index_array())
+        with open(os.path.join(path, META_FILE), 'w') as f:
+            json.dump({'bots': self.bot_names, 'runs': self.runs}, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'TraceRecorder':
+        with open(os.path.join(path, META_FILE)) as f:
+            meta = json.load(f)
+        recorder = cls(meta['bots'])
+        recorder.runs = meta['runs']
+        recorder._saved_data = np.load(os.path.join(path, 'traces.npy'), mmap_mode='r')
+        recorder._saved_index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        return recorder